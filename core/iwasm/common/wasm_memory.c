@@ -1006,6 +1006,24 @@ wasm_runtime_get_mem_alloc_info(mem_alloc_info_t *mem_alloc_info)
     return false;
 }
 
+bool
+wasm_runtime_get_app_heap_alloc_info(WASMModuleInstanceCommon *module_inst_comm,
+                                     mem_alloc_info_t *mem_alloc_info)
+{
+    WASMMemoryInstance *memory_inst;
+
+    bh_assert(module_inst_comm->module_type == Wasm_Module_Bytecode
+              || module_inst_comm->module_type == Wasm_Module_AoT);
+
+    memory_inst =
+        wasm_get_default_memory((WASMModuleInstance *)module_inst_comm);
+    if (!memory_inst || !memory_inst->heap_handle) {
+        return false;
+    }
+    return mem_allocator_get_alloc_info(memory_inst->heap_handle,
+                                        mem_alloc_info);
+}
+
 bool
 wasm_runtime_validate_app_addr(WASMModuleInstanceCommon *module_inst_comm,
                                uint64 app_offset, uint64 size)
@@ -445,6 +445,15 @@ wasm_runtime_free(void *ptr);
 WASM_RUNTIME_API_EXTERN bool
 wasm_runtime_get_mem_alloc_info(mem_alloc_info_t *mem_alloc_info);
 
+/*
+ * Get the info of the app heap of a module instance, the heap created in its
+ * default memory at instantiation. Returns false if the instance has no app
+ * heap, e.g. when it was instantiated with a heap size of 0.
+ */
+WASM_RUNTIME_API_EXTERN bool
+wasm_runtime_get_app_heap_alloc_info(wasm_module_inst_t module_inst,
+                                     mem_alloc_info_t *mem_alloc_info);
+
 /**
  * Get the package type of a buffer.
  *
@@ -1115,6 +1115,13 @@ static void
 clear_thread_cancel_flags(WASMExecEnv *exec_env)
 {
     os_mutex_lock(&exec_env->wait_lock);
+#if WASM_ENABLE_DEBUG_INTERP != 0
+    /* Undo the signal sent by set_thread_cancel_flags, otherwise the
+       interpreter returns immediately from every following call */
+    if (IS_WAMR_TERM_SIG(exec_env->current_status->signal_flag)) {
+        wasm_cluster_clear_thread_signal(exec_env);
+    }
+#endif
     WASM_SUSPEND_FLAGS_FETCH_AND(exec_env->suspend_flags,
                                  ~WASM_SUSPEND_FLAG_TERMINATE);
     os_mutex_unlock(&exec_env->wait_lock);
@@ -0,0 +1,175 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+Files written atomically, and directories of them shared by processes, used
+by the caches of both bindings.
+"""
+
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from ctypes import byref
+from ctypes import c_uint32
+from typing import IO
+from typing import Iterator
+from typing import List
+
+
+def runtime_version(wasm_runtime_get_version) -> str:
+    """
+    The version of the runtime, given its wasm_runtime_get_version() as
+    loaded by either binding.
+    """
+    major, minor, patch = c_uint32(), c_uint32(), c_uint32()
+    wasm_runtime_get_version(byref(major), byref(minor), byref(patch))
+    return f"{major.value}.{minor.value}.{patch.value}"
+
+
+def sha256(data):
+    import hashlib
+
+    return hashlib.sha256(data)
+
+
+def content_key(data, *parts: str) -> str:
+    """
+    The SHA-256 of the bytes `data` and of `parts`, in hex.
+    """
+    digest = sha256(data)
+    for part in parts:
+        digest.update(b"\0" + part.encode())
+    return digest.hexdigest()
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _mkstemp(path: str) -> tuple:
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    return tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+
+
+def map_file(path: str) -> mmap.mmap | bytearray:
+    """
+    A private copy-on-write mapping of the file at `path`, which stays valid
+    once the file is removed. An empty file cannot be mapped and gives an
+    empty bytearray.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return bytearray()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    A temporary path next to `path`, for a tool to write its output to. It is
+    renamed to `path` when the block exits normally and removed otherwise.
+    """
+    fd, tmp_path = _mkstemp(path)
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        _unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_file(path: str, mode: str = "wb") -> Iterator[IO]:
+    """
+    A temporary file next to `path`, opened with `mode`. It is renamed to
+    `path` when the block exits normally and removed otherwise, readers never
+    see a partial file.
+    """
+    fd, tmp_path = _mkstemp(path)
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        _unlink(tmp_path)
+        raise
+
+
+class FileStore:
+    """
+    A directory of files named after their key and `suffix`, shared by
+    processes. Entries are written with atomic_file() or atomic_path(), using
+    one refreshes its mtime, and the least recently used ones are removed
+    once the directory grows beyond `max_size` bytes.
+    """
+
+    def __init__(self, directory: str, suffix: str, max_size: int):
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+
+        self.directory = os.fspath(directory)
+        self.suffix = suffix
+        self.max_size = max_size
+        self._evict_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def touch(self, path: str) -> bool:
+        """
+        Mark the entry at `path` as used, False when there is none.
+        """
+        try:
+            # the mtime is the last use, atime is often not updated
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def discard(self, path: str) -> None:
+        # users of the file keep their own mapping of it
+        _unlink(path)
+
+    def entries(self) -> List[os.DirEntry]:
+        """
+        The entries of the store, least recently used first.
+        """
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.suffix):
+                    try:
+                        entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append(entry)
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        return entries
+
+    def evict(self, keep: str | None = None) -> None:
+        """
+        Remove the least recently used entries until the store fits in
+        `max_size`, except `keep`.
+        """
+        with self._evict_lock:
+            entries = self.entries()
+            size = sum(entry.stat().st_size for entry in entries)
+            for entry in entries:
+                if size <= self.max_size:
+                    break
+                if entry.path == keep:
+                    continue
+                self.discard(entry.path)
+                size -= entry.stat().st_size
+
+    def clear(self) -> None:
+        for entry in self.entries():
+            self.discard(entry.path)
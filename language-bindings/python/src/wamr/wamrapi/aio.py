@@ -0,0 +1,156 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import asyncio
+import os
+import threading
+import weakref
+
+from wamr.wamrapi.executor import WasmThreadPoolExecutor
+from wamr.wamrapi.wamr import ExecEnv
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import TypedFunction
+
+
+class _Call:
+    """
+    The state of one call, shared between the event loop and the worker
+    thread running it, so that a cancellation only terminates the guest code
+    of this call and never the next one on the same instance.
+    """
+
+    __slots__ = ["instance", "lock", "running", "cancelled"]
+
+    def __init__(self, instance: Instance):
+        self.instance = instance
+        self.lock = threading.Lock()
+        self.running = False
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        with self.lock:
+            self.cancelled = True
+            if self.running:
+                self.instance.terminate()
+
+
+def _run_call(
+    context, call: _Call, func: TypedFunction, args, stack_size, instruction_limit
+):
+    instance = call.instance
+    with instance._call_lock:
+        # every call gets its own execution environment, so that neither
+        # its instruction limit nor a termination leak into other calls
+        exec_env = ExecEnv(instance, stack_size)
+        if instruction_limit is not None:
+            exec_env.set_instruction_limit(instruction_limit)
+
+        with call.lock:
+            if call.cancelled:
+                return None
+            call.running = True
+
+        try:
+            return func.call_in(exec_env, *args)
+        finally:
+            with call.lock:
+                call.running = False
+                if call.cancelled:
+                    # the termination may land after the guest code returned
+                    instance.clear_exception()
+            # not kept alive by the traceback of an exception
+            del exec_env
+
+
+class AsyncRunner:
+    """
+    Run calls to exported functions from asyncio code.
+
+    Calls are executed by a WasmThreadPoolExecutor of `workers` threads, the
+    GIL is released while the guest code runs. At most `max_concurrency`
+    calls per event loop are in flight, the others wait on a semaphore in the
+    event loop. Calls on the same instance are serialized.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_concurrency: int | None = None,
+        stack_size: int = 65536,
+    ):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if max_concurrency is None:
+            max_concurrency = workers
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be greater than 0")
+
+        self.max_concurrency = max_concurrency
+        self.stack_size = stack_size
+        self._executor = WasmThreadPoolExecutor(None, workers)
+        # asyncio primitives are bound to the event loop they are used in
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def call(
+        self,
+        instance: Instance,
+        name: str,
+        *args,
+        timeout: float | None = None,
+        instruction_limit: int | None = None,
+    ):
+        """
+        Call the export `name` of `instance` with `args`.
+
+        When `timeout` expires or the awaiting task is cancelled, the guest
+        code is stopped with wasm_runtime_terminate() and TimeoutError or
+        CancelledError is raised once it returned. `instruction_limit` caps
+        the number of instructions the call may run (see
+        ExecEnv.set_instruction_limit()).
+        """
+        func = instance.exports[name]
+
+        async with self._get_semaphore():
+            call = _Call(instance)
+            future = asyncio.wrap_future(
+                self._executor.submit(
+                    _run_call, call, func, args, self.stack_size, instruction_limit
+                )
+            )
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                call.cancel()
+                # hold the slot until the worker is done with the instance
+                await asyncio.wait([future])
+                if not future.cancelled():
+                    future.exception()
+                raise
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait)
+
+
+_default_runner = None
+_default_runner_lock = threading.Lock()
+
+
+def get_default_runner() -> AsyncRunner:
+    """
+    The AsyncRunner used by Instance.call_async(), created on first use.
+    """
+    global _default_runner
+    with _default_runner_lock:
+        if _default_runner is None:
+            _default_runner = AsyncRunner()
+        return _default_runner
@@ -0,0 +1,240 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import mmap
+import os
+import platform
+import shutil
+import subprocess
+import threading
+from typing import List
+
+from wamr.filestore import FileStore
+from wamr.filestore import atomic_path
+from wamr.filestore import content_key
+from wamr.filestore import map_file
+from wamr.filestore import runtime_version as _runtime_version
+from wamr.wamrapi.iwasm import wasm_runtime_get_version
+
+AOT_SUFFIX = ".aot"
+WASM_MAGIC = b"\0asm"
+
+
+def runtime_version() -> str:
+    return _runtime_version(wasm_runtime_get_version)
+
+
+# fields of /proc/cpuinfo identifying the CPU model and its features, on
+# x86 and on Arm
+_CPUINFO_FIELDS = (
+    "vendor_id",
+    "cpu family",
+    "model",
+    "model name",
+    "flags",
+    "CPU implementer",
+    "CPU part",
+    "Features",
+)
+
+
+def host_cpu() -> str:
+    """
+    The model and the features of the host CPU, what wamrc compiles for
+    without `--target` and `--cpu`.
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpuinfo = f.read()
+    except OSError:
+        cpuinfo = ""
+
+    fields = {}
+    # the first processor only
+    for line in cpuinfo.split("\n\n", 1)[0].splitlines():
+        name, _, value = line.partition(":")
+        fields[name.strip()] = value.strip()
+    parts = [fields.get(name, "") for name in _CPUINFO_FIELDS]
+    if any(parts):
+        return ";".join(parts)
+
+    if platform.system() == "Darwin":
+        result = subprocess.run(
+            ["sysctl", "-n", "machdep.cpu.brand_string", "machdep.cpu.features"],
+            capture_output=True,
+            text=True,
+        )
+        if result.stdout.strip():
+            return result.stdout.strip()
+    return platform.processor()
+
+
+def find_wamrc(wamrc: str) -> str:
+    """
+    The path of the compiler `wamrc`, looked up in PATH when not a path.
+    """
+    path = shutil.which(wamrc)
+    if path is None:
+        raise FileNotFoundError(f"wamrc not found: {wamrc}")
+    return path
+
+
+def wamrc_version(wamrc: str) -> str:
+    """
+    The version printed by `wamrc --version`.
+    """
+    result = subprocess.run(
+        [find_wamrc(wamrc), "--version"], capture_output=True, text=True
+    )
+    return result.stdout.strip()
+
+
+def _run_wamrc(
+    wamrc: str, wasm_path: str, out_path: str, options: List[str]
+) -> None:
+    result = subprocess.run(
+        [find_wamrc(wamrc), *options, "-o", out_path, wasm_path],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise Exception(
+            f"Error while compiling {wasm_path} with wamrc: "
+            f"{(result.stderr or result.stdout).strip()}"
+        )
+
+
+def compile_aot(
+    wamrc: str, wasm_path: str, aot_path: str, options: List[str] = ()
+) -> None:
+    """
+    Compile `wasm_path` to `aot_path` with `wamrc` and `options`. The file is
+    written next to `aot_path` and renamed into place, readers never see a
+    partial file.
+    """
+    with atomic_path(aot_path) as tmp_path:
+        _run_wamrc(wamrc, wasm_path, tmp_path, options)
+
+
+class AotCache(FileStore):
+    """
+    A content-addressed cache of AOT files compiled with `wamrc`.
+
+    Entries are named after the SHA-256 of the wasm bytes, the version of the
+    runtime and of wamrc, the host and the compiler options, so a changed
+    module, runtime upgrade or other target never loads a stale file. Without
+    `target` and `cpu`, wamrc compiles for the host CPU, and its model and
+    features (see host_cpu()) are part of the key too. Entries are written to
+    a temporary file and renamed into place, several processes can share the
+    directory: on a concurrent miss each of them compiles and the last rename
+    wins, readers never see a partial file. Loading an entry refreshes its
+    mtime, and the least recently used entries are removed once the directory
+    grows beyond `max_size` bytes.
+
+    - `wamrc`: the compiler, looked up in PATH when not a path.
+    - `target`, `cpu`, `cpu_features`, `opt_level`: passed to wamrc as
+      `--target`, `--cpu`, `--cpu-features` and `--opt-level`.
+    - `extra_args`: any other wamrc options, e.g. `["--enable-simd"]`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = 256 * 1024 * 1024,
+        wamrc: str = "wamrc",
+        target: str | None = None,
+        cpu: str | None = None,
+        cpu_features: str | None = None,
+        opt_level: int = 3,
+        extra_args: List[str] | None = None,
+    ):
+        super().__init__(directory, AOT_SUFFIX, max_size)
+        self.wamrc = wamrc
+        self.options = [f"--opt-level={opt_level}"]
+        if target is not None:
+            self.options.append(f"--target={target}")
+        if cpu is not None:
+            self.options.append(f"--cpu={cpu}")
+        if cpu_features is not None:
+            self.options.append(f"--cpu-features={cpu_features}")
+        self.options.extend(extra_args or [])
+        self._wamrc_version = None
+        # the host CPU when wamrc compiles for it, see key()
+        self._host_cpu = None
+        self._compiles_for_host = target is None and cpu is None
+        self._lock = threading.Lock()
+
+    def _get_wamrc_version(self) -> str:
+        with self._lock:
+            if self._wamrc_version is None:
+                self._wamrc_version = wamrc_version(self.wamrc)
+            return self._wamrc_version
+
+    def _get_host_cpu(self) -> str:
+        if not self._compiles_for_host:
+            return ""
+        with self._lock:
+            if self._host_cpu is None:
+                self._host_cpu = host_cpu()
+            return self._host_cpu
+
+    def key(self, data) -> str:
+        """
+        The cache key of the wasm bytes `data`.
+        """
+        return content_key(
+            data,
+            runtime_version(),
+            self._get_wamrc_version(),
+            platform.system(),
+            platform.machine(),
+            self._get_host_cpu(),
+            *self.options,
+        )
+
+    def get(self, wasm_path: str) -> str:
+        """
+        The path of the AOT file of the module at `wasm_path`, compiled on a
+        miss. A file that is not a wasm binary, e.g. already an AOT file, is
+        returned as is.
+
+        Another process may evict the entry before it is opened, load() maps
+        it instead.
+        """
+        data = map_file(wasm_path)
+        if data[:4] != WASM_MAGIC:
+            return wasm_path
+
+        aot_path = self.path(self.key(data))
+        if self.touch(aot_path):
+            return aot_path
+
+        compile_aot(self.wamrc, wasm_path, aot_path, self.options)
+        self.evict(keep=aot_path)
+        return aot_path
+
+    def load(self, wasm_path: str) -> mmap.mmap | bytearray:
+        """
+        A copy-on-write mapping of the AOT file of the module at `wasm_path`,
+        compiled on a miss, for Module.from_file(). A file that is not a wasm
+        binary is mapped as is.
+
+        The entry is mapped before it can be evicted by another process: a
+        hit is opened directly, and a new file is mapped before it is renamed
+        into the cache.
+        """
+        data = map_file(wasm_path)
+        if data[:4] != WASM_MAGIC:
+            return data
+
+        aot_path = self.path(self.key(data))
+        try:
+            aot_data = map_file(aot_path)
+        except FileNotFoundError:
+            with atomic_path(aot_path) as tmp_path:
+                _run_wamrc(self.wamrc, wasm_path, tmp_path, self.options)
+                aot_data = map_file(tmp_path)
+            self.evict(keep=aot_path)
+        else:
+            self.touch(aot_path)
+        return aot_data
@@ -0,0 +1,147 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import json
+import os
+import threading
+import time
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+from wamr.filestore import atomic_file
+from wamr.wamrapi.aot_cache import runtime_version
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+from wamr.wamrapi.wamr import _check_running_mode
+from wamr.wamrapi.wamr import supported_running_modes
+
+
+class TuningResult(NamedTuple):
+    """
+    The outcome of autotune(): the chosen `running_mode`, the best time of
+    the workload per mode, in seconds, and whether the choice was `cached`
+    in the table, in which case nothing was measured.
+    """
+
+    running_mode: str
+    timings: Dict[str, float]
+    cached: bool
+
+
+class TuningTable:
+    """
+    The running modes chosen by autotune(), keyed by the digest of the
+    module, in a small JSON file.
+
+    An entry only applies to the runtime version it was measured with, and
+    while its mode is still supported. The file is rewritten to a temporary
+    file and renamed into place, so processes sharing it never read a
+    partial table; concurrent updates may drop each other's entries, which
+    are then measured again.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                table = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return table if isinstance(table, dict) else {}
+
+    def get(self, module: Module) -> str | None:
+        """
+        The running mode recorded for `module`, None when there is none.
+        """
+        with self._lock:
+            entry = self._read().get(module.digest)
+        if not isinstance(entry, dict) or entry.get("runtime") != runtime_version():
+            return None
+        running_mode = entry.get("running_mode")
+        if running_mode not in supported_running_modes():
+            return None
+        return running_mode
+
+    def record(
+        self, module: Module, running_mode: str, timings: Dict[str, float]
+    ) -> None:
+        with self._lock:
+            table = self._read()
+            table[module.digest] = {
+                "running_mode": running_mode,
+                "runtime": runtime_version(),
+                "timings": timings,
+            }
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with atomic_file(self.path, "w") as f:
+                json.dump(table, f, indent=2, sort_keys=True)
+
+
+def autotune(
+    instance_factory: Callable[[str], Instance],
+    workload: Callable[[Instance], None],
+    table: TuningTable | str | None = None,
+    modes: List[str] | None = None,
+    repeat: int = 3,
+    warmup: int = 1,
+    force: bool = False,
+) -> TuningResult:
+    """
+    Find the fastest running mode of a module for `workload`.
+
+    `instance_factory(running_mode)` creates an instance of the module in
+    that mode (e.g. `lambda mode: Instance(module, running_mode=mode)`) and
+    `workload(instance)` runs a representative sequence of calls on it.
+    Each of `modes`, all the supported ones by default, gets a fresh
+    instance, `warmup` untimed runs and `repeat` timed ones, of which the
+    best is kept. With a `table` (a TuningTable or its path), the winner is
+    recorded for the module and returned without measuring on the next
+    calls, unless `force` is set.
+    """
+    if repeat <= 0:
+        raise ValueError("repeat must be greater than 0")
+    if modes is None:
+        modes = supported_running_modes()
+    for running_mode in modes:
+        _check_running_mode(running_mode)
+    if not modes:
+        raise ValueError("No running mode to tune")
+    if table is not None and not isinstance(table, TuningTable):
+        table = TuningTable(table)
+
+    module = None
+    timings = {}
+    for running_mode in modes:
+        instance = instance_factory(running_mode)
+        if module is None:
+            module = instance.module
+            if table is not None and not force:
+                cached = table.get(module)
+                if cached is not None:
+                    return TuningResult(cached, {}, True)
+        elif instance.module.digest != module.digest:
+            raise ValueError("instance_factory must always instantiate the same module")
+        if instance.running_mode != running_mode:
+            instance.running_mode = running_mode
+
+        for _ in range(warmup):
+            workload(instance)
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            workload(instance)
+            best = min(best, time.perf_counter() - start)
+        timings[running_mode] = best
+        # only one instance of the module at a time
+        del instance
+
+    winner = min(timings, key=timings.get)
+    if table is not None:
+        table.record(module, winner, timings)
+    return TuningResult(winner, timings, False)
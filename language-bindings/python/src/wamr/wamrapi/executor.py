@@ -0,0 +1,137 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import os
+import queue
+import threading
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from typing import Callable
+
+from wamr.wamrapi.pool import PooledInstance
+from wamr.wamrapi.wamr import ExecEnv
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import ThreadEnv
+
+
+class WasmThreadPoolExecutor(Executor):
+    """
+    Run wasm code of one module from several Python threads.
+
+    Every worker thread initializes its own WAMR thread environment, calls
+    `instance_factory` to get a private Instance and creates an ExecEnv for
+    it, so that no runtime object is ever shared between threads. The GIL
+    is released while the guest code runs, CPU-bound guest code scales with
+    `workers`.
+
+    `submit(fn, *args)` accepts the name of an exported function, called with
+    `args` on the instance and the ExecEnv of the worker, or a callable,
+    called with the worker's PooledInstance and `args`. `map` is inherited
+    from Executor. Without `instance_factory` the workers only get a thread
+    environment, callables are passed None instead of a PooledInstance and
+    exports can not be called by name.
+    """
+
+    def __init__(
+        self,
+        instance_factory: Callable[[], Instance] | None,
+        workers: int | None = None,
+        stack_size: int = 65536,
+    ):
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 0:
+            raise ValueError("workers must be greater than 0")
+
+        self.instance_factory = instance_factory
+        self.stack_size = stack_size
+        self._work = queue.SimpleQueue()
+        self._shutdown = False
+        self._shutdown_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(
+                target=self._worker, name=f"wamr-executor-{i}", daemon=True
+            )
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _worker(self) -> None:
+        with ThreadEnv():
+            try:
+                context, error = None, None
+                if self.instance_factory is not None:
+                    instance = self.instance_factory()
+                    context = PooledInstance(
+                        instance, ExecEnv(instance, self.stack_size)
+                    )
+            except Exception as e:
+                context, error = None, e
+
+            while True:
+                item = self._work.get()
+                if item is None:
+                    break
+
+                future, fn, args = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                    continue
+
+                try:
+                    if isinstance(fn, str):
+                        function = context.instance.exports[fn]
+                        result = function.call_in(context.exec_env, *args)
+                    else:
+                        result = fn(context, *args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+                del item, future
+
+            # instances are destroyed in the thread that used them
+            del context
+
+    def submit(self, fn: str | Callable, /, *args, **kwargs) -> Future:
+        if kwargs:
+            raise TypeError("wasm calls do not take keyword arguments")
+        if isinstance(fn, str):
+            if self.instance_factory is None:
+                raise ValueError(
+                    "calling an export by name requires an instance_factory"
+                )
+        elif not callable(fn):
+            raise TypeError("fn must be the name of an export or a callable")
+
+        with self._shutdown_lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+
+            future = Future()
+            self._work.put((future, fn, args))
+            return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._shutdown_lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+
+            if cancel_futures:
+                while True:
+                    try:
+                        item = self._work.get_nowait()
+                    except queue.Empty:
+                        break
+                    item[0].cancel()
+
+            for _ in self._threads:
+                self._work.put(None)
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
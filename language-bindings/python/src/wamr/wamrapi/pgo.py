@@ -0,0 +1,303 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import os
+import shutil
+import subprocess
+import time
+from ctypes import create_string_buffer
+from typing import Callable
+from typing import List
+from typing import NamedTuple
+
+from wamr.filestore import atomic_file
+from wamr.filestore import atomic_path
+from wamr.filestore import content_key
+from wamr.filestore import map_file
+from wamr.wamrapi.aot_cache import compile_aot
+from wamr.wamrapi.aot_cache import runtime_version
+from wamr.wamrapi.aot_cache import wamrc_version
+from wamr.wamrapi.wamr import Engine
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+try:
+    from wamr.wamrapi.iwasm import wasm_runtime_dump_pgo_prof_data_to_buf
+    from wamr.wamrapi.iwasm import wasm_runtime_get_pgo_prof_data_size
+except ImportError:
+    # only exported by runtimes built with WAMR_BUILD_STATIC_PGO=1
+    wasm_runtime_get_pgo_prof_data_size = None
+
+RAW_PROFILE_SUFFIX = ".profraw"
+
+
+class ABResult(NamedTuple):
+    """
+    The best time of the workload, in seconds, on the AOT file compiled
+    without profile (`baseline`) and on the one compiled with it
+    (`optimized`).
+    """
+
+    baseline: float
+    optimized: float
+
+    @property
+    def speedup(self) -> float:
+        return self.baseline / self.optimized
+
+
+class PgoPipeline:
+    """
+    Profile-guided optimization of a wasm module with wamrc, in `directory`.
+
+    1. `collect()` runs a workload on an instance of the module compiled
+       with `--enable-llvm-pgo` (see `instrument()`) and writes its raw
+       profile to `directory/profiles`, one file per run. Several processes
+       can collect into the same directory.
+    2. `merge()` merges the raw profiles with `llvm-profdata`.
+    3. `optimize()` compiles the module with the merged profile.
+    4. `compare()` benchmarks the AOT file compiled without instrumentation
+       against the optimized one.
+
+    `run()` chains the four steps. The AOT files are written to a temporary
+    file and renamed into place, each step reuses the files of the previous
+    ones. They are kept, with the profiles, in a subdirectory named after
+    the SHA-256 of the module, the runtime and wamrc versions and
+    `wamrc_args`, as in AotCache, so a changed module or toolchain starts
+    over instead of reusing stale files. Collecting needs a runtime built
+    with WAMR_BUILD_STATIC_PGO=1.
+
+    - `wamrc`, `llvm_profdata`: the tools, looked up in PATH when not paths.
+      llvm-profdata must match the LLVM version of wamrc.
+    - `wamrc_args`: options given to every wamrc build, e.g. `["--opt-level=3"]`.
+    """
+
+    def __init__(
+        self,
+        wasm_path: str,
+        directory: str,
+        wamrc: str = "wamrc",
+        llvm_profdata: str = "llvm-profdata",
+        wamrc_args: List[str] | None = None,
+    ):
+        self.wasm_path = os.fspath(wasm_path)
+        self.directory = os.fspath(directory)
+        self.wamrc = wamrc
+        self.llvm_profdata = llvm_profdata
+        self.wamrc_args = list(wamrc_args or [])
+        self._wamrc_version = None
+        # the stat of the module the key was computed for, and the key
+        self._key = (None, None)
+
+    def key(self) -> str:
+        """
+        The key of the current content of the module, see PgoPipeline.
+        """
+        st = os.stat(self.wasm_path)
+        stat = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if self._key[0] != stat:
+            if self._wamrc_version is None:
+                self._wamrc_version = wamrc_version(self.wamrc)
+            data = map_file(self.wasm_path)
+            key = content_key(
+                data, runtime_version(), self._wamrc_version, *self.wamrc_args
+            )
+            self._key = (stat, key)
+        return self._key[1]
+
+    def _path(self, name: str) -> str:
+        directory = os.path.join(self.directory, self.key())
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+    @property
+    def instrumented_path(self) -> str:
+        return self._path("instrumented.aot")
+
+    @property
+    def baseline_path(self) -> str:
+        return self._path("baseline.aot")
+
+    @property
+    def optimized_path(self) -> str:
+        return self._path("optimized.aot")
+
+    @property
+    def profile_path(self) -> str:
+        return self._path("merged.profdata")
+
+    @property
+    def profiles_directory(self) -> str:
+        path = self._path("profiles")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def instrument(self) -> str:
+        """
+        The instrumented AOT file of the current module, compiled unless it
+        exists.
+        """
+        instrumented_path = self.instrumented_path
+        if not os.path.exists(instrumented_path):
+            compile_aot(
+                self.wamrc,
+                self.wasm_path,
+                instrumented_path,
+                ["--enable-llvm-pgo", *self.wamrc_args],
+            )
+        return instrumented_path
+
+    def baseline(self) -> str:
+        """
+        The AOT file of the current module compiled without profile, compiled
+        unless it exists.
+        """
+        baseline_path = self.baseline_path
+        if not os.path.exists(baseline_path):
+            compile_aot(self.wamrc, self.wasm_path, baseline_path, self.wamrc_args)
+        return baseline_path
+
+    def collect(
+        self,
+        engine: Engine,
+        workload: Callable[[Instance], None],
+        runs: int = 1,
+        **instance_args,
+    ) -> List[str]:
+        """
+        Run `workload(instance)` `runs` times, on a new instance of the
+        instrumented module each time, and return the paths of the raw
+        profiles written. `instance_args` are passed to Instance.
+        """
+        if wasm_runtime_get_pgo_prof_data_size is None:
+            raise NotImplementedError(
+                "The runtime is built without WAMR_BUILD_STATIC_PGO"
+            )
+
+        module = Module.from_file(engine, self.instrument())
+        profiles_directory = self.profiles_directory
+        paths = []
+        for _ in range(runs):
+            instance = Instance(module, **instance_args)
+            workload(instance)
+            paths.append(self._dump_profile(instance, profiles_directory))
+            del instance
+        return paths
+
+    def _dump_profile(self, instance: Instance, profiles_directory: str) -> str:
+        size = wasm_runtime_get_pgo_prof_data_size(instance.module_inst)
+        if not size:
+            raise Exception("Error while getting PGO profile data size")
+        buf = create_string_buffer(size)
+        dumped = wasm_runtime_dump_pgo_prof_data_to_buf(instance.module_inst, buf, size)
+        if dumped != size:
+            raise Exception("Error while dumping PGO profile data")
+
+        # a unique name per run, renamed once complete so merge() never
+        # reads a partial profile
+        name = f"{os.getpid()}-{os.urandom(8).hex()}{RAW_PROFILE_SUFFIX}"
+        path = os.path.join(profiles_directory, name)
+        with atomic_file(path) as f:
+            f.write(buf.raw)
+        return path
+
+    def raw_profiles(self) -> List[str]:
+        return sorted(
+            entry.path
+            for entry in os.scandir(self.profiles_directory)
+            if entry.name.endswith(RAW_PROFILE_SUFFIX)
+        )
+
+    def merge(self) -> str:
+        """
+        Merge all the raw profiles collected so far for the current module
+        into one profile.
+        """
+        profile_path = self.profile_path
+        raw_profiles = self.raw_profiles()
+        if not raw_profiles:
+            raise Exception(
+                f"Error while merging profiles: none in {self.profiles_directory}"
+            )
+        llvm_profdata = shutil.which(self.llvm_profdata)
+        if llvm_profdata is None:
+            raise FileNotFoundError(f"llvm-profdata not found: {self.llvm_profdata}")
+
+        with atomic_path(profile_path) as tmp_path:
+            result = subprocess.run(
+                [llvm_profdata, "merge", f"-output={tmp_path}", *raw_profiles],
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise Exception(
+                    "Error while merging profiles with llvm-profdata: "
+                    f"{(result.stderr or result.stdout).strip()}"
+                )
+        return profile_path
+
+    def optimize(self) -> str:
+        """
+        Compile the module with the merged profile.
+        """
+        profile_path = self.profile_path
+        optimized_path = self.optimized_path
+        if not os.path.exists(profile_path):
+            raise Exception("Error while optimizing: the profiles are not merged")
+        compile_aot(
+            self.wamrc,
+            self.wasm_path,
+            optimized_path,
+            [f"--use-prof-file={profile_path}", *self.wamrc_args],
+        )
+        return optimized_path
+
+    def compare(
+        self,
+        engine: Engine,
+        workload: Callable[[Instance], None],
+        repeat: int = 5,
+        warmup: int = 1,
+        **instance_args,
+    ) -> ABResult:
+        """
+        The best time of `workload` on the baseline and on the optimized AOT
+        files, measured in alternation to even out the noise.
+        """
+        if repeat <= 0:
+            raise ValueError("repeat must be greater than 0")
+        optimized_path = self.optimized_path
+        if not os.path.exists(optimized_path):
+            raise Exception("Error while comparing: the module is not optimized")
+
+        instances = [
+            Instance(Module.from_file(engine, path), **instance_args)
+            for path in (self.baseline(), optimized_path)
+        ]
+        for instance in instances:
+            for _ in range(warmup):
+                workload(instance)
+        best = [float("inf")] * len(instances)
+        for _ in range(repeat):
+            for i, instance in enumerate(instances):
+                start = time.perf_counter()
+                workload(instance)
+                best[i] = min(best[i], time.perf_counter() - start)
+        return ABResult(*best)
+
+    def run(
+        self,
+        engine: Engine,
+        workload: Callable[[Instance], None],
+        runs: int = 1,
+        repeat: int = 5,
+        **instance_args,
+    ) -> ABResult:
+        """
+        Collect `runs` profiles, merge them with the ones already collected,
+        optimize and compare.
+        """
+        self.collect(engine, workload, runs, **instance_args)
+        self.merge()
+        self.optimize()
+        return self.compare(engine, workload, repeat, **instance_args)
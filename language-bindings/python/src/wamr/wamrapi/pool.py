@@ -0,0 +1,269 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+from wamr.wamrapi.wamr import ExecEnv
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+from wamr.wamrapi.wamr import ThreadEnv
+
+
+class PooledInstance:
+    """
+    A warm module instance and its execution environment.
+    """
+
+    __slots__ = ["instance", "exec_env", "idle_since"]
+
+    def __init__(self, instance: Instance, exec_env: ExecEnv):
+        self.instance = instance
+        self.exec_env = exec_env
+        self.idle_since = 0.0
+
+    @property
+    def exports(self):
+        return self.instance.exports
+
+
+class PoolStats:
+    """
+    Counters of an InstancePool. Times are cumulative, in seconds.
+    """
+
+    __slots__ = [
+        "hits",
+        "misses",
+        "resets",
+        "discards",
+        "evictions",
+        "errors",
+        "reset_time",
+        "instantiate_time",
+    ]
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"PoolStats({self.as_dict()})"
+
+
+class InstancePool:
+    """
+    Keep warm instance + ExecEnv pairs of a module, for request-per-instance
+    serving.
+
+    - `size` pairs are created upfront and the pool is refilled up to `size`
+      in a background thread.
+    - A released pair is reset, that is replaced by a freshly instantiated one
+      in the background (WAMR can not re-apply the data segments of a live
+      instance), or discarded.
+    - When no pair is idle, get() waits for a background instantiation in
+      flight rather than instantiating another pair, and only instantiates
+      synchronously when there is none.
+    - At most `high_water` idle pairs are kept, pairs idle for more than
+      `idle_timeout` seconds are evicted down to `size`.
+    """
+
+    def __init__(
+        self,
+        module: Module,
+        size: int = 4,
+        stack_size: int = 65536,
+        heap_size: int = 16384,
+        high_water: int | None = None,
+        idle_timeout: float | None = None,
+    ):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        if high_water is None:
+            high_water = size
+        if high_water < size:
+            raise ValueError("high_water must be greater than or equal to size")
+
+        self.module = module
+        self.size = size
+        self.stack_size = stack_size
+        self.heap_size = heap_size
+        self.high_water = high_water
+        self.idle_timeout = idle_timeout
+        self.stats = PoolStats()
+
+        self._lock = threading.Lock()
+        # notified when a pair becomes idle or a background task ends
+        self._ready = threading.Condition(self._lock)
+        self._idle = deque()
+        # number of background instantiations not yet in `_idle`
+        self._pending = 0
+        # number of get() waiting for one of them
+        self._waiting = 0
+        self._tasks = queue.Queue()
+        self._closed = False
+
+        for _ in range(size):
+            self._push_idle(self._instantiate())
+
+        self._worker = threading.Thread(
+            target=self._background, name="wamr-instance-pool", daemon=True
+        )
+        self._worker.start()
+
+    def __enter__(self) -> "InstancePool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _instantiate(self) -> PooledInstance:
+        start = time.perf_counter()
+        instance = Instance(self.module, self.stack_size, self.heap_size)
+        pooled = PooledInstance(instance, ExecEnv(instance, self.stack_size))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.stats.instantiate_time += elapsed
+        return pooled
+
+    def _push_idle(self, pooled: PooledInstance) -> None:
+        pooled.idle_since = time.monotonic()
+        with self._lock:
+            if not self._closed and len(self._idle) < self.high_water:
+                self._idle.append(pooled)
+                pooled = None
+                self._ready.notify()
+        # dropped outside of the lock, deinstantiation may be slow
+        del pooled
+
+    @contextmanager
+    def acquire(self) -> Iterator[PooledInstance]:
+        """
+        Lend a warm instance. It is reset when the block exits normally and
+        discarded if an exception escapes the block.
+        """
+        pooled = self.get()
+        try:
+            yield pooled
+        except BaseException:
+            self.release(pooled, discard=True)
+            raise
+        self.release(pooled)
+
+    def get(self) -> PooledInstance:
+        with self._lock:
+            if not self._idle and self._waiting < self._pending:
+                self._waiting += 1
+                while (
+                    not self._idle
+                    and not self._closed
+                    and self._waiting <= self._pending
+                ):
+                    self._ready.wait()
+                self._waiting -= 1
+            if self._closed:
+                raise RuntimeError("InstancePool is closed")
+            pooled = self._idle.pop() if self._idle else None
+            if pooled:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+            refill = len(self._idle) + self._pending < self.size
+            if refill:
+                self._pending += 1
+
+        if refill:
+            self._tasks.put(None)
+        return pooled if pooled else self._instantiate()
+
+    def release(self, pooled: PooledInstance, discard: bool = False) -> None:
+        """
+        Return an instance to the pool. It is reset in the background, or
+        only dropped when `discard` is set (e.g. after a trap).
+        """
+        with self._lock:
+            if discard:
+                self.stats.discards += 1
+                schedule = False
+            else:
+                schedule = (
+                    not self._closed
+                    and len(self._idle) + self._pending < self.high_water
+                )
+            if schedule:
+                self._pending += 1
+
+        if schedule:
+            self._tasks.put(pooled)
+        self._evict()
+
+    def _evict(self) -> None:
+        if self.idle_timeout is None:
+            return
+
+        evicted = []
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            while len(self._idle) > self.size and self._idle[0].idle_since < deadline:
+                evicted.append(self._idle.popleft())
+            self.stats.evictions += len(evicted)
+        del evicted
+
+    def _background(self) -> None:
+        # the start function of a module may run during instantiation
+        with ThreadEnv():
+            while True:
+                try:
+                    task = self._tasks.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    self._evict()
+                    continue
+
+                if task is self:
+                    break
+
+                # `task` is either a pair to reset or None for a refill
+                is_reset = task is not None
+                start = time.perf_counter()
+                failed = False
+                try:
+                    del task
+                    if not self._closed:
+                        self._push_idle(self._instantiate())
+                except Exception:
+                    # e.g. the runtime is out of memory, the next get() will
+                    # report the error when instantiating synchronously
+                    failed = True
+                finally:
+                    with self._lock:
+                        self._pending -= 1
+                        self._ready.notify_all()
+                        self.stats.errors += failed
+                        if is_reset:
+                            self.stats.resets += 1
+                            self.stats.reset_time += time.perf_counter() - start
+
+    def close(self) -> None:
+        """
+        Stop the background thread and drop the idle instances.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+            self._ready.notify_all()
+
+        self._tasks.put(self)
+        self._worker.join()
+        del idle
+
+    def __len__(self) -> int:
+        return len(self._idle)
@@ -0,0 +1,502 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import multiprocessing
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import List
+
+# Frames exchanged over the pipes, after the length prefix of
+# Connection.send_bytes():
+#   request:  call id (u32), name length (u16), name, values
+#   response: call id (u32), status (u8), values or utf-8 error message
+#   values:   count (u8), one kind per value ("q", "Q" or "d"), packed values
+# An empty request asks the worker to exit once the calls sent before are
+# done, a cancel one (_CANCEL, optionally followed by a call id) to exit
+# without running them, except the call with that id. Once started, the
+# worker sends a single status byte, followed by the utf-8 error message when
+# it failed.
+_REQUEST = struct.Struct("<IH")
+_RESPONSE = struct.Struct("<IB")
+_CALL_ID = struct.Struct("<I")
+_CANCEL = b"\0"
+
+STATUS_OK = 0
+# the call failed before running guest code, the worker is still usable
+STATUS_ERROR = 1
+# the guest code trapped, the worker exits and is restarted
+STATUS_TRAP = 2
+
+# delay before restarting a worker that failed to start, doubled after each
+# consecutive failure
+_RESTART_BACKOFF = 0.1
+_MAX_RESTART_BACKOFF = 5.0
+
+
+def _value_kind(value) -> str:
+    if isinstance(value, float):
+        return "d"
+    # an unsigned i64, wrapped back to the signed one by the typed call
+    return "Q" if value >= 1 << 63 else "q"
+
+
+def _encode_values(values) -> bytes:
+    kinds = "".join(_value_kind(value) for value in values)
+    return (
+        bytes([len(kinds)]) + kinds.encode() + struct.pack("<" + kinds, *values)
+    )
+
+
+def _decode_values(frame: bytes, offset: int) -> tuple:
+    count = frame[offset]
+    kinds = frame[offset + 1 : offset + 1 + count].decode()
+    return struct.unpack_from("<" + kinds, frame, offset + 1 + count)
+
+
+def _is_cancel(frame: bytes) -> bool:
+    # shorter than any call request
+    return 0 < len(frame) < _REQUEST.size
+
+
+def _cancel_request(inflight: dict) -> bytes:
+    # the oldest call of a worker may be running, it is kept
+    for call_id in inflight:
+        return _CANCEL + _CALL_ID.pack(call_id)
+    return _CANCEL
+
+
+def _worker_main(
+    conn, module_path: str, engine_options: dict, stack_size: int, heap_size: int
+) -> None:
+    try:
+        from wamr.wamrapi.wamr import Engine
+        from wamr.wamrapi.wamr import Instance
+        from wamr.wamrapi.wamr import Module
+
+        engine = Engine(**engine_options)
+        # a private copy-on-write mapping, the pages stay shared with the page
+        # cache and the other workers as long as the runtime does not write
+        # them
+        module = Module.from_file(engine, module_path)
+        instance = Instance(module, stack_size, heap_size)
+    except Exception as e:
+        conn.send_bytes(bytes([STATUS_ERROR]) + str(e).encode())
+        conn.close()
+        return
+    conn.send_bytes(bytes([STATUS_OK]))
+    functions = {}
+    queued = deque()
+
+    while True:
+        try:
+            if not queued:
+                queued.append(conn.recv_bytes())
+            # read ahead, a cancel request skips the calls sent before it
+            while conn.poll():
+                queued.append(conn.recv_bytes())
+        except EOFError:
+            break
+        if _is_cancel(queued[-1]):
+            # only the call the pool kept runs, if it did not already
+            kept = queued[-1][1:]
+            queued = deque(
+                frame
+                for frame in queued
+                if kept and not _is_cancel(frame) and frame[: _CALL_ID.size] == kept
+            )
+            queued.append(b"")
+        frame = queued.popleft()
+        if not frame:
+            break
+
+        call_id, name_len = _REQUEST.unpack_from(frame)
+        offset = _REQUEST.size + name_len
+        try:
+            name = frame[_REQUEST.size : offset].decode()
+            func = functions.get(name)
+            if func is None:
+                func = functions[name] = instance.exports[name]
+            args = _decode_values(frame, offset)
+        except Exception as e:
+            conn.send_bytes(
+                _RESPONSE.pack(call_id, STATUS_ERROR) + str(e).encode()
+            )
+            continue
+
+        try:
+            results = func(*args)
+        except struct.error as e:
+            conn.send_bytes(
+                _RESPONSE.pack(call_id, STATUS_ERROR) + str(e).encode()
+            )
+            continue
+        except Exception as e:
+            conn.send_bytes(_RESPONSE.pack(call_id, STATUS_TRAP) + str(e).encode())
+            break
+
+        if results is None:
+            results = ()
+        elif not isinstance(results, tuple):
+            results = (results,)
+        conn.send_bytes(_RESPONSE.pack(call_id, STATUS_OK) + _encode_values(results))
+
+    conn.close()
+    del functions, instance, module, engine
+
+
+def _set_exception(future: Future, error: Exception) -> None:
+    # unless it was cancelled
+    if future.set_running_or_notify_cancel():
+        future.set_exception(error)
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        # call id -> (future, request frame), in the order they were sent
+        self.inflight = {}
+        self.completed = 0
+        self.restarts = 0
+        # consecutive restarts that failed to start the worker
+        self.failed_starts = 0
+        self.started_at = 0.0
+
+
+class WasmProcessPool(Executor):
+    """
+    Shard calls to the exports of a module over worker processes.
+
+    Every worker starts its own Engine and loads `module_path` with
+    Module.from_file, a copy-on-write mapping of the file, so the pages of
+    the module are shared through the page cache instead of being copied in
+    each process. Calls are sent over pipes in a compact binary framing,
+    only numbers are supported as arguments and results. A worker is
+    restarted when it crashes, failing the calls it was running, or when
+    guest code traps, in which case the calls queued behind the trapping one
+    are sent again to the new worker.
+
+    The constructor waits for every worker to load the module and raises if
+    one of them fails, within `startup_timeout` seconds. A worker failing to
+    restart is retried with an exponential backoff, `max_restarts` times in
+    a row, after which the pool is broken: the pending calls fail with
+    BrokenProcessPool and so does `submit`.
+
+    `submit(name, *args)` returns a Future, `map` is inherited from Executor.
+    i64 arguments may be signed or unsigned. Futures stay pending until their
+    result arrives: a call cancelled before may still run in its worker, its
+    result is then dropped, and `shutdown(cancel_futures=True)` cancels the
+    calls queued behind the running one of each worker, which never run.
+    """
+
+    def __init__(
+        self,
+        module_path: str,
+        workers: int | None = None,
+        stack_size: int = 65536,
+        heap_size: int = 16384,
+        engine_options: dict | None = None,
+        max_restarts: int = 5,
+        startup_timeout: float = 60.0,
+    ):
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers <= 0:
+            raise ValueError("workers must be greater than 0")
+        if max_restarts < 0:
+            raise ValueError("max_restarts must be greater than or equal to 0")
+
+        self.module_path = str(module_path)
+        self.stack_size = stack_size
+        self.heap_size = heap_size
+        self.engine_options = engine_options or {}
+        self.max_restarts = max_restarts
+        self.startup_timeout = startup_timeout
+        # the parent may already run a runtime and threads, do not fork it
+        self._context = multiprocessing.get_context("spawn")
+        self._next_call_id = 0
+        self._lock = threading.Lock()
+        self._shutdown = False
+        # shut down with cancel_futures
+        self._cancelled = False
+        self._broken = None
+        self._workers = [_Worker(i) for i in range(workers)]
+
+        # start all the workers before waiting for any of them
+        started = [self._spawn(worker) for worker in self._workers]
+        errors = [self._handshake(process, conn) for process, conn in started]
+        for worker, error in zip(self._workers, errors):
+            if error is not None:
+                for process, conn in started:
+                    process.terminate()
+                    process.join()
+                    conn.close()
+                raise Exception(f"Error while starting worker {worker.index}: {error}")
+        for worker, (process, conn) in zip(self._workers, started):
+            self._run(worker, process, conn)
+
+    def _spawn(self, worker: _Worker):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.module_path,
+                self.engine_options,
+                self.stack_size,
+                self.heap_size,
+            ),
+            name=f"wamr-worker-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return process, parent_conn
+
+    def _handshake(self, process, conn) -> str | None:
+        """
+        Wait for a spawned worker to be ready, the error otherwise.
+        """
+        try:
+            if not conn.poll(self.startup_timeout):
+                process.terminate()
+                process.join()
+                return f"not started after {self.startup_timeout} seconds"
+            frame = conn.recv_bytes()
+        except (EOFError, OSError):
+            process.join()
+            return f"exited with code {process.exitcode}"
+
+        if frame[0] != STATUS_OK:
+            process.join()
+            return frame[1:].decode()
+        return None
+
+    def _run(self, worker: _Worker, process, conn) -> None:
+        """
+        Hand a started worker its calls, the ones queued while it was
+        restarting are sent first.
+        """
+        with worker.lock:
+            worker.process = process
+            worker.conn = conn
+            worker.started_at = time.monotonic()
+            worker.completed = 0
+            for _, frame in worker.inflight.values():
+                conn.send_bytes(frame)
+            if self._shutdown:
+                # shut down while restarting
+                conn.send_bytes(
+                    _cancel_request(worker.inflight) if self._cancelled else b""
+                )
+        threading.Thread(
+            target=self._reader,
+            args=(worker, conn),
+            name=f"wamr-worker-{worker.index}-reader",
+            daemon=True,
+        ).start()
+
+    def _reader(self, worker: _Worker, conn) -> None:
+        while True:
+            try:
+                frame = conn.recv_bytes()
+            except (EOFError, OSError):
+                self._on_exit(worker, trapped=False)
+                return
+
+            call_id, status = _RESPONSE.unpack_from(frame)
+            with worker.lock:
+                future, _ = worker.inflight.pop(call_id)
+                worker.completed += 1
+
+            if status == STATUS_OK:
+                results = _decode_values(frame, _RESPONSE.size)
+                if not results:
+                    results = None
+                elif len(results) == 1:
+                    results = results[0]
+                if future.set_running_or_notify_cancel():
+                    future.set_result(results)
+                continue
+
+            message = frame[_RESPONSE.size :].decode()
+            _set_exception(future, Exception(message))
+            if status == STATUS_TRAP:
+                self._on_exit(worker, trapped=True)
+                return
+
+    def _on_exit(self, worker: _Worker, trapped: bool) -> None:
+        with worker.lock:
+            worker.process.join()
+            worker.conn.close()
+            # calls submitted until the restart are queued in `inflight`
+            worker.conn = None
+            if self._shutdown:
+                pending = list(worker.inflight.values())
+                worker.inflight.clear()
+                error = self._broken or Exception("WasmProcessPool is shut down")
+            elif trapped:
+                # the calls behind the trapping one never ran, they are sent
+                # to the fresh worker
+                pending = []
+            else:
+                pending = list(worker.inflight.values())
+                worker.inflight.clear()
+                error = Exception(
+                    f"Worker {worker.index} exited with code {worker.process.exitcode}"
+                )
+
+        for future, _ in pending:
+            _set_exception(future, error)
+        if self._shutdown:
+            self._fail_pending(
+                worker, self._broken or Exception("WasmProcessPool is shut down")
+            )
+        else:
+            # the reader only delivers results, spawning the new worker and
+            # its backoff may take seconds
+            threading.Thread(
+                target=self._restart,
+                args=(worker,),
+                name=f"wamr-worker-{worker.index}-restart",
+                daemon=True,
+            ).start()
+
+    def _restart(self, worker: _Worker) -> None:
+        while True:
+            worker.restarts += 1
+            process, conn = self._spawn(worker)
+            error = self._handshake(process, conn)
+            if error is None:
+                worker.failed_starts = 0
+                self._run(worker, process, conn)
+                return
+
+            conn.close()
+            worker.failed_starts += 1
+            if worker.failed_starts > self.max_restarts:
+                self._break(
+                    f"Worker {worker.index} failed to restart "
+                    f"{worker.failed_starts} times: {error}"
+                )
+                return
+            time.sleep(
+                min(
+                    _RESTART_BACKOFF * 2 ** (worker.failed_starts - 1),
+                    _MAX_RESTART_BACKOFF,
+                )
+            )
+            if self._shutdown:
+                self._fail_pending(
+                    worker, self._broken or Exception("WasmProcessPool is shut down")
+                )
+                return
+
+    def _fail_pending(self, worker: _Worker, error: Exception) -> None:
+        with worker.lock:
+            pending = list(worker.inflight.values())
+            worker.inflight.clear()
+        for future, _ in pending:
+            _set_exception(future, error)
+
+    def _break(self, message: str) -> None:
+        """
+        Fail every pending call, stop the other workers and refuse new
+        calls, like a broken ProcessPoolExecutor.
+        """
+        error = BrokenProcessPool(message)
+        with self._lock:
+            self._broken = error
+            self._shutdown = True
+
+        for worker in self._workers:
+            with worker.lock:
+                if worker.conn is not None:
+                    try:
+                        worker.conn.send_bytes(b"")
+                    except OSError:
+                        pass
+            self._fail_pending(worker, error)
+
+    def submit(self, fn: str, /, *args, **kwargs) -> Future:
+        if kwargs:
+            raise TypeError("wasm calls do not take keyword arguments")
+
+        name = fn.encode()
+        with self._lock:
+            if self._broken is not None:
+                raise BrokenProcessPool(str(self._broken))
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            call_id = self._next_call_id
+            self._next_call_id = (call_id + 1) & 0xFFFFFFFF
+
+        frame = _REQUEST.pack(call_id, len(name)) + name + _encode_values(args)
+        # pending until its result arrives, a call cancelled in the meantime
+        # may still run in its worker but its result is dropped
+        future = Future()
+
+        worker = min(self._workers, key=lambda worker: len(worker.inflight))
+        with worker.lock:
+            worker.inflight[call_id] = (future, frame)
+            if worker.conn is not None:
+                try:
+                    worker.conn.send_bytes(frame)
+                except OSError:
+                    # the reader of the worker fails the future and restarts it
+                    pass
+        return future
+
+    def call(self, name: str, *args):
+        return self.submit(name, *args).result()
+
+    def stats(self) -> List[dict]:
+        """
+        Per-worker counters: calls completed by the current process and
+        its throughput in calls per second, queue depth and restarts.
+        """
+        now = time.monotonic()
+        return [
+            {
+                "pid": worker.process.pid,
+                "completed": worker.completed,
+                "throughput": worker.completed / max(now - worker.started_at, 1e-9),
+                "queue_depth": len(worker.inflight),
+                "restarts": worker.restarts,
+            }
+            for worker in self._workers
+        ]
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._cancelled = cancel_futures
+
+        for worker in self._workers:
+            with worker.lock:
+                if cancel_futures:
+                    # the oldest call of a worker may be running, the others
+                    # are queued behind it and skipped by the worker
+                    for future, _ in list(worker.inflight.values())[1:]:
+                        future.cancel()
+                if worker.conn is None:
+                    continue
+                try:
+                    worker.conn.send_bytes(
+                        _cancel_request(worker.inflight) if cancel_futures else b""
+                    )
+                except OSError:
+                    pass
+
+        if wait:
+            for worker in self._workers:
+                worker.process.join()
@@ -0,0 +1,252 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+from typing import Dict
+from typing import List
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class LatencyHistogram:
+    """
+    An HDR-style histogram of latencies in nanoseconds.
+
+    Values below 2**significant_bits are counted exactly, larger ones in
+    log-linear buckets: every power of two is split into
+    2**(significant_bits - 1) buckets, so a value is known within
+    1 / 2**(significant_bits - 1) of its magnitude whatever the range. Only
+    the buckets in use are stored.
+    """
+
+    __slots__ = ["significant_bits", "counts", "count", "total", "min", "max"]
+
+    def __init__(self, significant_bits: int = 7):
+        if not 1 < significant_bits < 16:
+            raise ValueError("significant_bits must be between 2 and 15")
+        self.significant_bits = significant_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        bits = self.significant_bits
+        shift = value.bit_length() - bits
+        if shift <= 0:
+            return value
+        half = 1 << (bits - 1)
+        return (1 << bits) + (shift - 1) * half + (value >> shift) - half
+
+    def _highest_value(self, index: int) -> int:
+        bits = self.significant_bits
+        if index < 1 << bits:
+            return index
+        half = 1 << (bits - 1)
+        shift, mantissa = divmod(index - (1 << bits), half)
+        shift += 1
+        return ((mantissa + half + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        index = self._index(value)
+        counts = self.counts
+        counts[index] = counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def value_at_quantile(self, quantile: float) -> int:
+        """
+        The highest value of the bucket holding the `quantile`, capped by the
+        largest recorded value.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, int(quantile * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    def copy(self) -> "LatencyHistogram":
+        histogram = LatencyHistogram(self.significant_bits)
+        histogram.counts = dict(self.counts)
+        histogram.count = self.count
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+
+class FunctionStats:
+    """
+    The calls of an export made through the bindings, recorded while
+    profiling is enabled on its instance.
+    """
+
+    __slots__ = ["calls", "errors", "histogram"]
+
+    def __init__(self, significant_bits: int = 7):
+        self.calls = 0
+        self.errors = 0
+        self.histogram = LatencyHistogram(significant_bits)
+
+    def record(self, elapsed: int, failed: bool = False) -> None:
+        self.calls += 1
+        if failed:
+            self.errors += 1
+        self.histogram.record(elapsed)
+
+
+class FunctionProfile:
+    """
+    The profile of an export.
+
+    - `calls`, `errors`: calls made through the bindings and those which
+      trapped.
+    - `total_time`: their cumulative wall-clock time, in seconds.
+    - `self_time`: the time the runtime spent in the function itself,
+      without its callees, in seconds. None unless the runtime is built
+      with WAMR_BUILD_PERF_PROFILING=1. It also covers the calls made from
+      inside the module.
+    - `latency`: the LatencyHistogram of the calls.
+    """
+
+    __slots__ = ["name", "calls", "errors", "total_time", "self_time", "latency"]
+
+    def __init__(
+        self,
+        name: str,
+        calls: int,
+        errors: int,
+        total_time: float,
+        self_time: float | None,
+        latency: LatencyHistogram,
+    ):
+        self.name = name
+        self.calls = calls
+        self.errors = errors
+        self.total_time = total_time
+        self.self_time = self_time
+        self.latency = latency
+
+    def quantiles(self) -> Dict[float, float]:
+        """
+        The latency quantiles, in seconds.
+        """
+        return {q: self.latency.value_at_quantile(q) / 1e9 for q in QUANTILES}
+
+    def to_dict(self) -> dict:
+        latency = self.latency
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "self_time": self.self_time,
+            "latency": {
+                "min": (latency.min or 0) / 1e9,
+                "max": latency.max / 1e9,
+                "mean": latency.total / latency.count / 1e9 if latency.count else 0.0,
+                **{f"p{q * 100:g}": value for q, value in self.quantiles().items()},
+            },
+        }
+
+    def __repr__(self):
+        return (
+            f"<FunctionProfile {self.name} calls={self.calls} "
+            f"total_time={self.total_time:.6f}>"
+        )
+
+
+class Profile:
+    """
+    A snapshot of the profile of an instance, returned by Instance.profile().
+    `functions` maps export names to their FunctionProfile and `exec_time`
+    is the time spent in all the wasm functions, in seconds, when the runtime
+    is built with WAMR_BUILD_PERF_PROFILING=1.
+    """
+
+    def __init__(self, functions: Dict[str, FunctionProfile], exec_time: float | None):
+        self.functions = functions
+        self.exec_time = exec_time
+
+    def __getitem__(self, name: str) -> FunctionProfile:
+        return self.functions[name]
+
+    def to_dict(self) -> dict:
+        return {
+            "exec_time": self.exec_time,
+            "functions": {
+                name: function.to_dict() for name, function in self.functions.items()
+            },
+        }
+
+    def to_json(self, **kwargs) -> str:
+        import json
+
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix: str = "wamr", labels: dict | None = None) -> str:
+        """
+        The profile in the Prometheus text exposition format: a counter of
+        calls and errors per export, a summary of their latency and, when
+        known, a counter of their self time.
+        """
+        common = "".join(
+            f'{key}="{_escape_label(str(value))}",'
+            for key, value in (labels or {}).items()
+        )
+        calls: List[str] = []
+        errors: List[str] = []
+        latency: List[str] = []
+        self_time: List[str] = []
+        for name, function in self.functions.items():
+            label = f'{common}export="{_escape_label(name)}"'
+            calls.append(f"{prefix}_export_calls_total{{{label}}} {function.calls}")
+            errors.append(f"{prefix}_export_errors_total{{{label}}} {function.errors}")
+            for q, value in function.quantiles().items():
+                latency.append(
+                    f'{prefix}_export_latency_seconds{{{label},quantile="{q:g}"}} '
+                    f"{value:.9g}"
+                )
+            latency.append(
+                f"{prefix}_export_latency_seconds_sum{{{label}}} "
+                f"{function.total_time:.9g}"
+            )
+            latency.append(
+                f"{prefix}_export_latency_seconds_count{{{label}}} {function.calls}"
+            )
+            if function.self_time is not None:
+                self_time.append(
+                    f"{prefix}_export_self_seconds_total{{{label}}} "
+                    f"{function.self_time:.9g}"
+                )
+
+        lines = [
+            f"# HELP {prefix}_export_calls_total Calls of the export.",
+            f"# TYPE {prefix}_export_calls_total counter",
+            *calls,
+            f"# HELP {prefix}_export_errors_total Calls of the export which trapped.",
+            f"# TYPE {prefix}_export_errors_total counter",
+            *errors,
+            f"# HELP {prefix}_export_latency_seconds Wall-clock latency of the calls.",
+            f"# TYPE {prefix}_export_latency_seconds summary",
+            *latency,
+        ]
+        if self_time:
+            lines += [
+                f"# HELP {prefix}_export_self_seconds_total Time spent in the "
+                "function, without its callees.",
+                f"# TYPE {prefix}_export_self_seconds_total counter",
+                *self_time,
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
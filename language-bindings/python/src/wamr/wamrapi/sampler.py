@@ -0,0 +1,152 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+from wamr.wamrapi.wamr import Engine
+from wamr.wamrapi.wamr import EngineMemoryInfo
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import InstanceMemoryInfo
+
+
+class MemorySample(NamedTuple):
+    """
+    The memory of the engine and of the tracked instances at `time`
+    (seconds since the epoch). Instances are keyed by their tracking name.
+    """
+
+    time: float
+    engine: EngineMemoryInfo | None
+    instances: Dict[str, InstanceMemoryInfo]
+
+
+class _Watermark:
+    __slots__ = ["fraction", "callback", "triggered"]
+
+    def __init__(self, fraction: float, callback: Callable):
+        self.fraction = fraction
+        self.callback = callback
+        self.triggered = False
+
+
+class MemorySampler:
+    """
+    Record the memory of an Engine and of some of its instances over time.
+
+    A background thread, started by `start()` or by entering the sampler as
+    a context manager, takes a sample every `interval` seconds and keeps the
+    last `max_samples`. Instances are tracked weakly, they leave the samples
+    once deleted. Watermarks call `callback(sample, fraction)` from the
+    sampling thread when the used fraction of the memory pool reaches
+    `fraction`, and are re-armed once the usage falls below it again.
+    Exceptions raised by callbacks are counted in `errors`. An exception
+    raised while sampling stops the thread, it is kept in `exception` and
+    raised again by `stop()`.
+    """
+
+    def __init__(self, engine: Engine, interval: float = 1.0, max_samples: int = 3600):
+        if interval <= 0:
+            raise ValueError("interval must be greater than 0")
+
+        self.engine = engine
+        self.interval = interval
+        self.errors = 0
+        self.exception: BaseException | None = None
+        self._samples = deque(maxlen=max_samples)
+        self._instances = weakref.WeakKeyDictionary()
+        self._watermarks: List[_Watermark] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> "MemorySampler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def track(self, instance: Instance, name: str | None = None) -> None:
+        with self._lock:
+            self._instances[instance] = name or f"instance-{id(instance):x}"
+
+    def untrack(self, instance: Instance) -> None:
+        with self._lock:
+            self._instances.pop(instance, None)
+
+    def add_watermark(
+        self, fraction: float, callback: Callable[[MemorySample, float], None]
+    ) -> None:
+        if not 0 < fraction <= 1:
+            raise ValueError("fraction must be between 0 and 1")
+        with self._lock:
+            self._watermarks.append(_Watermark(fraction, callback))
+
+    def sample(self) -> MemorySample:
+        """
+        Take a sample now, record it and check the watermarks.
+        """
+        with self._lock:
+            instances = list(self._instances.items())
+            watermarks = list(self._watermarks)
+
+        sample = MemorySample(
+            time.time(),
+            self.engine.memory_info(),
+            {name: instance.memory_info() for instance, name in instances},
+        )
+        del instances
+        with self._lock:
+            self._samples.append(sample)
+
+        if sample.engine is not None and sample.engine.total_size:
+            usage = sample.engine.used_size / sample.engine.total_size
+            for watermark in watermarks:
+                if usage < watermark.fraction:
+                    watermark.triggered = False
+                elif not watermark.triggered:
+                    watermark.triggered = True
+                    try:
+                        watermark.callback(sample, watermark.fraction)
+                    except Exception:
+                        self.errors += 1
+        return sample
+
+    @property
+    def samples(self) -> List[MemorySample]:
+        with self._lock:
+            return list(self._samples)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.exception = e
+                return
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.exception = None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="wamr-memory-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self.exception is not None:
+            raise self.exception
@@ -1,21 +1,48 @@
 # Copyright (C) 2019 Intel Corporation.  All rights reserved.
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 
+import array
+import inspect
+import struct
+import threading
+import time
+import weakref
 from ctypes import Array
 from ctypes import addressof
+from ctypes import byref
+from ctypes import c_bool
 from ctypes import c_char
+from ctypes import c_char_p
+from ctypes import c_double
+from ctypes import c_float
+from ctypes import c_int32
+from ctypes import c_int64
 from ctypes import c_uint
 from ctypes import c_uint8
 from ctypes import c_uint64
 from ctypes import c_void_p
 from ctypes import cast
+from ctypes import memmove
 from ctypes import create_string_buffer
+from ctypes import c_uint32
+from ctypes import CFUNCTYPE
 from ctypes import POINTER
 from ctypes import pointer
+from typing import Annotated
+from typing import Callable
 from typing import List
+from typing import NamedTuple
 from typing import Tuple
+from typing import get_type_hints
+from wamr.filestore import map_file
+from wamr.wamrapi.profiling import FunctionProfile
+from wamr.wamrapi.profiling import FunctionStats
+from wamr.wamrapi.profiling import LatencyHistogram
+from wamr.wamrapi.profiling import Profile
 from wamr.wamrapi.iwasm import String
+from wamr.wamrapi.iwasm import Alloc_With_Allocator
 from wamr.wamrapi.iwasm import Alloc_With_Pool
+from wamr.wamrapi.iwasm import Alloc_With_System_Allocator
 from wamr.wamrapi.iwasm import RuntimeInitArgs
 from wamr.wamrapi.iwasm import wasm_exec_env_t
 from wamr.wamrapi.iwasm import wasm_function_inst_t
@@ -29,11 +56,14 @@ from wamr.wamrapi.iwasm import wasm_runtime_destroy_exec_env
 from wamr.wamrapi.iwasm import wasm_runtime_full_init
 from wamr.wamrapi.iwasm import wasm_runtime_instantiate
 from wamr.wamrapi.iwasm import wasm_runtime_load
+from wamr.wamrapi.iwasm import wasm_runtime_load_from_sections
+from wamr.wamrapi.iwasm import wasm_section_t
 from wamr.wamrapi.iwasm import wasm_runtime_lookup_function
 from wamr.wamrapi.iwasm import wasm_runtime_unload
 from wamr.wamrapi.iwasm import wasm_runtime_module_malloc
 from wamr.wamrapi.iwasm import wasm_runtime_module_free
 from wamr.wamrapi.iwasm import wasm_runtime_register_natives
+from wamr.wamrapi.iwasm import wasm_runtime_set_exception
 from wamr.wamrapi.iwasm import NativeSymbol
 from wamr.wamrapi.iwasm import wasm_runtime_start_debug_instance
 from wamr.wamrapi.iwasm import wasm_runtime_call_indirect
@@ -41,85 +71,888 @@ from wamr.wamrapi.iwasm import wasm_runtime_get_module_inst
 from wamr.wamrapi.iwasm import wasm_runtime_addr_app_to_native
 from wamr.wamrapi.iwasm import wasm_runtime_addr_native_to_app
 from wamr.wamrapi.iwasm import wasm_runtime_set_wasi_args
+from wamr.wamrapi.iwasm import wasm_export_t
+from wamr.wamrapi.iwasm import wasm_import_t
+from wamr.wamrapi.iwasm import wasm_func_type_get_param_count
+from wamr.wamrapi.iwasm import wasm_func_type_get_param_valkind
+from wamr.wamrapi.iwasm import wasm_func_type_get_result_count
+from wamr.wamrapi.iwasm import wasm_func_type_get_result_valkind
+from wamr.wamrapi.iwasm import wasm_runtime_clear_exception
+from wamr.wamrapi.iwasm import wasm_runtime_get_exception
+from wamr.wamrapi.iwasm import wasm_runtime_get_exec_env_singleton
+from wamr.wamrapi.iwasm import wasm_runtime_get_export_count
+from wamr.wamrapi.iwasm import wasm_runtime_get_export_type
+from wamr.wamrapi.iwasm import wasm_runtime_get_import_count
+from wamr.wamrapi.iwasm import wasm_runtime_get_import_type
+from wamr.wamrapi.iwasm import wasm_runtime_get_module
+from wamr.wamrapi.iwasm import WASM_F32
+from wamr.wamrapi.iwasm import WASM_F64
+from wamr.wamrapi.iwasm import WASM_I32
+from wamr.wamrapi.iwasm import WASM_I64
+from wamr.wamrapi.iwasm import WASM_IMPORT_EXPORT_KIND_FUNC
+from wamr.wamrapi.iwasm import WASM_IMPORT_EXPORT_KIND_GLOBAL
+from wamr.wamrapi.iwasm import WASM_IMPORT_EXPORT_KIND_MEMORY
+from wamr.wamrapi.iwasm import WASM_IMPORT_EXPORT_KIND_TABLE
+from wamr.wamrapi.iwasm import Mode_Fast_JIT
+from wamr.wamrapi.iwasm import Mode_Interp
+from wamr.wamrapi.iwasm import Mode_LLVM_JIT
+from wamr.wamrapi.iwasm import Mode_Multi_Tier_JIT
+from wamr.wamrapi.iwasm import WASM_LOG_LEVEL_DEBUG
+from wamr.wamrapi.iwasm import WASM_LOG_LEVEL_ERROR
+from wamr.wamrapi.iwasm import WASM_LOG_LEVEL_FATAL
+from wamr.wamrapi.iwasm import WASM_LOG_LEVEL_VERBOSE
+from wamr.wamrapi.iwasm import WASM_LOG_LEVEL_WARNING
+from wamr.wamrapi.iwasm import wasm_runtime_is_running_mode_supported
+from wamr.wamrapi.iwasm import wasm_runtime_get_running_mode
+from wamr.wamrapi.iwasm import wasm_runtime_set_running_mode
+from wamr.wamrapi.iwasm import wasm_runtime_set_log_level
+from wamr.wamrapi.iwasm import wasm_memory_enlarge
+from wamr.wamrapi.iwasm import wasm_memory_get_base_address
+from wamr.wamrapi.iwasm import wasm_memory_get_bytes_per_page
+from wamr.wamrapi.iwasm import wasm_memory_get_cur_page_count
+from wamr.wamrapi.iwasm import wasm_memory_get_max_page_count
+from wamr.wamrapi.iwasm import wasm_memory_inst_t
+from wamr.wamrapi.iwasm import wasm_runtime_enlarge_memory
+from wamr.wamrapi.iwasm import wasm_runtime_get_default_memory
+from wamr.wamrapi.iwasm import wasm_runtime_get_memory
+from wamr.wamrapi.iwasm import wasm_func_get_param_count
+from wamr.wamrapi.iwasm import wasm_func_get_param_types
+from wamr.wamrapi.iwasm import wasm_func_get_result_count
+from wamr.wamrapi.iwasm import wasm_func_get_result_types
+from wamr.wamrapi.iwasm import wasm_runtime_destroy_thread_env
+from wamr.wamrapi.iwasm import wasm_runtime_init_thread_env
+from wamr.wamrapi.iwasm import wasm_runtime_thread_env_inited
+from wamr.wamrapi.iwasm import wasm_runtime_terminate
+from wamr.wamrapi.iwasm import mem_alloc_info_t
+from wamr.wamrapi.iwasm import wasm_runtime_get_mem_alloc_info
 
-ID_TO_EXEC_ENV_MAPPING = {}
+try:
+    from wamr.wamrapi.iwasm import wasm_runtime_set_instruction_count_limit
+except ImportError:
+    # only exported by runtimes built with WAMR_BUILD_INSTRUCTION_METERING=1
+    wasm_runtime_set_instruction_count_limit = None
+
+try:
+    from wamr.wamrapi.iwasm import SharedHeapInitArgs
+    from wamr.wamrapi.iwasm import wasm_runtime_attach_shared_heap
+    from wamr.wamrapi.iwasm import wasm_runtime_chain_shared_heaps
+    from wamr.wamrapi.iwasm import wasm_runtime_create_shared_heap
+    from wamr.wamrapi.iwasm import wasm_runtime_detach_shared_heap
+    from wamr.wamrapi.iwasm import wasm_runtime_shared_heap_free
+    from wamr.wamrapi.iwasm import wasm_runtime_shared_heap_malloc
+except ImportError:
+    # only exported by runtimes built with WAMR_BUILD_SHARED_HEAP=1
+    wasm_runtime_create_shared_heap = None
+
+try:
+    from wamr.wamrapi.iwasm import wasm_runtime_get_wasm_func_exec_time
+    from wamr.wamrapi.iwasm import wasm_runtime_sum_wasm_exec_time
+except ImportError:
+    # only exported by runtimes built with WAMR_BUILD_PERF_PROFILING=1
+    wasm_runtime_get_wasm_func_exec_time = None
+
+try:
+    from wamr.wamrapi.iwasm import wasm_runtime_get_app_heap_alloc_info
+except ImportError:
+    # bindings generated from an older wasm_export.h
+    wasm_runtime_get_app_heap_alloc_info = None
+
+# weak, so that registering an ExecEnv does not keep it (and its Instance)
+# alive forever
+ID_TO_EXEC_ENV_MAPPING = weakref.WeakValueDictionary()
+# ExecEnvs are created and destroyed from several threads
+ID_TO_EXEC_ENV_MAPPING_LOCK = threading.Lock()
+
+ALLOCATORS = {
+    "pool": Alloc_With_Pool,
+    "allocator": Alloc_With_Allocator,
+    "system": Alloc_With_System_Allocator,
+}
+
+RUNNING_MODES = {
+    "interp": Mode_Interp,
+    "fast-jit": Mode_Fast_JIT,
+    "llvm-jit": Mode_LLVM_JIT,
+    "multi-tier-jit": Mode_Multi_Tier_JIT,
+}
+
+
+def _check_running_mode(running_mode: str) -> None:
+    if running_mode not in RUNNING_MODES:
+        raise ValueError(
+            f"Unknown running mode {running_mode!r}, "
+            f"expected one of {list(RUNNING_MODES)}"
+        )
+    if not wasm_runtime_is_running_mode_supported(RUNNING_MODES[running_mode]):
+        raise ValueError(f"Running mode {running_mode!r} is not supported")
+
+
+def supported_running_modes() -> List[str]:
+    """
+    The running modes libiwasm is built with, in the order of RUNNING_MODES.
+    """
+    return [
+        name
+        for name, mode in RUNNING_MODES.items()
+        if wasm_runtime_is_running_mode_supported(mode)
+    ]
+
+
+LOG_LEVELS = {
+    "fatal": WASM_LOG_LEVEL_FATAL,
+    "error": WASM_LOG_LEVEL_ERROR,
+    "warning": WASM_LOG_LEVEL_WARNING,
+    "debug": WASM_LOG_LEVEL_DEBUG,
+    "verbose": WASM_LOG_LEVEL_VERBOSE,
+}
+
+IMPORT_EXPORT_KINDS = {
+    WASM_IMPORT_EXPORT_KIND_FUNC: "func",
+    WASM_IMPORT_EXPORT_KIND_TABLE: "table",
+    WASM_IMPORT_EXPORT_KIND_MEMORY: "memory",
+    WASM_IMPORT_EXPORT_KIND_GLOBAL: "global",
+}
+
+UINT32_MAX = 0xFFFFFFFF
+
+# struct format of a value kind once stored in the 32-bit argv cells
+VALKIND_TO_STRUCT_FORMAT = {
+    WASM_I32: "i",
+    WASM_I64: "q",
+    WASM_F32: "f",
+    WASM_F64: "d",
+}
+
+# bit width of the integer value kinds, their arguments may be unsigned too
+VALKIND_INT_BITS = {
+    WASM_I32: 32,
+    WASM_I64: 64,
+}
+
+# Type hints of host functions, a plain `int` is an i32 and a `float` an f64
+i32 = Annotated[int, WASM_I32]
+i64 = Annotated[int, WASM_I64]
+f32 = Annotated[float, WASM_F32]
+f64 = Annotated[float, WASM_F64]
+
+# value kind -> (signature char, ctypes type) of host function values
+VALKIND_TO_NATIVE = {
+    WASM_I32: ("i", c_int32),
+    WASM_I64: ("I", c_int64),
+    WASM_F32: ("f", c_float),
+    WASM_F64: ("F", c_double),
+}
+
+# `wasm_runtime_call_wasm` bound once to plain addresses, which skips the
+# pointer type checks of the generated prototype on hot call paths
+_call_wasm_raw = CFUNCTYPE(c_bool, c_void_p, c_void_p, c_uint32, c_void_p)(
+    cast(wasm_runtime_call_wasm, c_void_p).value
+)
+# the same for `wasm_runtime_addr_app_to_native`, returning a plain int
+_addr_app_to_native_raw = CFUNCTYPE(c_void_p, c_void_p, c_uint64)(
+    cast(wasm_runtime_addr_app_to_native, c_void_p).value
+)
+
+
+class EngineConfig(NamedTuple):
+    """
+    The runtime settings an Engine was initialized with.
+    """
+
+    allocator: str
+    pool_size: int | None
+    running_mode: str | None
+    max_thread_num: int | None
+    log_level: str | None
+    ip_addr: str
+    instance_port: int
+
+
+class EngineMemoryInfo(NamedTuple):
+    """
+    The usage of the memory pool of an Engine, in bytes. `highmark_size` is
+    the largest amount ever used.
+    """
+
+    total_size: int
+    free_size: int
+    highmark_size: int
+
+    @property
+    def used_size(self) -> int:
+        return self.total_size - self.free_size
+
+
+class InstanceMemoryInfo(NamedTuple):
+    """
+    The memory of an Instance, in bytes: its default linear memory, the app
+    heap inside it (None without app heap) and the wasm stack reserved for
+    each of its execution environments (None for borrowed instances).
+    """
+
+    memory_size: int
+    memory_pages: int
+    max_memory_pages: int
+    heap_size: int | None
+    heap_free_size: int | None
+    heap_highmark_size: int | None
+    stack_size: int | None
 
 
 class Engine:
-    def __init__(self):
+    """
+    Initialize the WAMR runtime.
+
+    - `allocator`: "pool" allocates from a `pool_size` bytes buffer owned by
+      the Engine, "system" uses the system allocator and "allocator" the
+      `(malloc, realloc, free)` function pointers of `allocator_funcs`.
+    - `running_mode`: the default running mode of the instances, one of
+      `RUNNING_MODES`. It must be supported by libiwasm.
+    - `max_thread_num`: the maximum number of threads of a cluster.
+    - `log_level`: the runtime log level, one of `LOG_LEVELS`.
+    """
+
+    def __init__(
+        self,
+        allocator: str = "pool",
+        pool_size: int | None = None,
+        allocator_funcs: Tuple | None = None,
+        running_mode: str | None = None,
+        max_thread_num: int | None = None,
+        log_level: str | None = None,
+        ip_addr: str = "127.0.0.1",
+        instance_port: int = 1234,
+    ):
         self._native_symbols = dict()
-        self.init_args = self._get_init_args()
-        wasm_runtime_full_init(pointer(self.init_args))
+        # (module name, name) -> everything WAMR points to, kept alive
+        self._host_functions = dict()
+        self._initialized = False
+        self._config = self._validate_config(
+            allocator,
+            pool_size,
+            allocator_funcs,
+            running_mode,
+            max_thread_num,
+            log_level,
+            ip_addr,
+            instance_port,
+        )
+        self.init_args = self._get_init_args(self._config, allocator_funcs)
+        if not wasm_runtime_full_init(pointer(self.init_args)):
+            raise Exception("Error while initializing runtime")
+        self._initialized = True
+
+        if log_level is not None:
+            wasm_runtime_set_log_level(LOG_LEVELS[log_level])
 
     def __del__(self):
         print("deleting Engine")
-        wasm_runtime_destroy()
+        if self._initialized:
+            wasm_runtime_destroy()
+
+    @property
+    def config(self) -> EngineConfig:
+        return self._config
+
+    def memory_info(self) -> EngineMemoryInfo | None:
+        """
+        The usage of the memory pool, None unless the allocator is "pool".
+        """
+        info = mem_alloc_info_t()
+        if not wasm_runtime_get_mem_alloc_info(byref(info)):
+            return None
+        return EngineMemoryInfo(
+            info.total_size, info.total_free_size, info.highmark_size
+        )
+
+    @staticmethod
+    def _validate_config(
+        allocator: str,
+        pool_size: int | None,
+        allocator_funcs: Tuple | None,
+        running_mode: str | None,
+        max_thread_num: int | None,
+        log_level: str | None,
+        ip_addr: str,
+        instance_port: int,
+    ) -> EngineConfig:
+        if allocator not in ALLOCATORS:
+            raise ValueError(
+                f"Unknown allocator {allocator!r}, expected one of {list(ALLOCATORS)}"
+            )
+
+        if allocator == "pool":
+            if pool_size is None:
+                pool_size = 2 * 1024 * 1024
+            if not 0 < pool_size <= UINT32_MAX:
+                raise ValueError(f"Invalid pool_size {pool_size}")
+        elif pool_size is not None:
+            raise ValueError("pool_size is only used by the pool allocator")
+
+        if (allocator == "allocator") != (allocator_funcs is not None):
+            raise ValueError(
+                "allocator_funcs must be given if and only if allocator is 'allocator'"
+            )
+        if allocator_funcs is not None and len(allocator_funcs) != 3:
+            raise ValueError("allocator_funcs must be (malloc, realloc, free)")
+
+        if running_mode is not None:
+            _check_running_mode(running_mode)
+
+        if max_thread_num is not None and not 0 < max_thread_num <= UINT32_MAX:
+            raise ValueError(f"Invalid max_thread_num {max_thread_num}")
+
+        if log_level is not None and log_level not in LOG_LEVELS:
+            raise ValueError(
+                f"Unknown log level {log_level!r}, expected one of {list(LOG_LEVELS)}"
+            )
+
+        if len(ip_addr.encode("utf-8")) >= 128:
+            raise ValueError("ip_addr is too long")
+
+        return EngineConfig(
+            allocator,
+            pool_size,
+            running_mode,
+            max_thread_num,
+            log_level,
+            ip_addr,
+            instance_port,
+        )
 
     def _get_init_args(
-        self,
-        heap_size: int = 1024 * 1024 * 2,
-        ip_addr: str = "127.0.0.1",
-        instance_port: int = 1234,
+        self, config: EngineConfig, allocator_funcs: Tuple | None
     ) -> RuntimeInitArgs:
         init_args = RuntimeInitArgs()
-        init_args.mem_alloc_type = Alloc_With_Pool
-        init_args.mem_alloc_option.pool.heap_buf = cast(
-            (c_char * heap_size)(), c_void_p
-        )
-        init_args.mem_alloc_option.pool.heap_size = heap_size
+        init_args.mem_alloc_type = ALLOCATORS[config.allocator]
+        if config.allocator == "pool":
+            # The runtime uses the buffer until wasm_runtime_destroy
+            self._heap_buf = (c_char * config.pool_size)()
+            init_args.mem_alloc_option.pool.heap_buf = cast(self._heap_buf, c_void_p)
+            init_args.mem_alloc_option.pool.heap_size = config.pool_size
+        elif config.allocator == "allocator":
+            # Keep the function pointers (e.g. CFUNCTYPE objects) alive
+            self._allocator_funcs = allocator_funcs
+            malloc_func, realloc_func, free_func = allocator_funcs
+            option = init_args.mem_alloc_option.allocator
+            option.malloc_func = cast(malloc_func, c_void_p)
+            option.realloc_func = cast(realloc_func, c_void_p)
+            option.free_func = cast(free_func, c_void_p)
+
+        if config.max_thread_num is not None:
+            init_args.max_thread_num = config.max_thread_num
+        if config.running_mode is not None:
+            init_args.running_mode = RUNNING_MODES[config.running_mode]
         # Debug port setting
-        init_args.ip_addr = bytes(ip_addr, "utf-8")
-        init_args.instance_port = instance_port
+        init_args.ip_addr = bytes(config.ip_addr, "utf-8")
+        init_args.instance_port = config.instance_port
         return init_args
 
     def register_natives(
         self, module_name: str, native_symbols: List[NativeSymbol]
     ) -> None:
         module_name = String.from_param(module_name)
-        # WAMR does not copy the symbols. We must store them.
+        symbols = (NativeSymbol * len(native_symbols))(*native_symbols)
+        # WAMR does not copy the symbols, nor the array it is given. We must
+        # store them.
         for native in native_symbols:
-            self._native_symbols[str(native.symbol)] = (module_name, native)
+            self._native_symbols[str(native.symbol)] = (module_name, native, symbols)
 
         if not wasm_runtime_register_natives(
             module_name,
-            cast(
-                (NativeSymbol * len(native_symbols))(*native_symbols),
-                POINTER(NativeSymbol),
-            ),
+            cast(symbols, POINTER(NativeSymbol)),
             len(native_symbols),
         ):
             raise Exception("Error while registering symbols")
 
+    def host_function(self, module_name: str, name: str | None = None):
+        """
+        Decorator registering a Python function as the import `name` (the
+        name of the function by default) of `module_name`:
+
+            @engine.host_function("env")
+            def log_value(value: i64) -> None: ...
+
+        The WAMR signature is inferred from the type hints, see
+        register_host_function(). The function is returned unchanged.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            self.register_host_function(module_name, name or func.__name__, func)
+            return func
+
+        return decorator
+
+    def register_host_function(
+        self, module_name: str, name: str, func: Callable
+    ) -> None:
+        """
+        Register `func` as the import `name` of `module_name`, before loading
+        the modules importing it.
+
+        Parameters are annotated with `int` or `i32`, `i64`, `f32`, `float`
+        or `f64`, or `str` for a NUL-terminated string in the linear memory.
+        The first parameter may be annotated with `ExecEnv` to receive the
+        calling execution environment. The return annotation is one of the
+        numeric types or None. Python exceptions raised by `func` trap the
+        calling wasm code.
+        """
+        key = (module_name, name)
+        if key in self._host_functions:
+            raise ValueError(f"{module_name}.{name} is already registered")
+
+        signature, callback = _make_host_function(func)
+        module_name_c = String.from_param(module_name)
+        symbols = (NativeSymbol * 1)(
+            NativeSymbol(
+                symbol=String.from_param(name),
+                func_ptr=cast(callback, c_void_p),
+                signature=String.from_param(signature),
+            )
+        )
+        if not wasm_runtime_register_natives(module_name_c, symbols, 1):
+            raise Exception("Error while registering symbols")
+        self._host_functions[key] = (module_name_c, symbols, callback)
+
+
+def _make_host_function(func: Callable) -> Tuple[str, "CFUNCTYPE"]:
+    """
+    Build the WAMR signature of `func` from its type hints and a native
+    callback for it, whose ctypes prototype converts the arguments in C.
+
+    The callback is generated for the signature, so that calling it is a
+    plain call with positional arguments and no `*args` packing.
+    """
+    hints = get_type_hints(func, include_extras=True)
+    params = list(inspect.signature(func).parameters)
+    with_env = bool(params) and hints.get(params[0]) is ExecEnv
+    if with_env:
+        params = params[1:]
+
+    signature, argtypes, args = "", [], ["wrap(env)"] if with_env else []
+    for index, param in enumerate(params):
+        hint = hints.get(param)
+        if hint is str:
+            # WAMR validates the string and passes its native address
+            signature += "$"
+            argtypes.append(c_char_p)
+            args.append(f"a{index}.decode()")
+            continue
+        kind = _hint_to_valkind(hint, f"parameter {param} of {func.__name__}")
+        signature += VALKIND_TO_NATIVE[kind][0]
+        argtypes.append(VALKIND_TO_NATIVE[kind][1])
+        args.append(f"a{index}")
+
+    restype = None
+    result_hint = hints.get("return")
+    if result_hint is not None and result_hint is not type(None):
+        kind = _hint_to_valkind(result_hint, f"result of {func.__name__}")
+        signature = f"({signature}){VALKIND_TO_NATIVE[kind][0]}"
+        restype = VALKIND_TO_NATIVE[kind][1]
+    else:
+        signature = f"({signature})"
+
+    def fail(env: int, e: BaseException):
+        module_inst = wasm_runtime_get_module_inst(cast(env, wasm_exec_env_t))
+        wasm_runtime_set_exception(module_inst, f"{type(e).__name__}: {e}")
+        # ignored by WAMR, the call traps
+        return None if restype is None else restype().value
+
+    params_source = "".join(f", a{index}" for index in range(len(params)))
+    source = f"""
+def callback(env{params_source}):
+    try:
+        return func({', '.join(args)})
+    except BaseException as e:
+        return fail(env, e)
+"""
+    namespace = {"func": func, "fail": fail, "wrap": ExecEnv.wrap}
+    exec(source, namespace)
+    prototype = CFUNCTYPE(restype, c_void_p, *argtypes)
+    return signature, prototype(namespace["callback"])
+
+
+def _hint_to_valkind(hint, what: str) -> int:
+    if hint is int:
+        return WASM_I32
+    if hint is float:
+        return WASM_F64
+    metadata = getattr(hint, "__metadata__", ())
+    if metadata and metadata[0] in VALKIND_TO_NATIVE:
+        return metadata[0]
+    raise TypeError(f"Unsupported type hint {hint!r} for the {what}")
+
+
+class ImportType:
+    """
+    An import of a Module. `params` and `results` are the value kinds of a
+    function import, None for the other kinds. `linked` tells whether the
+    runtime resolved a function or global import when the module was loaded.
+    """
+
+    __slots__ = ["module_name", "name", "kind", "linked", "params", "results"]
+
+    def __init__(self, module_name, name, kind, linked, params, results):
+        self.module_name = module_name
+        self.name = name
+        self.kind = kind
+        self.linked = linked
+        self.params = params
+        self.results = results
+
+    def __repr__(self):
+        return f"<ImportType {self.kind} {self.module_name}.{self.name}>"
+
+
+class ExportType:
+    """
+    An export of a Module, `params` and `results` as in ImportType.
+    """
+
+    __slots__ = ["name", "kind", "params", "results"]
+
+    def __init__(self, name, kind, params, results):
+        self.name = name
+        self.kind = kind
+        self.params = params
+        self.results = results
+
+    def __repr__(self):
+        return f"<ExportType {self.kind} {self.name}>"
+
+
+def _func_type_signature(func_type) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    params = tuple(
+        wasm_func_type_get_param_valkind(func_type, i)
+        for i in range(wasm_func_type_get_param_count(func_type))
+    )
+    results = tuple(
+        wasm_func_type_get_result_valkind(func_type, i)
+        for i in range(wasm_func_type_get_result_count(func_type))
+    )
+    return params, results
+
+
+def _read_imports(module: wasm_module_t) -> dict:
+    imports = {}
+    import_type = wasm_import_t()
+    for i in range(wasm_runtime_get_import_count(module)):
+        wasm_runtime_get_import_type(module, i, byref(import_type))
+        params = results = None
+        if import_type.kind == WASM_IMPORT_EXPORT_KIND_FUNC:
+            params, results = _func_type_signature(import_type.u.func_type)
+        # the names point into the module, they are copied
+        record = ImportType(
+            import_type.module_name.data.decode(),
+            import_type.name.data.decode(),
+            IMPORT_EXPORT_KINDS[import_type.kind],
+            import_type.linked,
+            params,
+            results,
+        )
+        imports[(record.module_name, record.name)] = record
+    return imports
+
+
+def _read_exports(module: wasm_module_t) -> dict:
+    exports = {}
+    export_type = wasm_export_t()
+    for i in range(wasm_runtime_get_export_count(module)):
+        wasm_runtime_get_export_type(module, i, byref(export_type))
+        params = results = None
+        if export_type.kind == WASM_IMPORT_EXPORT_KIND_FUNC:
+            params, results = _func_type_signature(export_type.u.func_type)
+        record = ExportType(
+            export_type.name.data.decode(),
+            IMPORT_EXPORT_KINDS[export_type.kind],
+            params,
+            results,
+        )
+        exports[record.name] = record
+    return exports
+
+
+WASM_MAGIC = b"\0asm"
+WASM_VERSION = b"\x01\0\0\0"
+
+# the order of the non-custom sections, as checked by the wasm loader
+SECTION_ORDER = {
+    section_id: index
+    for index, section_id in enumerate([1, 2, 3, 4, 5, 13, 14, 6, 7, 8, 9, 12, 10, 11])
+}
+
+
+class _ChunkReader:
+    """
+    Reads exact amounts from a file-like object with `readinto()` (a file,
+    `socket.makefile("rb")`, an HTTP response...) straight into the given
+    buffer, or else from an iterable of bytes-like chunks.
+    """
+
+    def __init__(self, stream):
+        self._readinto = getattr(stream, "readinto", None)
+        self._chunks = None if self._readinto else iter(stream)
+        self._chunk = memoryview(b"")
+
+    def readinto(self, view: memoryview) -> int:
+        """
+        Fill `view`, return less than its size only at the end of the stream.
+        """
+        filled = 0
+        size = len(view)
+        while filled < size:
+            if self._readinto is not None:
+                n = self._readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+                continue
+
+            if not self._chunk:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._chunk = memoryview(chunk).cast("B")
+                continue
+            n = min(size - filled, len(self._chunk))
+            view[filled : filled + n] = self._chunk[:n]
+            self._chunk = self._chunk[n:]
+            filled += n
+        return filled
+
+    def read(self, size: int) -> bytes:
+        buf = bytearray(size)
+        return bytes(buf[: self.readinto(memoryview(buf))])
+
+
+class _StreamedSections:
+    """
+    The sections of a wasm binary read from a stream, each body in its own
+    native buffer, linked as the wasm_section_t list that
+    wasm_runtime_load_from_sections() takes. The module keeps referring to
+    the bodies, they live as long as this object.
+    """
+
+    def __init__(self, stream):
+        reader = _ChunkReader(stream)
+        self.header = reader.read(8)
+        if self.header[:4] != WASM_MAGIC:
+            raise Exception("Error while creating module: magic header not detected")
+        if self.header[4:] != WASM_VERSION:
+            raise Exception("Error while creating module: unknown binary version")
+
+        # (raw section header, body) in the order of the stream
+        self.sections = []
+        last_index = -1
+        while True:
+            raw_header = reader.read(1)
+            if not raw_header:
+                break
+            section_id = raw_header[0]
+            if section_id:
+                index = SECTION_ORDER.get(section_id)
+                if index is None:
+                    raise Exception("Error while creating module: invalid section id")
+                if index <= last_index:
+                    raise Exception(
+                        "Error while creating module: "
+                        "unexpected content after last section"
+                    )
+                last_index = index
+
+            size, shift = 0, 0
+            while True:
+                byte = reader.read(1)
+                if not byte or shift > 28:
+                    raise Exception("Error while creating module: invalid section size")
+                raw_header += byte
+                size |= (byte[0] & 0x7F) << shift
+                shift += 7
+                if not byte[0] & 0x80:
+                    break
+            if size > UINT32_MAX:
+                raise Exception("Error while creating module: invalid section size")
+
+            body = (c_uint8 * size)()
+            if reader.readinto(memoryview(body).cast("B")) != size:
+                raise Exception("Error while creating module: unexpected end")
+            self.sections.append((raw_header, body))
+
+        self.section_list = None
+        for raw_header, body in reversed(self.sections):
+            section = wasm_section_t()
+            section.next = self.section_list
+            section.section_type = raw_header[0]
+            section.section_body = cast(body, POINTER(c_uint8))
+            section.section_body_size = len(body)
+            self.section_list = pointer(section)
+
+    @property
+    def size(self) -> int:
+        return len(self.header) + sum(
+            len(raw_header) + len(body) for raw_header, body in self.sections
+        )
+
+    def update(self, digest) -> None:
+        """
+        Feed the bytes of the stream to the hash object `digest`.
+        """
+        digest.update(self.header)
+        for raw_header, body in self.sections:
+            digest.update(raw_header)
+            digest.update(body)
+
 
 class Module:
     __create_key = object()
 
     @classmethod
-    def from_file(cls, engine: Engine, fp: str) -> "Module":
-        return Module(cls.__create_key, engine, fp)
+    def from_file(
+        cls, engine: Engine, fp: str, aot_cache: "AotCache | str | None" = None
+    ) -> "Module":
+        """
+        Load a module from a file without copying it into Python memory.
+
+        The file is memory-mapped copy-on-write, since WAMR may write to the
+        buffer while loading; pages are only duplicated if the runtime does.
+
+        With `aot_cache` (an AotCache or its directory), a wasm file is
+        compiled with wamrc on first use and the cached AOT file is loaded
+        instead, see AotCache.load().
+        """
+        if aot_cache is not None:
+            # spares the subprocess and hashing imports to the other users
+            from wamr.wamrapi.aot_cache import AotCache
+
+            if not isinstance(aot_cache, AotCache):
+                aot_cache = AotCache(aot_cache)
+            data = aot_cache.load(fp)
+        else:
+            data = map_file(fp)
+        return Module(cls.__create_key, engine, data)
+
+    @classmethod
+    def from_bytes(cls, engine: Engine, data: bytes) -> "Module":
+        """
+        Load a module from an immutable bytes-like object. The content is
+        copied once into a writable buffer owned by the Module.
+        """
+        return Module(cls.__create_key, engine, bytearray(data))
+
+    @classmethod
+    def from_stream(cls, engine: Engine, stream) -> "Module":
+        """
+        Load a wasm binary from an iterable of bytes-like chunks, or from a
+        file-like object with `readinto()` such as `socket.makefile("rb")`.
 
-    def __init__(self, create_key: object, engine: Engine, fp: str) -> None:
-        assert (
-            create_key == Module.__create_key
-        ), "Module objects must be created using Module.from_file"
+        The sections are copied into native buffers as they arrive, or read
+        straight into them from a file-like object, and loaded with
+        wasm_runtime_load_from_sections(), so the whole binary is never
+        assembled in Python memory. AOT files are not supported.
+        """
+        return Module(cls.__create_key, engine, _StreamedSections(stream))
+
+    @classmethod
+    def from_buffer(cls, engine: Engine, buffer) -> "Module":
+        """
+        Load a module from any writable buffer (bytearray, memoryview, mmap,
+        array.array...) without copying it. The buffer is kept alive by the
+        Module and must not be modified until the Module is deleted.
+        """
+        return Module(cls.__create_key, engine, buffer)
+
+    def __init__(self, create_key: object, engine: Engine, buffer) -> None:
+        # __del__ also runs when the constructor raises
+        self.module = None
+        assert create_key == Module.__create_key, (
+            "Module objects must be created using Module.from_file, "
+            "Module.from_bytes, Module.from_buffer or Module.from_stream"
+        )
         self.engine = engine
-        self.module, self.file_data = self._create_module(fp)
+        if isinstance(buffer, _StreamedSections):
+            self.module, self.file_data = self._create_module_from_sections(buffer)
+        else:
+            self.module, self.file_data = self._create_module(buffer)
+        # (module name, name) -> ImportType and name -> ExportType
+        self.imports = _read_imports(self.module)
+        self.exports = _read_exports(self.module)
+        self._digest = None
 
     def __del__(self):
-        print("deleting Module")
-        wasm_runtime_unload(self.module)
+        if self.module:
+            print("deleting Module")
+            wasm_runtime_unload(self.module)
+
+    @property
+    def digest(self) -> str:
+        """
+        The SHA-256 of the module buffer, computed on first use. WAMR may
+        rewrite parts of the buffer it loads from, so a binary loaded the
+        same way always has the same digest, which is only the hash of the
+        file for modules loaded with from_stream().
+        """
+        if self._digest is None:
+            import hashlib
 
-    def _create_module(self, fp: str) -> Tuple[wasm_module_t, "Array[c_uint]"]:
-        with open(fp, "rb") as f:
-            data = f.read()
-            data = (c_uint8 * len(data))(*data)
+            digest = hashlib.sha256()
+            if isinstance(self.file_data, _StreamedSections):
+                self.file_data.update(digest)
+            else:
+                digest.update(self.file_data)
+            self._digest = digest.hexdigest()
+        return self._digest
+
+    def check_imports(self) -> None:
+        """
+        Raise if a function import is not linked, e.g. because its host
+        function was registered after the module was loaded. The runtime
+        would otherwise only fail when the import is called.
+        """
+        unlinked = [
+            f"{record.module_name}.{record.name}"
+            for record in self.imports.values()
+            if record.kind == "func" and not record.linked
+        ]
+        if unlinked:
+            raise Exception(
+                f"Error while linking module: unlinked imports {', '.join(unlinked)}"
+            )
+
+    def _create_module(self, buffer) -> Tuple[wasm_module_t, "Array[c_uint8]"]:
+        view = memoryview(buffer)
+        if view.readonly:
+            raise TypeError("Module buffer must be writable, use Module.from_bytes")
+        if not view.c_contiguous:
+            raise TypeError("Module buffer must be C-contiguous")
+        view = view.cast("B")
+        if not view.nbytes:
+            raise ValueError("Module buffer is empty")
+
+        # The ctypes array shares the memory of the buffer and keeps a
+        # reference on it, tying the buffer lifetime to the Module.
+        data = (c_uint8 * view.nbytes).from_buffer(view)
 
         error_buf = create_string_buffer(128)
         module = wasm_runtime_load(data, len(data), error_buf, len(error_buf))
         if not module:
-            raise Exception("Error while creating module")
+            raise Exception(
+                f"Error while creating module: {error_buf.value.decode()}"
+            )
         return module, data
 
+    def _create_module_from_sections(
+        self, sections: _StreamedSections
+    ) -> Tuple[wasm_module_t, _StreamedSections]:
+        error_buf = create_string_buffer(128)
+        module = wasm_runtime_load_from_sections(
+            sections.section_list, False, error_buf, len(error_buf)
+        )
+        if not module:
+            raise Exception(
+                f"Error while creating module: {error_buf.value.decode()}"
+            )
+        return module, sections
+
 
 class Instance:
     def __init__(
@@ -129,19 +962,49 @@ class Instance:
         heap_size: int = 16384,
         dir_list: List[str] | None = None,
         preinitialized_module_inst: wasm_module_inst_t | None = None,
+        check_imports: bool = False,
+        running_mode: str | None = None,
     ):
+        # __del__ also runs when the constructor raises
+        self.own_c = False
+        # set by SharedHeap.attach()
+        self.shared_heap = None
+        if check_imports:
+            module.check_imports()
         # Store module ensures GC does not remove it
         self.module = module
         if dir_list:
             self._set_wasi_args(module, dir_list)
         if preinitialized_module_inst is None:
             self.module_inst = self._create_module_inst(module, stack_size, heap_size)
+            self.own_c = True
+            self.stack_size = stack_size
         else:
+            # borrowed, e.g. by an InternalExecEnv, the owner deinstantiates it
             self.module_inst = preinitialized_module_inst
+            self.own_c = False
+            self.stack_size = None
+        if running_mode is not None:
+            self.running_mode = running_mode
+        self._compiled_functions = {}
+        # index (None for the default one) -> LinearMemory, which keeps the
+        # Instance alive
+        self._memories = weakref.WeakValueDictionary()
+        # serializes the calls made from other threads, see call_async()
+        self._call_lock = threading.Lock()
+        # export name -> FunctionStats, see enable_profiling()
+        self._profile_stats = None
+        self._profile_bits = 7
+        # (offset, size) of the idle block kept for reuse by arena()
+        self._arena_block = None
 
     def __del__(self):
-        print("deleting Instance")
-        wasm_runtime_deinstantiate(self.module_inst)
+        if self.own_c:
+            print("deleting Instance")
+            if self.shared_heap is not None:
+                # deinstantiating does not release the heap
+                self.shared_heap.detach(self)
+            wasm_runtime_deinstantiate(self.module_inst)
 
     def _set_wasi_args(self, module: Module, dir_list: List[str]) -> None:
         LP_c_char = POINTER(c_char)
@@ -168,18 +1031,186 @@ class Instance:
             raise Exception("Error while creating module instance")
         return module_inst
 
+    @property
+    def running_mode(self) -> str:
+        """
+        The running mode of the instance, the default one of the Engine
+        unless set with `running_mode=` or this property.
+        """
+        mode = wasm_runtime_get_running_mode(self.module_inst)
+        for name, value in RUNNING_MODES.items():
+            if value == mode:
+                return name
+        raise Exception(f"Error while getting running mode: unknown mode {mode}")
+
+    @running_mode.setter
+    def running_mode(self, running_mode: str) -> None:
+        _check_running_mode(running_mode)
+        if not wasm_runtime_set_running_mode(
+            self.module_inst, RUNNING_MODES[running_mode]
+        ):
+            raise Exception(f"Error while setting running mode {running_mode!r}")
+
     def malloc(self, nbytes: int, native_handler) -> c_uint64:
         return wasm_runtime_module_malloc(self.module_inst, nbytes, native_handler)
 
     def free(self, wasm_handler) -> None:
         wasm_runtime_module_free(self.module_inst, wasm_handler)
 
+    def arena(self, size: int = 4096) -> "Arena":
+        """
+        An Arena of at least `size` bytes, see Arena.
+        """
+        return Arena(self, size)
+
+    def release_arena(self) -> None:
+        """
+        Free the block kept for reuse by the arenas of the instance.
+        """
+        block, self._arena_block = self._arena_block, None
+        if block is not None:
+            wasm_runtime_module_free(self.module_inst, block[0])
+
     def lookup_function(self, name: str) -> wasm_function_inst_t:
         func = wasm_runtime_lookup_function(self.module_inst, name)
         if not func:
             raise Exception("Error while looking-up function")
         return func
 
+    @property
+    def exports(self) -> "Exports":
+        return Exports(self)
+
+    @property
+    def memory(self) -> "LinearMemory":
+        """
+        The default memory of the instance.
+        """
+        memory = self._memories.get(None)
+        if memory is None:
+            memory_inst = wasm_runtime_get_default_memory(self.module_inst)
+            if not memory_inst:
+                raise Exception("Instance has no memory")
+            memory = self._memories[None] = LinearMemory(self, memory_inst)
+        return memory
+
+    def get_memory(self, index: int) -> "LinearMemory":
+        memory = self._memories.get(index)
+        if memory is None:
+            memory_inst = wasm_runtime_get_memory(self.module_inst, index)
+            if not memory_inst:
+                raise IndexError(f"Instance has no memory {index}")
+            memory = self._memories[index] = LinearMemory(self, memory_inst, index)
+        return memory
+
+    def enable_profiling(self, significant_bits: int = 7) -> None:
+        """
+        Record the calls made through the callables of `exports` fetched
+        from now on, callables fetched before are not profiled. Latencies are
+        kept in histograms of `significant_bits` bits of precision.
+        """
+        if self._profile_stats is None:
+            self._profile_bits = significant_bits
+            self._profile_stats = {}
+
+    def disable_profiling(self) -> None:
+        self._profile_stats = None
+
+    def profile(self, reset: bool = False) -> Profile:
+        """
+        A snapshot of the profile of the exported functions: the calls
+        recorded since enable_profiling() and, if the runtime is built with
+        WAMR_BUILD_PERF_PROFILING=1, the time the runtime spent in them.
+        `reset` restarts the recording, the runtime times are never reset.
+        """
+        stats = self._profile_stats or {}
+        if isinstance(self.module, Module):
+            exports = self.module.exports.values()
+            names = [export.name for export in exports if export.kind == "func"]
+        else:
+            names = list(stats)
+
+        functions = {}
+        for name in names:
+            self_time = None
+            if wasm_runtime_get_wasm_func_exec_time is not None:
+                self_time = wasm_runtime_get_wasm_func_exec_time(
+                    self.module_inst, name.encode()
+                )
+                self_time = self_time / 1000 if self_time >= 0 else None
+
+            function_stats = stats.get(name)
+            if function_stats is None:
+                functions[name] = FunctionProfile(
+                    name, 0, 0, 0.0, self_time, LatencyHistogram()
+                )
+                continue
+            latency = function_stats.histogram.copy()
+            functions[name] = FunctionProfile(
+                name,
+                function_stats.calls,
+                function_stats.errors,
+                latency.total / 1e9,
+                self_time,
+                latency,
+            )
+
+        exec_time = None
+        if wasm_runtime_get_wasm_func_exec_time is not None:
+            exec_time = wasm_runtime_sum_wasm_exec_time(self.module_inst) / 1000
+        if reset and self._profile_stats is not None:
+            # callables fetched before keep recording into the old stats
+            self._profile_stats = {}
+        return Profile(functions, exec_time)
+
+    def memory_info(self) -> InstanceMemoryInfo:
+        memory_size = memory_pages = max_memory_pages = 0
+        memory_inst = wasm_runtime_get_default_memory(self.module_inst)
+        if memory_inst:
+            memory_pages = wasm_memory_get_cur_page_count(memory_inst)
+            max_memory_pages = wasm_memory_get_max_page_count(memory_inst)
+            memory_size = memory_pages * wasm_memory_get_bytes_per_page(memory_inst)
+
+        heap = (None, None, None)
+        if wasm_runtime_get_app_heap_alloc_info is not None:
+            info = mem_alloc_info_t()
+            if wasm_runtime_get_app_heap_alloc_info(self.module_inst, byref(info)):
+                heap = (info.total_size, info.total_free_size, info.highmark_size)
+        return InstanceMemoryInfo(
+            memory_size, memory_pages, max_memory_pages, *heap, self.stack_size
+        )
+
+    def get_exception(self) -> str:
+        exception = wasm_runtime_get_exception(self.module_inst)
+        return exception.decode() if exception else ""
+
+    def clear_exception(self) -> None:
+        wasm_runtime_clear_exception(self.module_inst)
+
+    def terminate(self) -> None:
+        """
+        Stop the guest code running in this instance. Can be called from any
+        thread, the running call fails with "terminated by user".
+        """
+        wasm_runtime_terminate(self.module_inst)
+
+    async def call_async(
+        self,
+        name: str,
+        *args,
+        timeout: float | None = None,
+        instruction_limit: int | None = None,
+    ):
+        """
+        Call an exported function without blocking the event loop, see
+        wamr.wamrapi.aio.AsyncRunner.call().
+        """
+        from wamr.wamrapi.aio import get_default_runner
+
+        return await get_default_runner().call(
+            self, name, *args, timeout=timeout, instruction_limit=instruction_limit
+        )
+
     def native_addr_to_app_addr(self, native_addr) -> c_void_p:
         return wasm_runtime_addr_native_to_app(self.module_inst, native_addr)
 
@@ -187,6 +1218,617 @@ class Instance:
         return wasm_runtime_addr_app_to_native(self.module_inst, app_addr)
 
 
+def _wrap_unsigned(kinds: List[int], args) -> list:
+    """
+    `args`, of the value kinds `kinds`, with the i32 and i64 values given in
+    the unsigned range wrapped to the signed value of the same bits.
+    """
+    values = list(args)
+    for i, kind in enumerate(kinds[: len(values)]):
+        bits = VALKIND_INT_BITS.get(kind)
+        value = values[i]
+        if bits and isinstance(value, int) and 1 << bits - 1 <= value < 1 << bits:
+            values[i] = value - (1 << bits)
+    return values
+
+
+class CompiledFunction:
+    """
+    The call state of an exported function, compiled once from its signature
+    and cached per instance: a pre-allocated argv cell buffer and the
+    precompiled `struct` layouts of the arguments and the results. It only
+    holds raw handles, calls go through a TypedFunction.
+    """
+
+    def __init__(
+        self,
+        instance: Instance,
+        name: str,
+        param_kinds: List[int],
+        result_kinds: List[int],
+    ):
+        self.name = name
+        self.param_kinds = param_kinds
+        self.result_kinds = result_kinds
+        self.module_inst = instance.module_inst
+        self.func = instance.lookup_function(name)
+        self.exec_env = wasm_runtime_get_exec_env_singleton(self.module_inst)
+        if not self.exec_env:
+            raise Exception("Error while creating execution environment")
+
+        self.params = struct.Struct(self._struct_format(param_kinds))
+        self.results = struct.Struct(self._struct_format(result_kinds))
+        # argv holds the arguments on entry and the results on return
+        self.argc = self.params.size // 4
+        self.argv = (c_uint * max(self.argc, self.results.size // 4, 1))()
+        self.result_count = len(result_kinds)
+        self.raw_call_args = (
+            cast(self.exec_env, c_void_p).value,
+            cast(self.func, c_void_p).value,
+            self.argc,
+            addressof(self.argv),
+        )
+
+    def pack_wrapped(self, buffer, args) -> None:
+        """
+        Pack `args` into `buffer` after wrapping the i32 and i64 arguments
+        given in the unsigned range, the slow path of the calls taken once
+        the signed packing failed.
+        """
+        self.params.pack_into(buffer, 0, *_wrap_unsigned(self.param_kinds, args))
+
+    @staticmethod
+    def _struct_format(kinds: List[int]) -> str:
+        try:
+            return "<" + "".join(VALKIND_TO_STRUCT_FORMAT[kind] for kind in kinds)
+        except KeyError as e:
+            raise TypeError(f"Unsupported value kind {e.args[0]}") from None
+
+
+class TypedFunction:
+    """
+    A callable for an exported function, taking and returning Python numbers.
+    i32 and i64 arguments may be signed or unsigned, results are signed.
+    Calls run on the singleton execution environment of the instance. It
+    keeps its Instance alive, like a bound method keeps its object.
+    """
+
+    __slots__ = ["instance", "compiled"]
+
+    def __init__(self, instance: Instance, compiled: CompiledFunction):
+        self.instance = instance
+        self.compiled = compiled
+
+    def __call__(self, *args):
+        compiled = self.compiled
+        argv = compiled.argv
+        try:
+            compiled.params.pack_into(argv, 0, *args)
+        except struct.error:
+            compiled.pack_wrapped(argv, args)
+        if not _call_wasm_raw(*compiled.raw_call_args):
+            exception = wasm_runtime_get_exception(compiled.module_inst)
+            wasm_runtime_clear_exception(compiled.module_inst)
+            raise Exception(
+                f"Error while calling function {compiled.name}: {exception.decode()}"
+            )
+
+        if compiled.result_count == 0:
+            return None
+        results = compiled.results.unpack_from(argv, 0)
+        return results[0] if compiled.result_count == 1 else results
+
+    def call_in(self, exec_env: "ExecEnv", *args):
+        """
+        Call the function on `exec_env` instead of the singleton execution
+        environment of the instance.
+        """
+        compiled = self.compiled
+        argv = (c_uint * len(compiled.argv))()
+        try:
+            compiled.params.pack_into(argv, 0, *args)
+        except struct.error:
+            compiled.pack_wrapped(argv, args)
+        if not _call_wasm_raw(
+            cast(exec_env.exec_env, c_void_p).value,
+            cast(compiled.func, c_void_p).value,
+            compiled.argc,
+            addressof(argv),
+        ):
+            exception = wasm_runtime_get_exception(compiled.module_inst)
+            wasm_runtime_clear_exception(compiled.module_inst)
+            raise Exception(
+                f"Error while calling function {compiled.name}: {exception.decode()}"
+            )
+
+        if compiled.result_count == 0:
+            return None
+        results = compiled.results.unpack_from(argv, 0)
+        return results[0] if compiled.result_count == 1 else results
+
+    def __repr__(self):
+        compiled = self.compiled
+        params, results = compiled.params.format[1:], compiled.results.format[1:]
+        return f"<TypedFunction {compiled.name}({params}){results}>"
+
+
+class ProfiledFunction(TypedFunction):
+    """
+    A TypedFunction recording the wall-clock latency of its calls, handed
+    out by `exports` while profiling is enabled on the instance.
+    """
+
+    __slots__ = ["stats"]
+
+    def __init__(self, instance: Instance, compiled: CompiledFunction, stats):
+        super().__init__(instance, compiled)
+        self.stats = stats
+
+    def __call__(self, *args):
+        start = time.perf_counter_ns()
+        try:
+            result = TypedFunction.__call__(self, *args)
+        except Exception:
+            self.stats.record(time.perf_counter_ns() - start, True)
+            raise
+        self.stats.record(time.perf_counter_ns() - start)
+        return result
+
+    def call_in(self, exec_env: "ExecEnv", *args):
+        start = time.perf_counter_ns()
+        try:
+            result = TypedFunction.call_in(self, exec_env, *args)
+        except Exception:
+            self.stats.record(time.perf_counter_ns() - start, True)
+            raise
+        self.stats.record(time.perf_counter_ns() - start)
+        return result
+
+
+class Exports:
+    """
+    Typed callables for the exported functions of an Instance, accessible as
+    attributes (`instance.exports.sum`) or items (`instance.exports["sum"]`).
+    They are compiled on first access and cached per instance.
+    """
+
+    __slots__ = ["_instance"]
+
+    def __init__(self, instance: Instance):
+        self._instance = instance
+
+    def _lookup_signature(self, name: str) -> Tuple[List[int], List[int]]:
+        module = self._instance.module
+        if isinstance(module, Module):
+            exports = module.exports
+        else:
+            # borrowed instances, e.g. of an InternalExecEnv, have no Module
+            exports = _read_exports(wasm_runtime_get_module(self._instance.module_inst))
+        export = exports.get(name)
+        if export is None or export.kind != "func":
+            raise KeyError(f"No exported function named {name}")
+        return list(export.params), list(export.results)
+
+    def __getitem__(self, name: str) -> TypedFunction:
+        # the cache only holds raw handles, so it does not create a
+        # reference cycle through the Instance
+        functions = self._instance._compiled_functions
+        compiled = functions.get(name)
+        if compiled is None:
+            compiled = CompiledFunction(
+                self._instance, name, *self._lookup_signature(name)
+            )
+            functions[name] = compiled
+
+        profile_stats = self._instance._profile_stats
+        if profile_stats is not None:
+            stats = profile_stats.get(name)
+            if stats is None:
+                stats = profile_stats[name] = FunctionStats(
+                    self._instance._profile_bits
+                )
+            return ProfiledFunction(self._instance, compiled, stats)
+        return TypedFunction(self._instance, compiled)
+
+    def __getattr__(self, name: str) -> TypedFunction:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError as e:
+            raise AttributeError(*e.args) from None
+
+
+class LinearMemory:
+    """
+    Zero-copy access to a linear memory of an instance.
+
+    `view()` and `ndarray()` share the memory of the instance, nothing is
+    copied. The LinearMemory and the views keep the Instance alive. The
+    views are re-derived on access whenever the memory grew, and the
+    memoryview handed out before is released if the memory moved to a new
+    base address (its slices and the views pinned, e.g. by NumPy arrays, can
+    not be released and must not be used anymore). `generation` changes
+    whenever the views were re-derived.
+
+    A memory.grow run by the guest is only noticed on the next access, the
+    views kept across such a call are stale until then. Runtimes with
+    hardware bound checks (on 64-bit hosts) reserve the whole memory
+    upfront and never move it, their old views stay valid but only cover
+    the size the memory had when they were taken.
+    """
+
+    def __init__(
+        self,
+        instance: Instance,
+        memory_inst: wasm_memory_inst_t,
+        index: int | None = None,
+    ):
+        self.instance = instance
+        self.memory_inst = memory_inst
+        self.index = index
+        self.generation = 0
+        self._base = None
+        self._size = 0
+        self._buffer = None
+        self._view = None
+
+    @property
+    def page_count(self) -> int:
+        return wasm_memory_get_cur_page_count(self.memory_inst)
+
+    @property
+    def max_page_count(self) -> int:
+        return wasm_memory_get_max_page_count(self.memory_inst)
+
+    @property
+    def size(self) -> int:
+        return self.page_count * wasm_memory_get_bytes_per_page(self.memory_inst)
+
+    def _refresh(self) -> None:
+        base = cast(wasm_memory_get_base_address(self.memory_inst), c_void_p).value
+        size = self.size
+        if base == self._base and size == self._size:
+            return
+
+        if self._view is not None and base != self._base:
+            try:
+                self._view.release()
+            except BufferError:
+                pass
+        self._base, self._size = base, size
+        self._buffer = (c_uint8 * size).from_address(base) if base else None
+        if self._buffer is not None:
+            # the views export the buffer, which keeps the instance alive
+            self._buffer._instance = self.instance
+        self._view = memoryview(self._buffer).cast("B") if base else memoryview(b"")
+        self.generation += 1
+
+    def view(self) -> memoryview:
+        """
+        A writable memoryview of the whole memory.
+        """
+        self._refresh()
+        return self._view
+
+    def ndarray(self, dtype="uint8", offset: int = 0, shape=None):
+        """
+        A NumPy array of `dtype` over the memory, starting at `offset`. Without
+        `shape` it extends to the end of the memory.
+        """
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("LinearMemory.ndarray requires numpy") from e
+
+        self._refresh()
+        dtype = numpy.dtype(dtype)
+        if not 0 <= offset <= self._size:
+            raise IndexError("Out of bounds memory access")
+        if shape is None:
+            count = (self._size - offset) // dtype.itemsize
+        else:
+            count = int(numpy.prod(shape))
+        if count < 0 or offset + count * dtype.itemsize > self._size:
+            raise IndexError("Out of bounds memory access")
+
+        array = numpy.frombuffer(self._buffer, dtype, count, offset)
+        return array if shape is None else array.reshape(shape)
+
+    def grow(self, pages: int) -> None:
+        if self.index in (None, 0):
+            # wasm_memory_enlarge() crashes in runtimes built with shared
+            # heaps, it looks them up from a NULL instance
+            enlarged = wasm_runtime_enlarge_memory(self.instance.module_inst, pages)
+        else:
+            enlarged = wasm_memory_enlarge(self.memory_inst, pages)
+        if not enlarged:
+            raise Exception("Error while enlarging memory")
+        self._refresh()
+
+
+class Arena:
+    """
+    A bump allocator for the transient buffers passed to the exports of an
+    instance, entered as a context manager.
+
+    Entering reserves one block of `size` bytes from the app heap with
+    wasm_runtime_module_malloc(), the `put_*()` methods copy a value into it
+    and return its app offset, and exiting releases everything at once.
+    The block is then kept by the instance and reused by its next arena of
+    at most that size, so an arena per call in a loop only allocates once
+    (see Instance.release_arena()). Offsets are only valid within the scope.
+    """
+
+    def __init__(self, instance: Instance, size: int):
+        if size <= 0:
+            raise ValueError("size must be positive")
+
+        self.instance = instance
+        self.size = size
+        self.offset = None
+        self.used = 0
+
+    def __enter__(self) -> "Arena":
+        if self.offset is not None:
+            raise Exception("The arena is already entered")
+
+        instance = self.instance
+        block = instance._arena_block
+        if block is not None and block[1] >= self.size:
+            instance._arena_block = None
+            self.offset, self.size = block
+        else:
+            offset = wasm_runtime_module_malloc(instance.module_inst, self.size, None)
+            if not offset:
+                raise MemoryError(
+                    f"Error while allocating an arena of {self.size} bytes"
+                )
+            self.offset = offset
+        self.used = 0
+        return self
+
+    def __exit__(self, *exc_info):
+        instance = self.instance
+        block = (self.offset, self.size)
+        self.offset = None
+        self.used = 0
+        # keep the larger block of the two for the next arena
+        if instance._arena_block is not None:
+            if instance._arena_block[1] >= block[1]:
+                wasm_runtime_module_free(instance.module_inst, block[0])
+                return
+            instance.release_arena()
+        instance._arena_block = block
+
+    def alloc(self, nbytes: int, align: int = 8) -> int:
+        """
+        Reserve `nbytes` aligned on `align` bytes and return their app offset.
+        """
+        if self.offset is None:
+            raise Exception("The arena must be entered before allocating")
+        start = -(-(self.offset + self.used) // align) * align
+        end = start + nbytes
+        if end > self.offset + self.size:
+            raise MemoryError(
+                f"Error while allocating {nbytes} bytes from an arena of {self.size}"
+            )
+        self.used = end - self.offset
+        return start
+
+    def put_bytes(self, data, align: int = 1) -> int:
+        """
+        Copy the bytes-like `data` into the arena and return its app offset.
+        """
+        is_bytes = type(data) is bytes
+        if not is_bytes:
+            data = memoryview(data).cast("B")
+        nbytes = len(data)
+        if align == 1 and self.offset is not None and self.used + nbytes <= self.size:
+            # the common case of alloc(), inlined
+            offset = self.offset + self.used
+            self.used += nbytes
+        else:
+            offset = self.alloc(nbytes, align)
+        # translated on every put, guest code may have moved the memory
+        native_addr = _addr_app_to_native_raw(self.instance.module_inst, offset)
+        if is_bytes:
+            memmove(native_addr, data, nbytes)
+        else:
+            memoryview((c_uint8 * nbytes).from_address(native_addr)).cast("B")[:] = data
+        return offset
+
+    def put_str(self, s: str, encoding: str = "utf-8", terminate: bool = True) -> int:
+        """
+        Copy the encoded `s`, NUL-terminated unless `terminate` is False,
+        and return its app offset.
+        """
+        data = s.encode(encoding)
+        return self.put_bytes(data + b"\0" if terminate else data)
+
+    def put_array(self, values, typecode: str | None = None) -> int:
+        """
+        Copy a contiguous buffer of numbers, e.g. an array.array or a NumPy
+        array, aligned on its item size and return its app offset. With
+        `typecode`, `values` is any iterable packed as array.array(typecode).
+        """
+        if typecode is not None:
+            values = array.array(typecode, values)
+        view = memoryview(values)
+        if not view.c_contiguous:
+            raise ValueError("put_array needs a contiguous buffer")
+        return self.put_bytes(view, view.itemsize)
+
+
+class SharedBuffer(NamedTuple):
+    """
+    An allocation of a SharedHeap: `offset` is its address in the linear
+    memory of every instance the heap is attached to, and `view` a writable
+    memoryview of its bytes.
+    """
+
+    offset: int
+    view: memoryview
+
+
+class SharedHeap:
+    """
+    A heap mapped into the address space of all the instances it is
+    attached to, at the top of their 32-bit linear memory.
+
+    Buffers allocated with `malloc()` are visible to every attached instance
+    at the same offset, so one payload can be handed to many instances
+    without copying it into each linear memory. Without `buffer` the runtime
+    maps `size` bytes that `malloc()` allocates from; a writable `buffer`,
+    whose size is a multiple of the page size, creates a pre-allocated heap
+    instead, which can only be reached by chaining it (see `chain()`).
+
+    WAMR frees the heaps when the runtime is destroyed, a SharedHeap keeps
+    its Engine alive. Needs a runtime built with WAMR_BUILD_SHARED_HEAP=1.
+    """
+
+    def __init__(self, engine: Engine, size: int | None = None, buffer=None):
+        if wasm_runtime_create_shared_heap is None:
+            raise NotImplementedError(
+                "The runtime is built without WAMR_BUILD_SHARED_HEAP"
+            )
+        if (size is None) == (buffer is None):
+            raise ValueError("Either size or buffer must be given")
+
+        self.engine = engine
+        init_args = SharedHeapInitArgs()
+        if buffer is not None:
+            # WAMR uses the buffer until the runtime is destroyed
+            self._buffer = (c_uint8 * memoryview(buffer).nbytes).from_buffer(buffer)
+            size = len(self._buffer)
+            init_args.pre_allocated_addr = cast(self._buffer, c_void_p)
+        if not 0 < size <= UINT32_MAX:
+            raise ValueError(f"Invalid shared heap size {size}")
+        init_args.size = size
+
+        self.size = size
+        self.shared_heap = wasm_runtime_create_shared_heap(byref(init_args))
+        if not self.shared_heap:
+            raise Exception("Error while creating shared heap")
+        self.preallocated = buffer is not None
+        self._chain = []
+        # the heap this one is chained to
+        self._head = None
+        self._instances = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def chain(self, body: "SharedHeap") -> "SharedHeap":
+        """
+        Append `body` to this heap, both must be detached. Attaching the
+        head then attaches the whole chain, which only one dynamically
+        allocated heap may be part of.
+        """
+        if not wasm_runtime_chain_shared_heaps(self.shared_heap, body.shared_heap):
+            raise Exception("Error while chaining shared heaps")
+        self._chain.append(body)
+        body._head = self
+        return self
+
+    def attach(self, instance: Instance) -> None:
+        with self._lock:
+            if instance.shared_heap is not None:
+                raise Exception("A shared heap is already attached to the instance")
+            if not wasm_runtime_attach_shared_heap(
+                instance.module_inst, self.shared_heap
+            ):
+                raise Exception("Error while attaching shared heap")
+            instance.shared_heap = self
+            self._instances.add(instance)
+
+    def detach(self, instance: Instance) -> None:
+        with self._lock:
+            if instance.shared_heap is not self:
+                raise Exception("The shared heap is not attached to the instance")
+            wasm_runtime_detach_shared_heap(instance.module_inst)
+            instance.shared_heap = None
+            self._instances.discard(instance)
+
+    def _any_instance(self, instance: Instance | None) -> Instance:
+        # the runtime allocates through an instance the chain is attached to
+        if instance is not None:
+            return instance
+        heap = self
+        while heap is not None:
+            for instance in heap._instances:
+                return instance
+            heap = heap._head
+        raise Exception("The shared heap must be attached to an instance")
+
+    def malloc(self, size: int, instance: Instance | None = None) -> SharedBuffer:
+        """
+        Allocate `size` bytes, through `instance` or any attached instance.
+        """
+        native_addr = c_void_p()
+        offset = wasm_runtime_shared_heap_malloc(
+            self._any_instance(instance).module_inst, size, byref(native_addr)
+        )
+        if not offset:
+            raise MemoryError(f"Error while allocating {size} bytes from shared heap")
+        view = memoryview((c_uint8 * size).from_address(native_addr.value)).cast("B")
+        return SharedBuffer(offset, view)
+
+    def free(self, buffer: SharedBuffer, instance: Instance | None = None) -> None:
+        """
+        Free `buffer`, its view must not be used anymore.
+        """
+        wasm_runtime_shared_heap_free(
+            self._any_instance(instance).module_inst, buffer.offset
+        )
+        try:
+            buffer.view.release()
+        except BufferError:
+            pass
+
+
+class ThreadEnv:
+    """
+    Initialize the WAMR thread environment of the current thread, required
+    before running wasm code from a thread not created by the runtime.
+    Nothing is done if the environment is already initialized.
+
+    with ThreadEnv():
+        ...
+    """
+
+    def __enter__(self) -> "ThreadEnv":
+        self.owned = not wasm_runtime_thread_env_inited()
+        if self.owned and not wasm_runtime_init_thread_env():
+            raise Exception("Error while initializing thread environment")
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.owned:
+            wasm_runtime_destroy_thread_env()
+
+
+class CallManyError(Exception):
+    """
+    Raised by ExecEnv.call_many when the call of a row traps. `row` is the
+    index of the failing row, the results of the previous rows are lost.
+    """
+
+    def __init__(self, message: str, row: int):
+        super().__init__(message)
+        self.row = row
+
+
+def _get_func_signature(
+    func: wasm_function_inst_t, module_inst: wasm_module_inst_t
+) -> Tuple[List[int], List[int]]:
+    param_count = wasm_func_get_param_count(func, module_inst)
+    param_kinds = (c_uint8 * param_count)()
+    wasm_func_get_param_types(func, module_inst, param_kinds)
+    result_count = wasm_func_get_result_count(func, module_inst)
+    result_kinds = (c_uint8 * result_count)()
+    wasm_func_get_result_types(func, module_inst, result_kinds)
+    return list(param_kinds), list(result_kinds)
+
+
 class ExecEnv:
     def __init__(self, module_inst: Instance, stack_size: int = 65536):
         self.module_inst = module_inst
@@ -194,13 +1836,13 @@ class ExecEnv:
         self.env = addressof(self.exec_env.contents)
         self.own_c = True
 
-        ID_TO_EXEC_ENV_MAPPING[str(self.env)] = self
+        with ID_TO_EXEC_ENV_MAPPING_LOCK:
+            ID_TO_EXEC_ENV_MAPPING[str(self.env)] = self
 
     def __del__(self):
         if self.own_c:
             print("deleting ExecEnv")
             wasm_runtime_destroy_exec_env(self.exec_env)
-            del ID_TO_EXEC_ENV_MAPPING[str(self.env)]
 
     def _create_exec_env(
         self, module_inst: Instance, stack_size: int
@@ -214,6 +1856,219 @@ class ExecEnv:
         if not wasm_runtime_call_wasm(self.exec_env, func, argc, argv):
             raise Exception("Error while calling function")
 
+    def set_instruction_limit(self, limit: int | None) -> None:
+        """
+        Cap the number of instructions each following call may run, None
+        removes the cap. Calls going over it fail with "instruction limit
+        exceeded". Needs a runtime built with
+        WAMR_BUILD_INSTRUCTION_METERING=1.
+        """
+        if wasm_runtime_set_instruction_count_limit is None:
+            raise NotImplementedError(
+                "The runtime is built without WAMR_BUILD_INSTRUCTION_METERING"
+            )
+        if limit is not None and not 0 <= limit <= 0x7FFFFFFF:
+            raise ValueError("limit must be between 0 and 2**31 - 1")
+
+        wasm_runtime_set_instruction_count_limit(
+            self.exec_env, -1 if limit is None else limit
+        )
+
+    def call_many(self, func: wasm_function_inst_t, args_array):
+        """
+        Call `func` once per row of `args_array`: a 2-D NumPy array of shape
+        (rows, params), a flat `array.array` of rows * params values or a
+        list of rows. The rows of a function without parameters are only
+        given by a list or a NumPy array.
+
+        All the rows are packed upfront into one buffer laid out as argv
+        cells, and each call runs in place on its row, so the loop only
+        crosses into the runtime once per row. i32 and i64 arguments may be
+        signed or unsigned, a value out of both ranges raises a ValueError.
+        Results are returned as a 2-D NumPy array of shape (rows, results), a
+        flat `array.array` for an `array.array` input (its results must all
+        be of the same kind) or a list of the values (tuples with several
+        results) for a list input. Stops with a CallManyError on the first
+        trap.
+        """
+        module_inst = self.module_inst.module_inst
+        param_kinds, result_kinds = _get_func_signature(func, module_inst)
+        params = struct.Struct(CompiledFunction._struct_format(param_kinds))
+        results = struct.Struct(CompiledFunction._struct_format(result_kinds))
+        argc = params.size // 4
+        # every row must hold the arguments on entry and the results on return
+        row_size = max(params.size, results.size, 4)
+
+        if isinstance(args_array, array.array):
+            packed, address, rows = self._pack_array(
+                args_array, param_kinds, params, row_size
+            )
+        elif isinstance(args_array, (list, tuple)):
+            packed, address, rows = self._pack_rows(
+                args_array, len(args_array), param_kinds, params, row_size
+            )
+        else:
+            packed, address, rows = self._pack_ndarray(
+                args_array, param_kinds, params, row_size
+            )
+
+        exec_env = cast(self.exec_env, c_void_p).value
+        func = cast(func, c_void_p).value
+        for row in range(rows):
+            if not _call_wasm_raw(exec_env, func, argc, address + row * row_size):
+                exception = wasm_runtime_get_exception(module_inst)
+                wasm_runtime_clear_exception(module_inst)
+                raise CallManyError(
+                    f"Error while calling function on row {row}: {exception.decode()}",
+                    row,
+                )
+
+        if not result_kinds:
+            return None
+        if isinstance(args_array, array.array):
+            return self._unpack_array(packed, results, row_size)
+        if isinstance(args_array, (list, tuple)):
+            return self._unpack_rows(packed, results, row_size)
+        return self._unpack_ndarray(packed, result_kinds, results, row_size)
+
+    @staticmethod
+    def _pack_rows(args, rows: int, param_kinds, params: struct.Struct, row_size: int):
+        packed = (c_uint8 * (rows * row_size))()
+        pack_into = params.pack_into
+        for row, values in enumerate(args):
+            offset = row * row_size
+            try:
+                pack_into(packed, offset, *values)
+            except struct.error:
+                try:
+                    pack_into(packed, offset, *_wrap_unsigned(param_kinds, values))
+                except struct.error as e:
+                    raise ValueError(f"Invalid arguments on row {row}: {e}") from None
+        return packed, addressof(packed), rows
+
+    @classmethod
+    def _pack_array(
+        cls, args: array.array, param_kinds, params: struct.Struct, row_size: int
+    ):
+        param_count = len(param_kinds)
+        if param_count == 0:
+            # a flat array of no values does not tell the number of rows
+            raise ValueError(
+                "a function without parameters takes a list of empty rows or "
+                "a NumPy array of shape (rows, 0)"
+            )
+        if len(args) % param_count:
+            raise ValueError(f"array length must be a multiple of {param_count}")
+
+        rows = len(args) // param_count
+        if row_size == params.size and params.format[1:] == args.typecode * param_count:
+            # the array already has the argv cells layout
+            packed = (c_uint8 * (rows * row_size)).from_buffer_copy(args)
+            return packed, addressof(packed), rows
+
+        row_args = (
+            args[start : start + param_count]
+            for start in range(0, len(args), param_count)
+        )
+        return cls._pack_rows(row_args, rows, param_kinds, params, row_size)
+
+    @staticmethod
+    def _unpack_rows(packed, results: struct.Struct, row_size: int) -> list:
+        row = struct.Struct(f"{results.format}{row_size - results.size}x")
+        if len(results.format) == 2:
+            return [row_results[0] for row_results in row.iter_unpack(packed)]
+        return list(row.iter_unpack(packed))
+
+    @staticmethod
+    def _unpack_array(packed, results: struct.Struct, row_size: int):
+        typecodes = set(results.format[1:])
+        if len(typecodes) != 1:
+            raise TypeError("results of different kinds require a NumPy input")
+
+        values = array.array(typecodes.pop())
+        if len(results.format) == 2 and row_size % values.itemsize == 0:
+            # a single result, read every row with a strided view
+            stride = row_size // values.itemsize
+            view = memoryview(packed).cast("B").cast(values.typecode)
+            values.frombytes(view[::stride].tobytes())
+            return values
+
+        row = struct.Struct(f"{results.format}{row_size - results.size}x")
+        for row_results in row.iter_unpack(packed):
+            values.extend(row_results)
+        return values
+
+    @staticmethod
+    def _row_dtype(kinds: List[int], fmt: struct.Struct, row_size: int):
+        import numpy
+
+        names = [f"f{i}" for i in range(len(kinds))]
+        formats = ["<" + VALKIND_TO_STRUCT_FORMAT[kind] for kind in kinds]
+        offsets = [struct.calcsize(fmt.format[: i + 1]) for i in range(len(kinds))]
+        return numpy.dtype(
+            {
+                "names": names,
+                "formats": formats,
+                "offsets": offsets,
+                "itemsize": row_size,
+            }
+        )
+
+    @staticmethod
+    def _check_ndarray_column(column, kind: int, index: int):
+        """
+        `column`, the arguments of parameter `index`, converted so that
+        assigning it to its field keeps the bits of the wasm values.
+        """
+        import numpy
+
+        if column.dtype.kind not in "biuf":
+            raise ValueError(f"Unsupported dtype {column.dtype} for parameter {index}")
+
+        bits = VALKIND_INT_BITS.get(kind)
+        if bits is None or column.dtype.kind == "b" or not column.size:
+            return column
+        if column.dtype.kind == "f" and not numpy.all(
+            numpy.isfinite(column) & (numpy.trunc(column) == column)
+        ):
+            raise ValueError(f"Non-integer value for parameter {index}")
+        # signed or unsigned
+        if column.min().item() < -(1 << bits - 1) or column.max().item() >= 1 << bits:
+            raise ValueError(f"Value out of range for parameter {index}")
+
+        if column.dtype.kind == "u" and bits == 64:
+            return column.view(numpy.int64)
+        if column.dtype.kind == "f" and bits == 64:
+            column = numpy.where(column >= 2.0**63, column - 2.0**64, column)
+        # i32 values above the signed range wrap when assigned to their field
+        return column.astype(numpy.int64)
+
+    def _pack_ndarray(self, args, param_kinds, params: struct.Struct, row_size: int):
+        try:
+            import numpy
+        except ImportError as e:
+            raise TypeError(
+                "args_array must be an array.array, a list or a NumPy array"
+            ) from e
+
+        args = numpy.asarray(args)
+        if args.ndim != 2 or args.shape[1] != len(param_kinds):
+            raise ValueError(f"args_array must be of shape (rows, {len(param_kinds)})")
+
+        dtype = self._row_dtype(param_kinds, params, row_size)
+        packed = numpy.zeros(args.shape[0], dtype)
+        for i, kind in enumerate(param_kinds):
+            packed[f"f{i}"] = self._check_ndarray_column(args[:, i], kind, i)
+        return packed, packed.ctypes.data, args.shape[0]
+
+    def _unpack_ndarray(
+        self, packed, result_kinds, results: struct.Struct, row_size: int
+    ):
+        import numpy
+
+        columns = packed.view(self._row_dtype(result_kinds, results, row_size))
+        return numpy.column_stack([columns[f"f{i}"] for i in range(len(result_kinds))])
+
     def get_module_inst(self) -> Instance:
         return self.module_inst
 
@@ -226,8 +2081,10 @@ class ExecEnv:
 
     @staticmethod
     def wrap(env: int) -> "ExecEnv":
-        if str(env) in ID_TO_EXEC_ENV_MAPPING:
-            return ID_TO_EXEC_ENV_MAPPING[str(env)]
+        with ID_TO_EXEC_ENV_MAPPING_LOCK:
+            exec_env = ID_TO_EXEC_ENV_MAPPING.get(str(env))
+        if exec_env is not None:
+            return exec_env
         return InternalExecEnv(env)
 
 
@@ -243,7 +2100,6 @@ class InternalExecEnv(ExecEnv):
             module=object(),
             preinitialized_module_inst=wasm_runtime_get_module_inst(self.exec_env),
         )
-        ID_TO_EXEC_ENV_MAPPING[str(env)] = self
-
-    def __del__(self):
-        del ID_TO_EXEC_ENV_MAPPING[str(self.env)]
+        self.own_c = False
+        with ID_TO_EXEC_ENV_MAPPING_LOCK:
+            ID_TO_EXEC_ENV_MAPPING[str(env)] = self
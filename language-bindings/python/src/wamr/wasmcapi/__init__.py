@@ -4,4 +4,11 @@
 # Copyright (C) 2019 Intel Corporation.  All rights reserved.
 # SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
 #
-__all__ = ["ffi"]
+from .module_cache import ModuleCache
+from .objects import Func
+from .objects import Instance
+from .objects import Module
+from .objects import Store
+from .objects import make_callback
+
+__all__ = ["ffi", "Func", "Instance", "Module", "ModuleCache", "Store", "make_callback"]
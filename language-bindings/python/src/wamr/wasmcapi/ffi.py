@@ -10,8 +10,9 @@
 
 import ctypes as c
 import os
-from pathlib import Path
 import sys
+import threading
+from collections.abc import Sequence
 
 #
 # Prologue. Dependencies of binding
@@ -20,33 +21,67 @@ import sys
 # how to open the library file of WAMR
 
 if sys.platform == "linux":
-    BUILDING_DIR = "product-mini/platforms/linux/build"
     LIBRARY_NAME = "libiwasm.so"
 elif sys.platform == "win32":
-    BUILDING_DIR = "product-mini/platforms/windows/build"
     LIBRARY_NAME = "iwasm.dll"
 elif sys.platform == "darwin":
-    BUILDING_DIR = "product-mini/platforms/darwin/build"
     LIBRARY_NAME = "libiwasm.dylib"
 else:
     raise RuntimeError(f"unsupported platform `{sys.platform}`")
 
-# FIXME: should load libiwasm.so from current system library path
-current_file = Path(__file__)
-if current_file.is_symlink():
-    current_file = Path(os.readlink(current_file))
-current_dir = current_file.parent.resolve()
-root_dir = current_dir.parents[4].resolve()
-wamr_dir = root_dir.resolve()
-if not wamr_dir.exists():
-    raise RuntimeError(f"not found the repo of wasm-micro-runtime under {root_dir}")
+# a path to the library, takes precedence over the packaged one
+LIBRARY_PATH_ENV = "WAMR_LIBIWASM_PATH"
+PACKAGED_LIBRARY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "libs", LIBRARY_NAME
+)
 
-libpath = wamr_dir.joinpath(BUILDING_DIR).joinpath(LIBRARY_NAME).resolve()
-if not libpath.exists():
-    raise RuntimeError(f"not found precompiled wamr library at {libpath}")
 
-print(f"loading WAMR library from {libpath} ...")
-libiwasm = c.cdll.LoadLibrary(libpath)
+def find_library() -> str:
+    """
+    Where the library of WAMR is loaded from: the path in the environment
+    variable WAMR_LIBIWASM_PATH, the library packaged in wamr/libs, or
+    LIBRARY_NAME, resolved by the system loader.
+    """
+    env_path = os.environ.get(LIBRARY_PATH_ENV)
+    if env_path:
+        if not os.path.exists(env_path):
+            raise RuntimeError(f"{LIBRARY_PATH_ENV}={env_path} does not exist")
+        return env_path
+    if os.path.exists(PACKAGED_LIBRARY_PATH):
+        return PACKAGED_LIBRARY_PATH
+    return LIBRARY_NAME
+
+
+class _LazyLibrary:
+    """
+    Stands for the library of WAMR until it is used, so that importing the
+    binding neither searches nor loads it. The first attribute access loads
+    the library and replaces this object by it.
+    """
+
+    def __getattr__(self, name):
+        return getattr(load_library(), name)
+
+
+libiwasm = _LazyLibrary()
+_lock = threading.RLock()
+
+
+def load_library() -> c.CDLL:
+    global libiwasm
+    with _lock:
+        if isinstance(libiwasm, _LazyLibrary):
+            path = find_library()
+            try:
+                library = c.cdll.LoadLibrary(path)
+            except OSError as e:
+                raise RuntimeError(f"not found WAMR library {path}: {e}") from e
+
+            libiwasm = library
+            binding = sys.modules.get(f"{__package__}.binding")
+            if binding is not None:
+                binding.libiwasm = library
+        return libiwasm
 
 
 class wasm_ref_t(c.Structure):
@@ -93,34 +128,66 @@ def is_null_pointer(c_pointer):
         raise RuntimeError("not a pointer")
 
 
+# vector type and POINTER(vector type) -> vector type, filled by load_binding()
+_VEC_TYPES = {}
+
+
+class VecView(Sequence):
+    """
+    A read-only sequence over the elements of a vector or a POINTER(vector),
+    without copying them. Items are read from `data` when indexed, slices are
+    views too and `bytes()` copies a byte vector in one go.
+
+    The view keeps the vector object alive, not its elements: it must not
+    outlive the deletion of the vector.
+    """
+
+    __slots__ = ("_vec", "_data", "_range")
+
+    def __init__(self, vec, _range=None):
+        load_binding()
+        vec_type = _VEC_TYPES.get(type(vec))
+        if vec_type is None:
+            raise RuntimeError("not a known vector type")
+        if vec_type is not type(vec):
+            vec = dereference(vec)
+        self._vec = vec
+        self._data = vec.data
+        self._range = range(vec.num_elems) if _range is None else _range
+
+    def __len__(self):
+        return len(self._range)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return VecView(self._vec, self._range[index])
+        return self._data[self._range[index]]
+
+    def __iter__(self):
+        data = self._data
+        for i in self._range:
+            yield data[i]
+
+    def __bytes__(self):
+        if not isinstance(self._vec, wasm_byte_vec_t):
+            raise TypeError("not a byte vector")
+        if not self._range:
+            return b""
+        if self._range.step != 1:
+            return bytes(iter(self))
+        address = c.addressof(self._data.contents) + self._range.start
+        return c.string_at(address, len(self._range))
+
+    def __repr__(self):
+        return f"VecView({list(self)!r})"
+
+
 def wasm_vec_to_list(vec):
     """
     Converts a vector or a POINTER(vector) to a list
     vector of type pointers -> list of type pointers
     """
-    known_vec_type = [
-        wasm_byte_vec_t,
-        wasm_valtype_vec_t,
-        wasm_functype_vec_t,
-        wasm_globaltype_vec_t,
-        wasm_tabletype_vec_t,
-        wasm_memorytype_vec_t,
-        wasm_externtype_vec_t,
-        wasm_importtype_vec_t,
-        wasm_exporttype_vec_t,
-        wasm_val_vec_t,
-        wasm_frame_vec_t,
-        wasm_extern_vec_t,
-    ]
-    known_vec_pointer_type = [POINTER(vec_type) for vec_type in known_vec_type]
-
-    if any([isinstance(vec, pointer_type) for pointer_type in known_vec_pointer_type]):
-        vec = dereference(vec)
-        return [vec.data[i] for i in range(vec.num_elems)]
-    elif any([isinstance(vec, vec_type) for vec_type in known_vec_type]):
-        return [vec.data[i] for i in range(vec.num_elems)]
-    else:
-        raise RuntimeError("not a known vector type")
+    return list(VecView(vec))
 
 
 def list_to_carray(elem_type, *args):
@@ -132,6 +199,7 @@ def list_to_carray(elem_type, *args):
 
 
 def load_module_file(wasm_content):
+    load_binding()
     binary = wasm_byte_vec_t()
     wasm_byte_vec_new_uninitialized(binary, len(wasm_content))
     # has to use malloced memory.
@@ -144,22 +212,16 @@ def load_module_file(wasm_content):
 # Enhancment of binding
 #
 
-from .binding import *
-
 # Built-in functions for Structure
 
 
-wasm_finalizer = CFUNCTYPE(None, c_void_p)
+wasm_finalizer = c.CFUNCTYPE(None, c.c_void_p)
 
 
 def __repr_wasm_limits_t(self):
     return f"{self.min:#x} {self.max:#x}"
 
 
-# overwrite
-wasm_limits_t.__repr__ = __repr_wasm_limits_t
-
-
 def __compare_wasm_valtype_t(self, other):
     if not isinstance(other, wasm_valtype_t):
         return False
@@ -183,10 +245,6 @@ def __repr_wasm_valtype_t(self):
         return "externref"
 
 
-wasm_valtype_t.__eq__ = __compare_wasm_valtype_t
-wasm_valtype_t.__repr__ = __repr_wasm_valtype_t
-
-
 def __compare_wasm_byte_vec_t(self, other):
     if not isinstance(other, wasm_byte_vec_t):
         return False
@@ -204,10 +262,6 @@ def __repr_wasm_byte_vec_t(self):
     return data.decode() if self.size else ""
 
 
-wasm_byte_vec_t.__eq__ = __compare_wasm_byte_vec_t
-wasm_byte_vec_t.__repr__ = __repr_wasm_byte_vec_t
-
-
 def __compare_wasm_functype_t(self, other):
     if not isinstance(other, wasm_functype_t):
         return False
@@ -227,10 +281,6 @@ def __repr_wasm_functype_t(self):
     return f"(func{params}{results})"
 
 
-wasm_functype_t.__eq__ = __compare_wasm_functype_t
-wasm_functype_t.__repr__ = __repr_wasm_functype_t
-
-
 def __compare_wasm_globaltype_t(self, other):
     if not isinstance(other, wasm_globaltype_t):
         return False
@@ -248,10 +298,6 @@ def __repr_wasm_globaltype_t(self):
     return f"(global{' mut ' if mutability else ' '}{content})"
 
 
-wasm_globaltype_t.__eq__ = __compare_wasm_globaltype_t
-wasm_globaltype_t.__repr__ = __repr_wasm_globaltype_t
-
-
 def __compare_wasm_tabletype_t(self, other):
     if not isinstance(other, wasm_tabletype_t):
         return False
@@ -269,10 +315,6 @@ def __repr_wasm_tabletype_t(self):
     return f"(table {limit} {element})"
 
 
-wasm_tabletype_t.__eq__ = __compare_wasm_tabletype_t
-wasm_tabletype_t.__repr__ = __repr_wasm_tabletype_t
-
-
 def __compare_wasm_memorytype_t(self, other):
     if not isinstance(other, wasm_memorytype_t):
         return False
@@ -287,10 +329,6 @@ def __repr_wasm_memorytype_t(self):
     return f"(memory {limit})"
 
 
-wasm_memorytype_t.__eq__ = __compare_wasm_memorytype_t
-wasm_memorytype_t.__repr__ = __repr_wasm_memorytype_t
-
-
 def __compare_wasm_externtype_t(self, other):
     if not isinstance(other, wasm_externtype_t):
         return False
@@ -333,10 +371,6 @@ def __repr_wasm_externtype_t(self):
         raise RuntimeError("not a valid wasm_externtype_t")
 
 
-wasm_externtype_t.__eq__ = __compare_wasm_externtype_t
-wasm_externtype_t.__repr__ = __repr_wasm_externtype_t
-
-
 def __compare_wasm_importtype_t(self, other):
     if not isinstance(other, wasm_importtype_t):
         return False
@@ -360,11 +394,10 @@ def __repr_wasm_importtype_t(self):
     module = wasm_importtype_module(byref(self))
     name = wasm_importtype_name(byref(self))
     extern_type = wasm_importtype_type(byref(self))
-    return f'(import "{dereference(module)}" "{dereference(name)}" {dereference(extern_type)})'
-
-
-wasm_importtype_t.__eq__ = __compare_wasm_importtype_t
-wasm_importtype_t.__repr__ = __repr_wasm_importtype_t
+    return (
+        f'(import "{dereference(module)}" "{dereference(name)}" '
+        f"{dereference(extern_type)})"
+    )
 
 
 def __compare_wasm_exporttype_t(self, other):
@@ -387,10 +420,6 @@ def __repr_wasm_exporttype_t(self):
     return f'(export "{dereference(name)}" {dereference(extern_type)})'
 
 
-wasm_exporttype_t.__eq__ = __compare_wasm_exporttype_t
-wasm_exporttype_t.__repr__ = __repr_wasm_exporttype_t
-
-
 def __compare_wasm_val_t(self, other):
     if not isinstance(other, wasm_val_t):
         return False
@@ -427,19 +456,12 @@ def __repr_wasm_val_t(self):
         raise RuntimeError("not a valid val kind")
 
 
-wasm_val_t.__repr__ = __repr_wasm_val_t
-wasm_val_t.__eq__ = __compare_wasm_val_t
-
-
 def __repr_wasm_trap_t(self):
     message = wasm_message_t()
     wasm_trap_message(self, message)
     return f'(trap "{str(message)}")'
 
 
-wasm_trap_t.__repr__ = __repr_wasm_trap_t
-
-
 def __repr_wasm_frame_t(self):
     instance = wasm_frame_instance(self)
     module_offset = wasm_frame_module_offset(self)
@@ -448,9 +470,6 @@ def __repr_wasm_frame_t(self):
     return f"> module:{module_offset:#x} => func#{func_index:#x}.{func_offset:#x}"
 
 
-wasm_frame_t.__repr__ = __repr_wasm_frame_t
-
-
 def __repr_wasm_module_t(self):
     imports = wasm_importtype_vec_t()
     wasm_module_imports(self, imports)
@@ -465,9 +484,6 @@ def __repr_wasm_module_t(self):
     return ret
 
 
-wasm_module_t.__repr__ = __repr_wasm_module_t
-
-
 def __repr_wasm_instance_t(self):
     exports = wasm_extern_vec_t()
     wasm_instance_exports(self, exports)
@@ -478,41 +494,26 @@ def __repr_wasm_instance_t(self):
     return ret
 
 
-wasm_instance_t.__repr__ = __repr_wasm_instance_t
-
-
 def __repr_wasm_func_t(self):
     ft = wasm_func_type(self)
     return f"{str(dereference(ft))[:-1]} ... )"
 
 
-wasm_func_t.__repr__ = __repr_wasm_func_t
-
-
 def __repr_wasm_global_t(self):
     gt = wasm_global_type(self)
     return f"{str(dereference(gt))[:-1]} ... )"
 
 
-wasm_global_t.__repr__ = __repr_wasm_global_t
-
-
 def __repr_wasm_table_t(self):
     tt = wasm_table_type(self)
     return f"{str(dereference(tt))[:-1]} ... )"
 
 
-wasm_table_t.__repr__ = __repr_wasm_table_t
-
-
 def __repr_wasm_memory_t(self):
     mt = wasm_memory_type(self)
     return f"{str(dereference(mt))[:-1]} ... )"
 
 
-wasm_memory_t.__repr__ = __repr_wasm_memory_t
-
-
 def __repr_wasm_extern_t(self):
     ext_type = wasm_extern_type(self)
     ext_kind = wasm_extern_kind(self)
@@ -536,11 +537,9 @@ def __repr_wasm_extern_t(self):
     return ret
 
 
-wasm_extern_t.__repr__ = __repr_wasm_extern_t
-
-
 # Function Types construction short-hands
 def wasm_name_new_from_string(s):
+    load_binding()
     name = wasm_name_t()
     data = ((c.c_ubyte) * len(s)).from_buffer_copy(s.encode())
     wasm_byte_vec_new(byref(name), len(s), data)
@@ -548,6 +547,7 @@ def wasm_name_new_from_string(s):
 
 
 def __wasm_functype_new(param_list, result_list):
+    load_binding()
     def __list_to_wasm_valtype_vec(l):
         vec = wasm_valtype_vec_t()
 
@@ -600,6 +600,7 @@ def wasm_functype_new_3_1(p1, p2, p3, r1):
 
 
 def wasm_limits_new(min, max):
+    load_binding()
     limit = wasm_limits_t()
     limit.min = min
     limit.max = max
@@ -607,6 +608,7 @@ def wasm_limits_new(min, max):
 
 
 def wasm_i32_val(i):
+    load_binding()
     v = wasm_val_t()
     v.kind = WASM_I32
     v.of.i32 = i
@@ -614,6 +616,7 @@ def wasm_i32_val(i):
 
 
 def wasm_i64_val(i):
+    load_binding()
     v = wasm_val_t()
     v.kind = WASM_I64
     v.of.i64 = i
@@ -621,6 +624,7 @@ def wasm_i64_val(i):
 
 
 def wasm_f32_val(z):
+    load_binding()
     v = wasm_val_t()
     v.kind = WASM_F32
     v.of.f32 = z
@@ -628,6 +632,7 @@ def wasm_f32_val(z):
 
 
 def wasm_f64_val(z):
+    load_binding()
     v = wasm_val_t()
     v.kind = WASM_F64
     v.of.f64 = z
@@ -635,8 +640,107 @@ def wasm_f64_val(z):
 
 
 def wasm_func_cb_decl(func):
+    load_binding()
     return wasm_func_callback_t(func)
 
 
 def wasm_func_with_env_cb_decl(func):
+    load_binding()
     return wasm_func_callback_with_env_t(func)
+
+
+#
+# Epilogue. The generated binding is loaded on first use
+#
+
+_binding_loaded = False
+
+
+def _enhance_binding():
+    wasm_limits_t.__repr__ = __repr_wasm_limits_t
+    wasm_valtype_t.__eq__ = __compare_wasm_valtype_t
+    wasm_valtype_t.__repr__ = __repr_wasm_valtype_t
+    wasm_byte_vec_t.__eq__ = __compare_wasm_byte_vec_t
+    wasm_byte_vec_t.__repr__ = __repr_wasm_byte_vec_t
+    wasm_functype_t.__eq__ = __compare_wasm_functype_t
+    wasm_functype_t.__repr__ = __repr_wasm_functype_t
+    wasm_globaltype_t.__eq__ = __compare_wasm_globaltype_t
+    wasm_globaltype_t.__repr__ = __repr_wasm_globaltype_t
+    wasm_tabletype_t.__eq__ = __compare_wasm_tabletype_t
+    wasm_tabletype_t.__repr__ = __repr_wasm_tabletype_t
+    wasm_memorytype_t.__eq__ = __compare_wasm_memorytype_t
+    wasm_memorytype_t.__repr__ = __repr_wasm_memorytype_t
+    wasm_externtype_t.__eq__ = __compare_wasm_externtype_t
+    wasm_externtype_t.__repr__ = __repr_wasm_externtype_t
+    wasm_importtype_t.__eq__ = __compare_wasm_importtype_t
+    wasm_importtype_t.__repr__ = __repr_wasm_importtype_t
+    wasm_exporttype_t.__eq__ = __compare_wasm_exporttype_t
+    wasm_exporttype_t.__repr__ = __repr_wasm_exporttype_t
+    wasm_val_t.__repr__ = __repr_wasm_val_t
+    wasm_val_t.__eq__ = __compare_wasm_val_t
+    wasm_trap_t.__repr__ = __repr_wasm_trap_t
+    wasm_frame_t.__repr__ = __repr_wasm_frame_t
+    wasm_module_t.__repr__ = __repr_wasm_module_t
+    wasm_instance_t.__repr__ = __repr_wasm_instance_t
+    wasm_func_t.__repr__ = __repr_wasm_func_t
+    wasm_global_t.__repr__ = __repr_wasm_global_t
+    wasm_table_t.__repr__ = __repr_wasm_table_t
+    wasm_memory_t.__repr__ = __repr_wasm_memory_t
+    wasm_extern_t.__repr__ = __repr_wasm_extern_t
+
+    for vec_type in (
+        wasm_byte_vec_t,
+        wasm_valtype_vec_t,
+        wasm_functype_vec_t,
+        wasm_globaltype_vec_t,
+        wasm_tabletype_vec_t,
+        wasm_memorytype_vec_t,
+        wasm_externtype_vec_t,
+        wasm_importtype_vec_t,
+        wasm_exporttype_vec_t,
+        wasm_val_vec_t,
+        wasm_frame_vec_t,
+        wasm_extern_vec_t,
+    ):
+        _VEC_TYPES[vec_type] = vec_type
+        _VEC_TYPES[POINTER(vec_type)] = vec_type
+
+
+def load_binding() -> None:
+    """
+    Execute the generated binding and expose its symbols in this module.
+    """
+    global _binding_loaded
+    if _binding_loaded:
+        return
+    with _lock:
+        if _binding_loaded:
+            return
+        from . import binding
+
+        namespace = globals()
+        for name, value in vars(binding).items():
+            if not name.startswith("_") and name not in namespace:
+                namespace[name] = value
+        _enhance_binding()
+        _binding_loaded = True
+
+
+def __getattr__(name):
+    # only called for the names not materialized yet
+    if name.startswith("__") and name != "__all__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    load_binding()
+    if name == "__all__":
+        return [name for name in globals() if not name.startswith("_")]
+    try:
+        return globals()[name]
+    except KeyError:
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}"
+        ) from None
+
+
+def __dir__():
+    load_binding()
+    return list(globals())
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-function-docstring
+
+"""
+A cache of serialized modules, shared by the processes loading them.
+"""
+
+import mmap
+import os
+import struct
+
+from wamr.filestore import FileStore
+from wamr.filestore import atomic_file
+from wamr.filestore import content_key
+from wamr.filestore import runtime_version as _runtime_version
+from wamr.filestore import sha256
+
+from . import ffi
+from .objects import Module
+from .objects import Store
+
+ENTRY_SUFFIX = ".module"
+# an entry is the header, then the serialized module
+ENTRY_MAGIC = b"WAMRMOD\0"
+# the magic, the size and the SHA-256 of the serialized module
+ENTRY_HEADER = struct.Struct("<8sQ32s")
+
+
+def runtime_version() -> str:
+    return _runtime_version(ffi.libiwasm.wasm_runtime_get_version)
+
+
+class ModuleCache(FileStore):
+    """
+    The modules compiled by the runtime, serialized to `directory` with
+    wasm_module_serialize() and loaded back with wasm_module_deserialize().
+
+    Entries are named after the SHA-256 of the wasm bytes, the version of the
+    runtime and the host, so a changed module, runtime upgrade or other
+    target never loads a stale entry. Each entry records the size and the
+    SHA-256 of the serialized module, checked when it is mapped, and a
+    truncated or corrupted entry is removed and compiled again. Entries are
+    written to a temporary file and renamed into place, several processes
+    can share the directory. Loading an entry refreshes its mtime, and the
+    least recently used entries are removed once the directory grows beyond
+    `max_size` bytes.
+
+    Only runtimes with the JIT in eager mode serialize modules. With the
+    others, get() compiles the modules every time and writes nothing.
+    """
+
+    def __init__(self, directory: str, max_size: int = 256 * 1024 * 1024):
+        super().__init__(directory, ENTRY_SUFFIX, max_size)
+        # None until the first module is serialized, or fails to
+        self.serializable = None
+
+    def key(self, binary) -> str:
+        """
+        The cache key of the wasm bytes `binary`.
+        """
+        import platform
+
+        return content_key(
+            binary, runtime_version(), platform.system(), platform.machine()
+        )
+
+    def get(self, store: Store, binary) -> Module:
+        """
+        The module of the wasm bytes `binary`, deserialized from its entry, or
+        compiled and serialized on a miss.
+        """
+        if self.serializable is False:
+            return Module(store, binary)
+
+        path = self.path(self.key(binary))
+        module = self._load(store, path)
+        if module is not None:
+            return module
+
+        module = Module(store, binary)
+        try:
+            data = module.serialize()
+        except RuntimeError:
+            self.serializable = False
+            return module
+        self.serializable = True
+        self._store(path, data)
+        self.evict(keep=path)
+        return module
+
+    def get_file(self, store: Store, wasm_path: str) -> Module:
+        with open(wasm_path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) as binary:
+                return self.get(store, binary)
+
+    def _load(self, store, path):
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if size < ENTRY_HEADER.size:
+                return self._discard(path)
+            # copy-on-write, the module is loaded from the mapping in place
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) as data:
+                magic, data_size, digest = ENTRY_HEADER.unpack_from(data)
+                with memoryview(data)[ENTRY_HEADER.size :] as serialized:
+                    if (
+                        magic != ENTRY_MAGIC
+                        or data_size != len(serialized)
+                        or digest != sha256(serialized).digest()
+                    ):
+                        return self._discard(path)
+                    try:
+                        module = Module.deserialize(store, serialized)
+                    except RuntimeError:
+                        return self._discard(path)
+
+        self.touch(path)
+        return module
+
+    def _discard(self, path):
+        self.discard(path)
+        return None
+
+    def _store(self, path, data):
+        header = ENTRY_HEADER.pack(ENTRY_MAGIC, len(data), sha256(data).digest())
+        with atomic_file(path) as f:
+            f.write(header)
+            f.write(data)
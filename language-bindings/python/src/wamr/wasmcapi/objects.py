@@ -0,0 +1,463 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-function-docstring
+
+"""
+Objects over the wasm-c-api which delete their native counterpart when they
+are garbage collected. Each object keeps the ones it depends on alive, e.g.
+a Func its Instance, an Instance its Module and Store.
+"""
+
+import ctypes as c
+import struct
+import weakref
+
+from . import ffi
+
+# wasm_val_t: the kind, padding, then the value at offset 8
+VAL_SIZE = 16
+VAL_OFFSET = 8
+
+# kind -> struct format of the value and its padding
+_VAL_FORMATS = {
+    0: "i4x",  # WASM_I32
+    1: "q",  # WASM_I64
+    2: "f4x",  # WASM_F32
+    3: "d",  # WASM_F64
+    128: "P",  # WASM_EXTERNREF
+    129: "P",  # WASM_FUNCREF
+}
+
+
+def _val_format(kind):
+    try:
+        return _VAL_FORMATS[kind]
+    except KeyError:
+        raise RuntimeError(f"not a supported val kind {kind}") from None
+
+
+def _trap_to_error(trap):
+    """
+    The message of `trap`, which is deleted, as a RuntimeError.
+    """
+    message = ffi.wasm_message_t()
+    ffi.wasm_trap_message(trap, message)
+    text = bytes(ffi.VecView(message)).rstrip(b"\0").decode(errors="replace")
+    ffi.wasm_byte_vec_delete(message)
+    ffi.wasm_trap_delete(trap)
+    return RuntimeError(text)
+
+
+def _val_struct(kinds):
+    """
+    The values of a wasm_val_t array of `kinds`, skipping their kinds.
+    """
+    return struct.Struct(
+        "@" + "".join(f"{VAL_OFFSET}x{_val_format(kind)}" for kind in kinds)
+    )
+
+
+def _functype_kinds(functype):
+    params = [
+        ffi.wasm_valtype_kind(vt)
+        for vt in ffi.VecView(ffi.wasm_functype_params(functype))
+    ]
+    results = [
+        ffi.wasm_valtype_kind(vt)
+        for vt in ffi.VecView(ffi.wasm_functype_results(functype))
+    ]
+    return params, results
+
+
+def _functype_new(params, results):
+    def valtype_vec(kinds):
+        vec = ffi.wasm_valtype_vec_t()
+        data = (c.POINTER(ffi.wasm_valtype_t) * len(kinds))(
+            *[ffi.wasm_valtype_new(kind) for kind in kinds]
+        )
+        ffi.wasm_valtype_vec_new(vec, len(kinds), data)
+        return vec
+
+    # takes the ownership of the vectors
+    return ffi.wasm_functype_new(valtype_vec(params), valtype_vec(results))
+
+
+# `wasm_func_call` on plain addresses, which skips the pointer type checks of
+# the generated prototype, bound on first use
+_func_call_raw = None
+
+
+def _bind_func_call_raw():
+    global _func_call_raw
+    if _func_call_raw is None:
+        _func_call_raw = c.CFUNCTYPE(c.c_void_p, c.c_void_p, c.c_void_p, c.c_void_p)(
+            c.cast(ffi.wasm_func_call, c.c_void_p).value
+        )
+
+
+class _ValBuffer:
+    """
+    A wasm_val_vec_t over `len(kinds)` values in Python-owned memory, read
+    and written with one struct call.
+    """
+
+    def __init__(self, kinds):
+        self.buffer = bytearray(VAL_SIZE * len(kinds))
+        self.vec = ffi.wasm_val_vec_t()
+        if kinds:
+            data = (ffi.wasm_val_t * len(kinds)).from_buffer(self.buffer)
+            self.vec.size = self.vec.num_elems = len(kinds)
+            self.vec.data = c.cast(data, c.POINTER(ffi.wasm_val_t))
+            self.vec.size_of_elem = VAL_SIZE
+        # the padding before each value zeroes its kind, WASM_I32, so the
+        # other kinds are written back after packing
+        self.values = _val_struct(kinds)
+        self.kinds = [
+            (VAL_SIZE * i, kind) for i, kind in enumerate(kinds) if kind != 0
+        ]
+        self.count = len(kinds)
+        self.address = c.addressof(self.vec)
+        self.data_address = c.cast(self.vec.data, c.c_void_p).value
+
+    def pack(self, args):
+        buffer = self.buffer
+        self.values.pack_into(buffer, 0, *args)
+        for offset, kind in self.kinds:
+            buffer[offset] = kind
+
+
+def _delete_store(store, engine):
+    ffi.wasm_store_delete(store)
+    ffi.wasm_engine_delete(engine)
+
+
+class Store:
+    """
+    A wasm_store_t, and the engine it belongs to.
+    """
+
+    def __init__(self):
+        engine = ffi.wasm_engine_new()
+        if not engine:
+            raise RuntimeError("failed to create the engine")
+        store = ffi.wasm_store_new(engine)
+        if not store:
+            ffi.wasm_engine_delete(engine)
+            raise RuntimeError("failed to create the store")
+        self.engine = engine
+        self.store = store
+        self._finalizer = weakref.finalize(self, _delete_store, store, engine)
+
+
+def _byte_vec(data):
+    """
+    A wasm_byte_vec_t over the buffer `data`, which the runtime never frees.
+    A writable buffer is not copied.
+    """
+    size = memoryview(data).nbytes
+    try:
+        array = (c.c_ubyte * size).from_buffer(data)
+    except TypeError:
+        array = (c.c_ubyte * size).from_buffer_copy(data)
+    vec = ffi.wasm_byte_vec_t()
+    vec.size = vec.num_elems = size
+    # cast() from the array would keep it in a reference cycle, and `data`
+    # exported until a garbage collection
+    vec.data = c.cast(c.addressof(array), c.POINTER(ffi.wasm_byte_t))
+    vec.size_of_elem = 1
+    vec.array = array
+    return vec
+
+
+class Module:
+    """
+    A wasm_module_t compiled from `binary`, the content of a .wasm file.
+    """
+
+    def __init__(self, store: Store, binary: bytes):
+        # the runtime loads a copy of the binary
+        module = ffi.wasm_module_new(store.store, _byte_vec(binary))
+        if not module:
+            raise RuntimeError("failed to compile the module")
+        self._init(store, module)
+
+    def _init(self, store, module):
+        self.store = store
+        self.module = module
+        self._finalizer = weakref.finalize(self, ffi.wasm_module_delete, module)
+
+    @classmethod
+    def from_file(cls, store: Store, path: str) -> "Module":
+        with open(path, "rb") as f:
+            return cls(store, f.read())
+
+    @classmethod
+    def deserialize(cls, store: Store, data) -> "Module":
+        """
+        The module serialized in `data`, any buffer, by serialize().
+        """
+        module = ffi.wasm_module_deserialize(store.store, _byte_vec(data))
+        if not module:
+            raise RuntimeError("failed to deserialize the module")
+        self = cls.__new__(cls)
+        self._init(store, module)
+        return self
+
+    def serialize(self) -> bytes:
+        """
+        The compiled module, which deserialize() loads without compiling it
+        again. Only runtimes with the JIT in eager mode can serialize.
+        """
+        out = ffi.wasm_byte_vec_t()
+        ffi.wasm_module_serialize(self.module, out)
+        if not out.num_elems:
+            raise RuntimeError("failed to serialize the module")
+        data = bytes(ffi.VecView(out))
+        ffi.wasm_byte_vec_delete(out)
+        return data
+
+    def export_names(self) -> list:
+        exports = ffi.wasm_exporttype_vec_t()
+        ffi.wasm_module_exports(self.module, exports)
+        # the names are NUL-terminated
+        names = [
+            bytes(ffi.VecView(ffi.wasm_exporttype_name(export))).rstrip(b"\0").decode()
+            for export in ffi.VecView(exports)
+        ]
+        ffi.wasm_exporttype_vec_delete(exports)
+        return names
+
+
+def _delete_instance(instance, exports):
+    ffi.wasm_extern_vec_delete(exports)
+    ffi.wasm_instance_delete(instance)
+
+
+class Instance:
+    """
+    A wasm_instance_t of `module`, linked with `imports`, in the order of the
+    imports of the module. The runtime only links host functions, created
+    with wasm_func_new(): Funcs over them or their POINTER(wasm_func_t),
+    which the caller keeps alive and deletes.
+
+    `exports` maps the names of the exports to Funcs for the functions, to
+    their POINTER(wasm_extern_t) for the others. The Funcs keep the Instance
+    alive, it only holds them weakly, so it is deleted as soon as it and its
+    Funcs are no longer referenced.
+    """
+
+    def __init__(self, store: Store, module: Module, imports=()):
+        imports = list(imports)
+        import_data = (c.POINTER(ffi.wasm_extern_t) * len(imports))(
+            *[
+                ffi.wasm_func_as_extern(func.func if isinstance(func, Func) else func)
+                for func in imports
+            ]
+        )
+        # not created by the runtime, so never deleted by it
+        import_vec = ffi.wasm_extern_vec_t()
+        if imports:
+            import_vec.size = import_vec.num_elems = len(imports)
+            import_vec.data = c.cast(
+                import_data, c.POINTER(c.POINTER(ffi.wasm_extern_t))
+            )
+            import_vec.size_of_elem = c.sizeof(c.c_void_p)
+
+        trap = c.POINTER(ffi.wasm_trap_t)()
+        instance = ffi.wasm_instance_new(
+            store.store, module.module, import_vec, c.byref(trap)
+        )
+        if trap:
+            if instance:
+                ffi.wasm_instance_delete(instance)
+            raise _trap_to_error(trap)
+        if not instance:
+            raise RuntimeError("failed to instantiate the module")
+
+        exports = ffi.wasm_extern_vec_t()
+        ffi.wasm_instance_exports(instance, exports)
+        self.store = store
+        self.module = module
+        self.imports = imports
+        self.instance = instance
+        self._finalizer = weakref.finalize(self, _delete_instance, instance, exports)
+        self._externs = list(zip(module.export_names(), ffi.VecView(exports)))
+        # name -> Func, which references the instance
+        self._funcs = weakref.WeakValueDictionary()
+
+    @property
+    def exports(self) -> dict:
+        exports = {}
+        for name, extern in self._externs:
+            if ffi.wasm_extern_kind(extern) != ffi.WASM_EXTERN_FUNC:
+                exports[name] = extern
+                continue
+            func = self._funcs.get(name)
+            if func is None:
+                func = self._funcs[name] = Func(self, ffi.wasm_extern_as_func(extern))
+            exports[name] = func
+        return exports
+
+
+class Func:
+    """
+    A wasm_func_t, called with Python numbers. It returns None, the result,
+    or a tuple of the results.
+
+    The params and results vectors are allocated once, the calls only write
+    the arguments into them and read the results back, so a Func must not be
+    called from several threads at a time.
+    """
+
+    def __init__(self, owner, func):
+        functype = ffi.wasm_func_type(func)
+        params, results = _functype_kinds(functype)
+        ffi.wasm_functype_delete(functype)
+
+        _bind_func_call_raw()
+        # owns the memory behind `func`
+        self.owner = owner
+        self.func = func
+        self.params = params
+        self.results = results
+        self._params = _ValBuffer(params)
+        self._results = _ValBuffer(results)
+        self._raw_call_args = (
+            c.cast(func, c.c_void_p).value,
+            self._params.address,
+            self._results.address,
+        )
+
+    @classmethod
+    def from_callable(cls, store: Store, params, results, func) -> "Func":
+        """
+        A host function of `params` and `results`, lists of WASM_I32,
+        WASM_F64..., which calls `func` with Python numbers, see
+        make_callback(). It is meant to be imported by an Instance.
+        """
+        functype = _functype_new(params, results)
+        callback = make_callback(functype, func, store)
+        host_func = ffi.wasm_func_new(store.store, functype, callback)
+        ffi.wasm_functype_delete(functype)
+        if not host_func:
+            raise RuntimeError("failed to create the host function")
+
+        self = cls(store, host_func)
+        self.callback = callback
+        self._finalizer = weakref.finalize(self, ffi.wasm_func_delete, host_func)
+        return self
+
+    def __call__(self, *args):
+        params = self._params
+        if len(args) != params.count:
+            raise TypeError(f"expected {params.count} arguments, got {len(args)}")
+        params.pack(args)
+
+        trap = _func_call_raw(*self._raw_call_args)
+        if trap:
+            raise _trap_to_error(c.cast(trap, c.POINTER(ffi.wasm_trap_t)))
+
+        results = self._results
+        values = results.values.unpack_from(results.buffer)
+        if results.count == 1:
+            return values[0]
+        return values or None
+
+
+# wasm_func_callback_t on plain addresses, see make_callback()
+_raw_callback_t = c.CFUNCTYPE(c.c_void_p, c.c_void_p, c.c_void_p)
+
+
+class _MemoryViews(dict):
+    """
+    Byte memoryviews over `size` bytes at the addresses they are indexed by.
+    The runtime passes a callback the same buffers from one call to the next,
+    so the views are kept, up to a few hundred.
+    """
+
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+
+    def __missing__(self, address):
+        if len(self) >= 256:
+            self.clear()
+        view = memoryview((c.c_char * self.size).from_address(address)).cast("B")
+        self[address] = view
+        return view
+
+
+def _trap_new(store, error):
+    message = ffi.wasm_name_new_from_string(f"{type(error).__name__}: {error}")
+    trap = ffi.wasm_trap_new(store, message)
+    ffi.wasm_byte_vec_delete(message)
+    return c.cast(trap, c.c_void_p).value
+
+
+def make_callback(functype, func, store=None):
+    """
+    A wasm_func_callback_t, for wasm_func_new(), which calls `func` with the
+    params of `functype` as Python numbers. `func` returns None, a number or
+    a tuple of numbers, the results.
+
+    The kinds are read from `functype` once. The params are decoded from the
+    wasm_val_t array of the runtime with one struct call over a memoryview,
+    and the results written back the same way. With `store`, a Store or a
+    POINTER(wasm_store_t), the exceptions raised by `func` become traps,
+    instead of being printed and ignored.
+    """
+    params, results = _functype_kinds(functype)
+    if isinstance(store, Store):
+        store = store.store
+
+    vec_size = c.sizeof(ffi.wasm_val_vec_t)
+    read_data = struct.Struct(f"@{ffi.wasm_val_vec_t.data.offset}xP").unpack_from
+    write_num_elems = struct.Struct(
+        f"@{ffi.wasm_val_vec_t.num_elems.offset}xN"
+    ).pack_into
+    vec_views = _MemoryViews(vec_size)
+
+    param_values = _val_struct(params)
+    unpack_params = param_values.unpack_from
+    param_views = _MemoryViews(param_values.size)
+
+    # the padding before each value zeroes its kind, WASM_I32, so the other
+    # kinds are written back after packing
+    result_values = _val_struct(results)
+    pack_results = result_values.pack_into
+    result_kinds = [
+        (VAL_SIZE * i, kind) for i, kind in enumerate(results) if kind != 0
+    ]
+    result_count = len(results)
+    result_views = _MemoryViews(result_values.size)
+
+    def trampoline(args, results_vec):
+        try:
+            if params:
+                (data,) = read_data(vec_views[args])
+                values = func(*unpack_params(param_views[data]))
+            else:
+                values = func()
+            if result_count:
+                vec = vec_views[results_vec]
+                (data,) = read_data(vec)
+                view = result_views[data]
+                if result_count == 1:
+                    pack_results(view, 0, values)
+                else:
+                    pack_results(view, 0, *values)
+                for offset, kind in result_kinds:
+                    view[offset] = kind
+                write_num_elems(vec, 0, result_count)
+        except Exception as e:
+            if store is None:
+                raise
+            return _trap_new(store, e)
+        return None
+
+    # the cast keeps the raw callback alive
+    return c.cast(_raw_callback_t(trampoline), ffi.wasm_func_callback_t)
@@ -0,0 +1,60 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+Compare passing a string and a blob to an export with a malloc/free pair per
+value against an Instance.arena() per call, for 100 000 calls. The best of
+several rounds is reported.
+"""
+
+import time
+from ctypes import byref, c_void_p, memmove
+
+from wamr.wamrapi.wamr import Engine, Instance, Module
+from wasm_builder import buffer_module
+
+CALLS = 100_000
+ROUNDS = 5
+TEXT = "hello, wasm"
+BLOB = bytes(range(256))
+
+
+def malloc_free(instance: Instance, take) -> None:
+    native_addr = c_void_p()
+    for _ in range(CALLS):
+        text = TEXT.encode()
+        text_ptr = instance.malloc(len(text), byref(native_addr))
+        memmove(native_addr.value, text, len(text))
+        blob_ptr = instance.malloc(len(BLOB), byref(native_addr))
+        memmove(native_addr.value, BLOB, len(BLOB))
+        take(text_ptr, len(text), blob_ptr, len(BLOB))
+        instance.free(blob_ptr)
+        instance.free(text_ptr)
+
+
+def arena(instance: Instance, take) -> None:
+    for _ in range(CALLS):
+        with instance.arena(1024) as a:
+            text = TEXT.encode()
+            take(a.put_bytes(text), len(text), a.put_bytes(BLOB), len(BLOB))
+
+
+def main():
+    engine = Engine()
+    instance = Instance(Module.from_bytes(engine, buffer_module()), heap_size=65536)
+    take = instance.exports.take
+
+    runs = {"malloc/free": malloc_free, "arena": arena}
+    best = dict.fromkeys(runs, float("inf"))
+    for _ in range(ROUNDS):
+        for name, run in runs.items():
+            start = time.perf_counter()
+            run(instance, take)
+            best[name] = min(best[name], time.perf_counter() - start)
+
+    for name, elapsed in best.items():
+        print(f"{name:12} {elapsed:7.3f} s  {elapsed / CALLS * 1e9:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
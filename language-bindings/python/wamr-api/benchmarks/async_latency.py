@@ -0,0 +1,84 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+Measure the event-loop latency while 100 guest calls are in flight, calling
+`spin(n)` directly from a coroutine vs. with Instance.call_async().
+
+A ticker task sleeps for 1 ms in a loop and records how late it wakes up.
+"""
+
+import asyncio
+import statistics
+import time
+
+from wamr.wamrapi.wamr import Engine, Instance, Module
+from wasm_builder import spin_module
+
+CALLS = 100
+INSTANCES = 8
+ITERATIONS = 2_000_000
+TICK = 0.001
+
+
+async def ticker(lags: list, done: asyncio.Event):
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def blocking(instances):
+    for i in range(CALLS):
+        instances[i % len(instances)].exports.spin(ITERATIONS)
+        # let the event loop run between calls, as a request handler would
+        await asyncio.sleep(0)
+
+
+async def non_blocking(instances):
+    await asyncio.gather(
+        *(
+            instances[i % len(instances)].call_async("spin", ITERATIONS)
+            for i in range(CALLS)
+        )
+    )
+
+
+async def measure(workload, instances):
+    lags, done = [], asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, done))
+    start = time.perf_counter()
+    await workload(instances)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    return elapsed, lags
+
+
+def report(name: str, elapsed: float, lags: list):
+    lags = sorted(lags) or [0.0]
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{name:12} {elapsed:7.3f} s  ticks {len(lags):6}  "
+        f"lag p50 {statistics.median(lags) * 1000:8.3f} ms  "
+        f"p99 {p99 * 1000:8.3f} ms  max {lags[-1] * 1000:8.3f} ms"
+    )
+
+
+async def run(instances):
+    # warm up the typed callables and the executor threads
+    await asyncio.gather(*(instance.call_async("spin", 1) for instance in instances))
+
+    report("blocking", *await measure(blocking, instances))
+    report("call_async", *await measure(non_blocking, instances))
+
+
+def main():
+    engine = Engine(pool_size=16 * 1024 * 1024)
+    module = Module.from_bytes(engine, spin_module())
+    instances = [Instance(module) for _ in range(INSTANCES)]
+    asyncio.run(run(instances))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+Compare ExecEnv.call_many against a scalar ExecEnv.call loop, running
+`sum(i32, i32) -> i32` over one million rows.
+"""
+
+import array
+import time
+from ctypes import c_uint
+
+from wamr.wamrapi.wamr import Engine, ExecEnv, Instance, Module
+from wasm_builder import sum_module
+
+ROWS = 1_000_000
+
+
+def scalar_loop(exec_env: ExecEnv, func, rows: array.array) -> array.array:
+    results = array.array("i")
+    argv = (c_uint * 2)()
+    for i in range(0, len(rows), 2):
+        argv[0], argv[1] = rows[i], rows[i + 1]
+        exec_env.call(func, 2, argv)
+        results.append(argv[0])
+    return results
+
+
+def main():
+    engine = Engine()
+    module = Module.from_bytes(engine, sum_module())
+    module_inst = Instance(module)
+    exec_env = ExecEnv(module_inst)
+    func = module_inst.lookup_function("sum")
+
+    rows = array.array("i", range(2 * ROWS))
+
+    start = time.perf_counter()
+    expected = scalar_loop(exec_env, func, rows)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = exec_env.call_many(func, rows)
+    batched = time.perf_counter() - start
+    assert results == expected
+
+    print(f"ExecEnv.call loop      {scalar:8.3f} s")
+    print(f"ExecEnv.call_many      {batched:8.3f} s  (x{scalar / batched:.1f})")
+
+    try:
+        import numpy
+    except ImportError:
+        return
+
+    matrix = numpy.frombuffer(rows, dtype=numpy.int32).reshape(ROWS, 2)
+    start = time.perf_counter()
+    results = exec_env.call_many(func, matrix)
+    batched = time.perf_counter() - start
+    assert results.ravel().tolist() == expected.tolist()
+    print(f"ExecEnv.call_many (np) {batched:8.3f} s  (x{scalar / batched:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+Compare the cost of a host call registered by hand with
+Engine.register_natives against Engine.host_function, with a module calling
+`add(i32, i32) -> i32` one million times. The best of several rounds is
+reported.
+"""
+
+import time
+from ctypes import CFUNCTYPE, c_int32, c_void_p, cast
+
+from wamr.wamrapi.iwasm import NativeSymbol, String
+from wamr.wamrapi.wamr import Engine, Instance, Module
+from wasm_builder import host_loop_module
+
+CALLS = 1_000_000
+ROUNDS = 5
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+def legacy_add(env: int, a: int, b: int) -> int:
+    return a + b
+
+
+def main():
+    engine = Engine()
+
+    legacy_symbols = (NativeSymbol * 1)(
+        NativeSymbol(
+            symbol=String.from_param("add"),
+            func_ptr=cast(
+                CFUNCTYPE(c_int32, c_void_p, c_int32, c_int32)(legacy_add), c_void_p
+            ),
+            signature=String.from_param("(ii)i"),
+        )
+    )
+    engine.register_natives("legacy", legacy_symbols)
+    engine.host_function("decorator")(add)
+
+    runs = {
+        name: Instance(Module.from_bytes(engine, host_loop_module(name))).exports.run
+        for name in ("legacy", "decorator")
+    }
+    best = dict.fromkeys(runs, float("inf"))
+    for _ in range(ROUNDS):
+        for name, run in runs.items():
+            start = time.perf_counter()
+            run(CALLS)
+            best[name] = min(best[name], time.perf_counter() - start)
+
+    for name, elapsed in best.items():
+        print(f"{name:10} {elapsed:7.3f} s  {elapsed / CALLS * 1e9:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
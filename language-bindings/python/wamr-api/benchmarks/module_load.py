@@ -0,0 +1,61 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+Compare the load time of 1 MB, 10 MB and 100 MB modules between the legacy
+element-by-element copy and the zero-copy Module constructors.
+"""
+
+import pathlib
+import tempfile
+import time
+from ctypes import c_uint8, create_string_buffer
+
+from wamr.wamrapi.iwasm import wasm_runtime_load, wasm_runtime_unload
+from wamr.wamrapi.wamr import Engine, Module
+from wasm_builder import sum_module
+
+SIZES = [1 << 20, 10 << 20, 100 << 20]
+REPEAT = 3
+
+
+def legacy_load(fp: pathlib.Path):
+    with open(fp, "rb") as f:
+        data = f.read()
+        data = (c_uint8 * len(data))(*data)
+    error_buf = create_string_buffer(128)
+    module = wasm_runtime_load(data, len(data), error_buf, len(error_buf))
+    if not module:
+        raise Exception("Error while creating module")
+    wasm_runtime_unload(module)
+
+
+def best_of(func) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    engine = Engine()
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            fp = pathlib.Path(tmp) / f"padded_{size >> 20}MB.wasm"
+            fp.write_bytes(sum_module(padding=size))
+            data = fp.read_bytes()
+
+            results = {
+                "legacy copy": best_of(lambda: legacy_load(fp)),
+                "from_file (mmap)": best_of(lambda: Module.from_file(engine, fp)),
+                "from_bytes": best_of(lambda: Module.from_bytes(engine, data)),
+            }
+            print(f"{size >> 20:>4} MB module")
+            for label, elapsed in results.items():
+                print(f"    {label:<18} {elapsed * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
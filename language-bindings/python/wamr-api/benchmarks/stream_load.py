@@ -0,0 +1,90 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+Compare loading a 64 MB module received as 64 KiB chunks, as from an object
+store stream, between buffering the whole stream in Python before
+Module.from_bytes and Module.from_stream. Each run is a fresh process, which
+reports its time to the first instance and the growth of its peak RSS.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from wamr.wamrapi.wamr import Engine, Instance, Module
+from wasm_builder import sum_module
+
+MODULE_SIZE = 64 << 20
+CHUNK_SIZE = 64 << 10
+REPEAT = 3
+
+
+def chunks(path: str):
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def peak_rss() -> int:
+    # ru_maxrss starts from the RSS of the parent on Linux, VmHWM does not
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes, except on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run(mode: str, path: str):
+    engine = Engine()
+    rss = peak_rss()
+    start = time.perf_counter()
+    if mode == "buffered":
+        module = Module.from_bytes(engine, b"".join(chunks(path)))
+    else:
+        module = Module.from_stream(engine, chunks(path))
+    instance = Instance(module)
+    elapsed = time.perf_counter() - start
+    print(elapsed, peak_rss() - rss)
+    # skip the teardown, it is not measured
+    sys.stdout.flush()
+    os._exit(0)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "module.wasm")
+        with open(path, "wb") as f:
+            f.write(sum_module(MODULE_SIZE))
+
+        for mode in ("buffered", "stream"):
+            best_time, best_rss = float("inf"), float("inf")
+            for _ in range(REPEAT):
+                result = subprocess.run(
+                    [sys.executable, __file__, mode, path],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                elapsed, rss = result.stdout.split()[-2:]
+                best_time = min(best_time, float(elapsed))
+                best_rss = min(best_rss, int(rss))
+            print(
+                f"{mode:10} {best_time * 1000:8.1f} ms to first instance  "
+                f"{best_rss / (1 << 20):6.1f} MB peak RSS growth"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run(*sys.argv[1:])
+    else:
+        main()
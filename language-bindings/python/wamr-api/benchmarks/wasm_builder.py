@@ -0,0 +1,211 @@
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+
+"""
+A tiny WebAssembly binary encoder so that the benchmarks can generate the
+modules they need (of any size) without requiring wasi-sdk or wabt.
+"""
+
+import struct
+
+I32 = 0x7F
+I64 = 0x7E
+F32 = 0x7D
+F64 = 0x7C
+
+
+def uleb(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def sleb(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if (value == 0 and not byte & 0x40) or (value == -1 and byte & 0x40):
+            out.append(byte)
+            return bytes(out)
+        out.append(byte | 0x80)
+
+
+def name(s: str) -> bytes:
+    data = s.encode("utf-8")
+    return uleb(len(data)) + data
+
+
+def vec(items) -> bytes:
+    items = list(items)
+    return uleb(len(items)) + b"".join(items)
+
+
+def section(section_id: int, payload: bytes) -> bytes:
+    return bytes([section_id]) + uleb(len(payload)) + payload
+
+
+class ModuleBuilder:
+    """
+    Collects function types, imports, functions, exports and custom sections
+    and encodes them into a binary module.
+    """
+
+    def __init__(self):
+        self.types = []
+        self.imports = []
+        self.funcs = []
+        self.exports = []
+        self.customs = []
+        self.memory = None
+
+    def _type_index(self, params, results) -> int:
+        functype = b"\x60" + vec(bytes([p]) for p in params)
+        functype += vec(bytes([r]) for r in results)
+        if functype not in self.types:
+            self.types.append(functype)
+        return self.types.index(functype)
+
+    def import_func(self, module: str, field: str, params, results) -> int:
+        self.imports.append(
+            name(module) + name(field) + b"\x00" + uleb(self._type_index(params, results))
+        )
+        return len(self.imports) - 1
+
+    def add_func(self, params, results, body: bytes, export: str = None, locals_=()):
+        index = len(self.imports) + len(self.funcs)
+        local_decls = vec(uleb(1) + bytes([t]) for t in locals_)
+        code = local_decls + body + b"\x0b"
+        self.funcs.append((self._type_index(params, results), uleb(len(code)) + code))
+        if export:
+            self.exports.append(name(export) + b"\x00" + uleb(index))
+        return index
+
+    def set_memory(self, min_pages: int, max_pages: int = None, export: str = None):
+        if max_pages is None:
+            self.memory = b"\x00" + uleb(min_pages)
+        else:
+            self.memory = b"\x01" + uleb(min_pages) + uleb(max_pages)
+        if export:
+            self.exports.append(name(export) + b"\x02" + uleb(0))
+
+    def add_custom(self, section_name: str, payload: bytes):
+        self.customs.append(name(section_name) + payload)
+
+    def build(self) -> bytes:
+        out = b"\x00asm\x01\x00\x00\x00"
+        if self.types:
+            out += section(1, vec(self.types))
+        if self.imports:
+            out += section(2, vec(self.imports))
+        if self.funcs:
+            out += section(3, vec(uleb(t) for t, _ in self.funcs))
+        if self.memory is not None:
+            out += section(5, vec([self.memory]))
+        if self.exports:
+            out += section(7, vec(self.exports))
+        if self.funcs:
+            out += section(10, vec(code for _, code in self.funcs))
+        for custom in self.customs:
+            out += section(0, custom)
+        return out
+
+
+def local_get(index: int) -> bytes:
+    return b"\x20" + uleb(index)
+
+
+def i32_const(value: int) -> bytes:
+    return b"\x41" + sleb(value)
+
+
+def f64_const(value: float) -> bytes:
+    return b"\x44" + struct.pack("<d", value)
+
+
+def call(index: int) -> bytes:
+    return b"\x10" + uleb(index)
+
+
+def local_tee(index: int) -> bytes:
+    return b"\x22" + uleb(index)
+
+
+def loop(body: bytes) -> bytes:
+    return b"\x03\x40" + body + b"\x0b"
+
+
+def br_if(depth: int) -> bytes:
+    return b"\x0d" + uleb(depth)
+
+
+I32_ADD = b"\x6a"
+I32_SUB = b"\x6b"
+DROP = b"\x1a"
+I64_ADD = b"\x7c"
+F64_ADD = b"\xa0"
+UNREACHABLE = b"\x00"
+
+
+def sum_module(padding: int = 0) -> bytes:
+    """
+    A module exporting `sum(i32, i32) -> i32` and a 1-page memory, optionally
+    padded with a custom section to reach a given binary size.
+    """
+    builder = ModuleBuilder()
+    builder.set_memory(1, export="memory")
+    builder.add_func([I32, I32], [I32], local_get(0) + local_get(1) + I32_ADD, "sum")
+    if padding:
+        builder.add_custom("padding", bytes(padding))
+    return builder.build()
+
+
+def spin_module() -> bytes:
+    """
+    A module exporting `spin(n: i32) -> i32`, a loop burning n iterations.
+    """
+    builder = ModuleBuilder()
+    body = loop(local_get(0) + i32_const(1) + I32_SUB + local_tee(0) + br_if(0))
+    builder.add_func([I32], [I32], body + local_get(0), "spin")
+    return builder.build()
+
+
+def host_loop_module(import_module: str) -> bytes:
+    """
+    A module exporting `run(n: i32) -> i32`, calling the import
+    `import_module`.`add(i32, i32) -> i32` n times.
+    """
+    builder = ModuleBuilder()
+    add = builder.import_func(import_module, "add", [I32, I32], [I32])
+    body = loop(
+        local_get(0)
+        + local_get(0)
+        + call(add)
+        + DROP
+        + local_get(0)
+        + i32_const(1)
+        + I32_SUB
+        + local_tee(0)
+        + br_if(0)
+    )
+    builder.add_func([I32], [I32], body + local_get(0), "run")
+    return builder.build()
+
+
+def buffer_module() -> bytes:
+    """
+    A module exporting a 1-page memory and `take(ptr: i32, len: i32, ptr: i32,
+    len: i32) -> i32`, returning the total length of the two buffers.
+    """
+    builder = ModuleBuilder()
+    builder.set_memory(1, export="memory")
+    builder.add_func(
+        [I32, I32, I32, I32], [I32], local_get(1) + local_get(3) + I32_ADD, "take"
+    )
+    return builder.build()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+__all__ = [
+    "test_aio",
+    "test_aot_cache",
+    "test_arena",
+    "test_autotune",
+    "test_call_many",
+    "test_engine",
+    "test_executor",
+    "test_exports",
+    "test_filestore",
+    "test_from_stream",
+    "test_host_function",
+    "test_import",
+    "test_memory",
+    "test_memory_info",
+    "test_module_types",
+    "test_pgo",
+    "test_pool",
+    "test_process_pool",
+    "test_profiling",
+    "test_shared_heap",
+]
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from wamr.wamrapi import aio
+from wamr.wamrapi.aio import AsyncRunner
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_process_pool import SPIN_MODULE_BINARY
+
+# iterations of spin(), about a minute of guest code
+FOREVER = 2**31 - 1
+# about a tenth of a second with the interpreter
+SHORT = 4 * 10**6
+
+
+class AsyncCallTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), SPIN_MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def setUp(self):
+        self._instance = Instance(self._module)
+        self._runner = AsyncRunner(workers=4, max_concurrency=2)
+
+    def tearDown(self):
+        self._runner.shutdown()
+        del self._instance
+
+    def assert_reusable(self):
+        self.assertEqual(0, self._instance.exports.spin(3))
+        result = asyncio.run(self._runner.call(self._instance, "spin", 3))
+        self.assertEqual(0, result)
+
+    def test_call_async(self):
+        self.assertEqual(0, asyncio.run(self._instance.call_async("spin", 3)))
+
+    def test_timeout(self):
+        start = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(
+                self._runner.call(self._instance, "spin", FOREVER, timeout=0.1)
+            )
+        self.assertLess(time.monotonic() - start, 10)
+        self.assert_reusable()
+
+    def test_cancel(self):
+        async def main():
+            task = asyncio.create_task(
+                self._runner.call(self._instance, "spin", FOREVER)
+            )
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        start = time.monotonic()
+        asyncio.run(main())
+        self.assertLess(time.monotonic() - start, 10)
+        self.assert_reusable()
+
+    def test_terminate(self):
+        timer = threading.Timer(0.1, self._instance.terminate)
+        timer.start()
+        with self.assertRaises(Exception) as context:
+            self._instance.exports.spin(FOREVER)
+        timer.join()
+        self.assertIn("terminated", str(context.exception))
+        self.assert_reusable()
+
+    def test_instruction_limit(self):
+        async def main():
+            return await self._runner.call(
+                self._instance, "spin", FOREVER, instruction_limit=1000
+            )
+
+        with self.assertRaises(Exception) as context:
+            asyncio.run(main())
+        if isinstance(context.exception, NotImplementedError):
+            self.skipTest("requires WAMR_BUILD_INSTRUCTION_METERING")
+        self.assertIn("instruction limit", str(context.exception))
+        self.assert_reusable()
+
+    def test_max_concurrency(self):
+        lock = threading.Lock()
+        running = [0, 0]
+        run_call = aio._run_call
+
+        def counting_run_call(*args):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            try:
+                return run_call(*args)
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        instances = [Instance(self._module) for _ in range(6)]
+
+        async def main():
+            return await asyncio.gather(
+                *(self._runner.call(instance, "spin", SHORT) for instance in instances)
+            )
+
+        with mock.patch.object(aio, "_run_call", counting_run_call):
+            self.assertEqual([0] * 6, asyncio.run(main()))
+        # 4 workers, at most 2 calls in flight
+        self.assertEqual(2, running[1])
+        del instances
+
+    def test_same_instance_serialized(self):
+        async def main():
+            return await asyncio.gather(
+                *(self._runner.call(self._instance, "spin", 3) for _ in range(8))
+            )
+
+        self.assertEqual([0] * 8, asyncio.run(main()))
+
+
+if __name__ == "__main__":
+    unittest.main()
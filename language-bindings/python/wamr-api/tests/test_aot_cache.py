@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from wamr.wamrapi import aot_cache
+from wamr.wamrapi.aot_cache import AotCache
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_exports import MODULE_BINARY
+
+AOT_HEADER = b"\0aot\x05\0\0\0"
+
+
+def fake_wamrc(args, **kwargs):
+    # writes the header and the wasm bytes, to tell the outputs apart
+    out_path = args[args.index("-o") + 1]
+    with open(args[-1], "rb") as f:
+        data = f.read()
+    with open(out_path, "wb") as f:
+        f.write(AOT_HEADER + data)
+    return subprocess.CompletedProcess(args, 0, "", "")
+
+
+class AotCacheKeyTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(
+            AotCache, "_get_wamrc_version", return_value="wamrc 2.0.0"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def key(self, host_cpu, **kwargs):
+        with mock.patch.object(aot_cache, "host_cpu", return_value=host_cpu):
+            return AotCache(self._directory.name, **kwargs).key(MODULE_BINARY)
+
+    def test_host_cpu(self):
+        self.assertTrue(aot_cache.host_cpu())
+
+    def test_key_host_cpu(self):
+        self.assertEqual(self.key("skylake;avx2"), self.key("skylake;avx2"))
+        self.assertNotEqual(self.key("skylake;avx2"), self.key("icelake;avx512f"))
+
+    def test_key_explicit_cpu(self):
+        for options in ({"cpu": "skylake"}, {"target": "x86_64"}):
+            self.assertEqual(
+                self.key("skylake;avx2", **options),
+                self.key("icelake;avx512f", **options),
+            )
+        self.assertNotEqual(
+            self.key("skylake;avx2", cpu="skylake"),
+            self.key("skylake;avx2", cpu="icelake-server"),
+        )
+
+
+class AotCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+        self.cache_directory = os.path.join(self.directory, "cache")
+        for patcher in (
+            mock.patch.object(aot_cache, "find_wamrc", return_value="wamrc"),
+            mock.patch.object(
+                AotCache, "_get_wamrc_version", return_value="wamrc 2.0.0"
+            ),
+            mock.patch.object(aot_cache, "host_cpu", return_value="skylake"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            aot_cache.subprocess, "run", side_effect=fake_wamrc
+        )
+        self.run_wamrc = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def entries(self, cache):
+        return [entry.path for entry in cache.entries()]
+
+    def test_compile_and_hit(self):
+        cache = AotCache(self.cache_directory)
+        wasm_path = self.write("a.wasm", MODULE_BINARY)
+
+        data = cache.load(wasm_path)
+        self.assertEqual(AOT_HEADER + MODULE_BINARY, data[:])
+        self.assertEqual(1, self.run_wamrc.call_count)
+        args = self.run_wamrc.call_args.args[0]
+        self.assertEqual(["wamrc", "--opt-level=3", "-o"], args[:3])
+        (aot_path,) = self.entries(cache)
+        self.assertEqual(cache.path(cache.key(MODULE_BINARY)), aot_path)
+
+        os.utime(aot_path, (0, 0))
+        self.assertEqual(data[:], cache.load(wasm_path)[:])
+        self.assertEqual(aot_path, cache.get(wasm_path))
+        self.assertEqual(1, self.run_wamrc.call_count)
+        # a hit refreshes the mtime
+        self.assertGreater(os.stat(aot_path).st_mtime, 0)
+
+    def test_get_compiles(self):
+        cache = AotCache(self.cache_directory)
+        wasm_path = self.write("a.wasm", MODULE_BINARY)
+        aot_path = cache.get(wasm_path)
+        with open(aot_path, "rb") as f:
+            self.assertEqual(AOT_HEADER + MODULE_BINARY, f.read())
+        self.assertEqual(aot_path, cache.get(wasm_path))
+        self.assertEqual(1, self.run_wamrc.call_count)
+
+    def test_evict(self):
+        entry_size = len(AOT_HEADER) + len(MODULE_BINARY) + 1
+        cache = AotCache(self.cache_directory, max_size=2 * entry_size)
+        paths = []
+        for mtime, name in enumerate("abc"):
+            # distinct bytes, hence keys, the outputs are never loaded
+            path = self.write(name + ".wasm", MODULE_BINARY + name.encode())
+            cache.load(path)
+            paths.append(cache.get(path))
+            os.utime(paths[-1], (mtime, mtime))
+
+        self.assertEqual(3, self.run_wamrc.call_count)
+        self.assertEqual(paths[1:], self.entries(cache))
+
+    def test_evicted_entry_stays_mapped(self):
+        cache = AotCache(self.cache_directory)
+        wasm_path = self.write("a.wasm", MODULE_BINARY)
+        data = cache.load(wasm_path)
+        # another process evicts the entry
+        cache.clear()
+        self.assertEqual(AOT_HEADER + MODULE_BINARY, data[:])
+
+    def test_compile_error(self):
+        cache = AotCache(self.cache_directory)
+        wasm_path = self.write("a.wasm", MODULE_BINARY)
+        self.run_wamrc.side_effect = None
+        self.run_wamrc.return_value = subprocess.CompletedProcess(
+            [], 1, "", "invalid module"
+        )
+        with self.assertRaises(Exception) as context:
+            cache.load(wasm_path)
+        self.assertIn("invalid module", str(context.exception))
+        self.assertEqual([], os.listdir(self.cache_directory))
+
+    def test_not_wasm(self):
+        cache = AotCache(self.cache_directory)
+        aot_path = self.write("a.aot", AOT_HEADER + MODULE_BINARY)
+        empty_path = self.write("empty.wasm", b"")
+
+        self.assertEqual(AOT_HEADER + MODULE_BINARY, cache.load(aot_path)[:])
+        self.assertEqual(aot_path, cache.get(aot_path))
+        self.assertEqual(b"", cache.load(empty_path))
+        self.assertEqual(empty_path, cache.get(empty_path))
+        self.run_wamrc.assert_not_called()
+        self.assertEqual([], self.entries(cache))
+
+    def test_from_file_empty(self):
+        empty_path = self.write("empty.wasm", b"")
+        for options in ({}, {"aot_cache": self.cache_directory}):
+            with self.assertRaises(ValueError):
+                Module.from_file(get_engine(), empty_path, **options)
+        self.run_wamrc.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
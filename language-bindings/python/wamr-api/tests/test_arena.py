@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import array
+import unittest
+
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_exports import MODULE_BINARY
+
+HEAP_SIZE = 16384
+
+
+class ArenaTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def setUp(self):
+        self._instance = Instance(self._module, heap_size=HEAP_SIZE)
+
+    def tearDown(self):
+        del self._instance
+
+    def read(self, offset, nbytes):
+        return bytes(self._instance.memory.view()[offset : offset + nbytes])
+
+    def heap_free_size(self):
+        return self._instance.memory_info().heap_free_size
+
+    def test_put(self):
+        with self._instance.arena(256) as arena:
+            data = arena.put_bytes(b"abc")
+            text = arena.put_str("héllo")
+            raw = arena.put_str("xyz", terminate=False)
+            view = arena.put_bytes(bytearray(b"\x01\x02"))
+            numbers = arena.put_array([1, -2, 3], "i")
+            self.assertEqual(b"abc", self.read(data, 3))
+            self.assertEqual("héllo\0".encode(), self.read(text, 7))
+            self.assertEqual(b"xyz", self.read(raw, 3))
+            self.assertEqual(b"\x01\x02", self.read(view, 2))
+            self.assertEqual(
+                array.array("i", [1, -2, 3]).tobytes(), self.read(numbers, 12)
+            )
+            # packed one after the other
+            self.assertEqual(data + 3, text)
+            self.assertEqual(text + 7, raw)
+
+    def test_alignment(self):
+        with self._instance.arena(256) as arena:
+            arena.put_bytes(b"x")
+            self.assertEqual(0, arena.alloc(4) % 8)
+            arena.put_bytes(b"x")
+            self.assertEqual(0, arena.alloc(4, align=16) % 16)
+            arena.put_bytes(b"x")
+            self.assertEqual(0, arena.put_array(array.array("d", [1.0])) % 8)
+            arena.put_bytes(b"x")
+            self.assertEqual(0, arena.put_array(array.array("h", [1])) % 2)
+            arena.put_bytes(b"x")
+            self.assertEqual(0, arena.put_bytes(b"abcd", align=4) % 4)
+
+    def test_overflow(self):
+        with self._instance.arena(16) as arena:
+            with self.assertRaises(MemoryError):
+                arena.put_bytes(bytes(17))
+            first = arena.put_bytes(bytes(15))
+            self.assertEqual(first + 15, arena.put_bytes(b"x"))
+            self.assertEqual(16, arena.used)
+            with self.assertRaises(MemoryError):
+                arena.put_bytes(b"x")
+            with self.assertRaises(MemoryError):
+                arena.alloc(1)
+
+    def test_heap_exhausted(self):
+        with self.assertRaises(MemoryError):
+            with self._instance.arena(2 * HEAP_SIZE):
+                pass
+
+    def test_reuse(self):
+        free_size = self.heap_free_size()
+        with self._instance.arena(256) as arena:
+            offset = arena.put_bytes(b"abc")
+        # the block is kept by the instance
+        self.assertLess(self.heap_free_size(), free_size)
+        kept_free_size = self.heap_free_size()
+
+        for size in (256, 64):
+            with self._instance.arena(size) as arena:
+                self.assertEqual(offset, arena.put_bytes(b"def"))
+                # a smaller arena gets the whole block
+                self.assertEqual(256, arena.size)
+            self.assertEqual(kept_free_size, self.heap_free_size())
+
+        self._instance.release_arena()
+        self.assertEqual(free_size, self.heap_free_size())
+        # once only
+        self._instance.release_arena()
+
+    def test_keep_larger_block(self):
+        free_size = self.heap_free_size()
+        with self._instance.arena(64) as small:
+            # nested arenas each allocate their own block
+            with self._instance.arena(1024) as large:
+                large_offset = large.put_bytes(b"x")
+        # the larger block was kept and the smaller one freed
+        with self._instance.arena(512) as arena:
+            self.assertEqual(large_offset, arena.put_bytes(b"x"))
+        self.assertIsNone(small.offset)
+
+        self._instance.release_arena()
+        self.assertEqual(free_size, self.heap_free_size())
+
+    def test_release_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with self._instance.arena(64) as arena:
+                arena.put_bytes(b"abc")
+                raise RuntimeError
+        self.assertIsNone(arena.offset)
+        self.assertEqual(0, arena.used)
+        self._instance.release_arena()
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self._instance.arena(0)
+        arena = self._instance.arena(64)
+        with self.assertRaises(Exception):
+            arena.alloc(1)
+        with arena:
+            with self.assertRaises(Exception):
+                arena.__enter__()
+            with self.assertRaises(ValueError):
+                arena.put_array(memoryview(array.array("i", range(8)))[::2])
+        self._instance.release_arena()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from wamr.wamrapi import autotune as autotune_module
+from wamr.wamrapi.autotune import TuningTable
+from wamr.wamrapi.autotune import autotune
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_exports import MODULE_BINARY
+from .test_pool import MODULE_BINARY as OTHER_MODULE_BINARY
+
+# the time of one run of the workload per mode, in seconds
+COSTS = {"interp": 3.0, "fast-jit": 1.0, "llvm-jit": 2.0}
+
+
+class AutotuneTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+        cls._other_module = Module.from_bytes(get_engine(), OTHER_MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+        del cls._other_module
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.table_path = os.path.join(self._directory.name, "tuning", "table.json")
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def fake_modes(self):
+        """
+        Pretend the runtime supports every mode of COSTS, with instances
+        whose workload takes the time of their mode on a fake clock.
+        """
+        clock = [0.0]
+        for patcher in (
+            mock.patch.object(
+                autotune_module, "supported_running_modes", return_value=list(COSTS)
+            ),
+            mock.patch.object(autotune_module, "_check_running_mode"),
+            mock.patch.object(
+                autotune_module.time, "perf_counter", side_effect=lambda: clock[0]
+            ),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        runs = []
+
+        def instance_factory(running_mode, module=self._module):
+            # created in the default mode, autotune() applies the one tuned
+            return SimpleNamespace(module=module, running_mode="interp")
+
+        def workload(instance):
+            runs.append(instance.running_mode)
+            clock[0] += COSTS[instance.running_mode]
+
+        return instance_factory, workload, runs
+
+    def test_autotune(self):
+        runs = []
+        result = autotune(
+            lambda mode: Instance(self._module, running_mode=mode),
+            lambda instance: runs.append(instance.exports.sum(1, 2)),
+            modes=["interp"],
+            repeat=2,
+            warmup=1,
+        )
+        self.assertEqual("interp", result.running_mode)
+        self.assertEqual(["interp"], list(result.timings))
+        self.assertFalse(result.cached)
+        self.assertEqual([3, 3, 3], runs)
+
+    def test_applies_running_mode(self):
+        instance_factory, workload, runs = self.fake_modes()
+        result = autotune(instance_factory, workload, repeat=2, warmup=1)
+
+        self.assertEqual("fast-jit", result.running_mode)
+        self.assertEqual(COSTS, result.timings)
+        # each mode was set on its instance before running the workload
+        self.assertEqual(["interp"] * 3 + ["fast-jit"] * 3 + ["llvm-jit"] * 3, runs)
+
+    def test_table(self):
+        instance_factory, workload, runs = self.fake_modes()
+        result = autotune(instance_factory, workload, table=self.table_path)
+        self.assertEqual("fast-jit", result.running_mode)
+
+        with open(self.table_path) as f:
+            table = json.load(f)
+        self.assertEqual([self._module.digest], list(table))
+        entry = table[self._module.digest]
+        self.assertEqual("fast-jit", entry["running_mode"])
+        self.assertEqual(autotune_module.runtime_version(), entry["runtime"])
+        self.assertEqual(COSTS, entry["timings"])
+
+        # recorded, nothing is measured
+        runs.clear()
+        result = autotune(instance_factory, workload, table=self.table_path)
+        self.assertEqual(("fast-jit", {}, True), result)
+        self.assertEqual([], runs)
+
+        # unless forced
+        result = autotune(instance_factory, workload, table=self.table_path, force=True)
+        self.assertFalse(result.cached)
+        self.assertTrue(runs)
+
+    def test_table_key(self):
+        instance_factory, workload, _ = self.fake_modes()
+        table = TuningTable(self.table_path)
+        autotune(instance_factory, workload, table=table)
+        self.assertEqual("fast-jit", table.get(self._module))
+
+        # keyed by the digest of the module
+        self.assertIsNone(table.get(self._other_module))
+        table.record(self._other_module, "interp", {"interp": 1.0})
+        self.assertEqual("interp", table.get(self._other_module))
+        self.assertEqual("fast-jit", table.get(self._module))
+
+        # and only valid for the runtime version it was measured with
+        with mock.patch.object(
+            autotune_module, "runtime_version", return_value="0.0.0"
+        ):
+            self.assertIsNone(table.get(self._module))
+
+        # and while the mode is still supported
+        with mock.patch.object(
+            autotune_module, "supported_running_modes", return_value=["interp"]
+        ):
+            self.assertIsNone(table.get(self._module))
+            self.assertEqual("interp", table.get(self._other_module))
+
+    def test_table_corrupt(self):
+        os.makedirs(os.path.dirname(self.table_path))
+        with open(self.table_path, "w") as f:
+            f.write("{not json")
+        table = TuningTable(self.table_path)
+        self.assertIsNone(table.get(self._module))
+        table.record(self._module, "interp", {"interp": 1.0})
+        self.assertEqual("interp", table.get(self._module))
+        self.assertEqual(["table.json"], os.listdir(os.path.dirname(self.table_path)))
+
+    def test_invalid_args(self):
+        instance_factory, workload, _ = self.fake_modes()
+        with self.assertRaises(ValueError):
+            autotune(instance_factory, workload, repeat=0)
+        with self.assertRaises(ValueError):
+            autotune(instance_factory, workload, modes=[])
+
+        modules = iter([self._module, self._other_module])
+        with self.assertRaises(ValueError):
+            autotune(
+                lambda mode: instance_factory(mode, next(modules)),
+                workload,
+                modes=["interp", "fast-jit"],
+            )
+
+    def test_unsupported_mode(self):
+        with self.assertRaises(ValueError):
+            autotune(lambda mode: None, lambda instance: None, modes=["no-jit"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import unittest
+from array import array
+
+from wamr.wamrapi.wamr import CallManyError
+from wamr.wamrapi.wamr import ExecEnv
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_exports import MODULE_BINARY
+from .test_pool import MODULE_BINARY as TRAP_MODULE_BINARY
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+WIDE_ROWS = [[1, 2, 3], [2**31 - 1, 2**31 - 1, 2**31 - 1], [-1, -2, -3]]
+WIDE_RESULTS = [6, 3 * (2**31 - 1), -6]
+
+
+class CallManyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def setUp(self):
+        self._instance = Instance(self._module)
+        self._exec_env = ExecEnv(self._instance)
+
+    def tearDown(self):
+        del self._exec_env, self._instance
+
+    def call_many(self, name, args_array):
+        func = self._instance.lookup_function(name)
+        return self._exec_env.call_many(func, args_array)
+
+    def test_list(self):
+        self.assertEqual([3, 7], self.call_many("sum", [[1, 2], (3, 4)]))
+        self.assertEqual(WIDE_RESULTS, self.call_many("wide", WIDE_ROWS))
+        self.assertEqual(
+            [(3.5, -2, 1), (0.25, 2**62, -(2**31))],
+            self.call_many("rev", [[1, -2, 3.5], [-(2**31), 2**62, 0.25]]),
+        )
+        self.assertEqual([], self.call_many("sum", []))
+
+    def test_list_unsigned(self):
+        self.assertEqual([-1, -(2**31)], self.call_many("id32", [[2**32 - 1], [2**31]]))
+        self.assertEqual([-1], self.call_many("id64", [[2**64 - 1]]))
+
+    def test_list_neg(self):
+        for rows in ([[2**32]], [[-(2**31) - 1]], [[1.5]], [[1, 2]], [[]]):
+            with self.assertRaises(ValueError):
+                self.call_many("id32", rows)
+        with self.assertRaises(ValueError):
+            self.call_many("id64", [[2**64]])
+
+    def test_array(self):
+        results = self.call_many("sum", array("i", [1, 2, 3, 4]))
+        self.assertEqual(array("i", [3, 7]), results)
+        # 12-byte rows, 8-byte results
+        for rows in (2, 3):
+            args = array("i", [value for row in WIDE_ROWS[:rows] for value in row])
+            results = self.call_many("wide", args)
+            self.assertEqual(array("q", WIDE_RESULTS[:rows]), results)
+        args = array("q", [value for row in WIDE_ROWS for value in row])
+        self.assertEqual(array("q", WIDE_RESULTS), self.call_many("wide", args))
+        results = self.call_many("id32", array("L", [2**32 - 1]))
+        self.assertEqual(array("i", [-1]), results)
+
+    def test_array_neg(self):
+        with self.assertRaises(ValueError):
+            self.call_many("sum", array("i", [1, 2, 3]))
+        with self.assertRaises(ValueError):
+            self.call_many("id32", array("q", [2**32]))
+        with self.assertRaises(ValueError):
+            self.call_many("id32", array("d", [1.0]))
+        # results of different kinds
+        with self.assertRaises(TypeError):
+            self.call_many("rev", array("q", [1, 2, 3]))
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_ndarray(self):
+        args = numpy.array([[1, 2], [3, 4]], dtype=numpy.int32)
+        results = self.call_many("sum", args)
+        self.assertEqual([[3], [7]], results.tolist())
+        for dtype in (numpy.int32, numpy.int64, numpy.float64):
+            args = numpy.array(WIDE_ROWS, dtype=dtype)
+            results = self.call_many("wide", args)
+            self.assertEqual([[value] for value in WIDE_RESULTS], results.tolist())
+        args = numpy.array([[1, -2, 3.5], [-(2**31), 2**40, 0.25]])
+        results = self.call_many("rev", args)
+        self.assertEqual([[3.5, -2, 1], [0.25, 2**40, -(2**31)]], results.tolist())
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_ndarray_unsigned(self):
+        for dtype in (numpy.uint32, numpy.int64, numpy.uint64, numpy.float64):
+            args = numpy.array([[2**32 - 1], [2**31], [0]], dtype=dtype)
+            results = self.call_many("id32", args)
+            self.assertEqual([[-1], [-(2**31)], [0]], results.tolist())
+        args = numpy.array([[2**64 - 1], [2**63]], dtype=numpy.uint64)
+        results = self.call_many("id64", args)
+        self.assertEqual([[-1], [-(2**63)]], results.tolist())
+        args = numpy.array([[2.0**63], [-1.0]])
+        results = self.call_many("id64", args)
+        self.assertEqual([[-(2**63)], [-1]], results.tolist())
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_ndarray_neg(self):
+        for values in ([[2**32]], [[-(2**31) - 1]], [[1.5]], [[numpy.nan]]):
+            with self.assertRaises(ValueError):
+                self.call_many("id32", numpy.array(values))
+        with self.assertRaises(ValueError):
+            self.call_many("id64", numpy.array([[2.0**64]]))
+        with self.assertRaises(ValueError):
+            self.call_many("id32", numpy.array([["1"]]))
+        with self.assertRaises(ValueError):
+            self.call_many("sum", numpy.zeros((2, 3), dtype=numpy.int32))
+
+    def test_no_params(self):
+        module = Module.from_bytes(get_engine(), TRAP_MODULE_BINARY)
+        instance = Instance(module)
+        exec_env = ExecEnv(instance)
+        func = instance.lookup_function("inc")
+        self.assertEqual([1, 2, 3], exec_env.call_many(func, [(), [], ()]))
+        if numpy is not None:
+            results = exec_env.call_many(func, numpy.zeros((2, 0)))
+            self.assertEqual([[4], [5]], results.tolist())
+        with self.assertRaises(ValueError):
+            exec_env.call_many(func, array("i"))
+        del exec_env, instance, module
+
+    def test_trap(self):
+        module = Module.from_bytes(get_engine(), TRAP_MODULE_BINARY)
+        instance = Instance(module)
+        exec_env = ExecEnv(instance)
+        func = instance.lookup_function("trap")
+        with self.assertRaises(CallManyError) as context:
+            exec_env.call_many(func, [(), ()])
+        self.assertEqual(0, context.exception.row)
+        del exec_env, instance, module
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import types
+import unittest
+
+from wamr.wamrapi.wamr import RUNNING_MODES
+from wamr.wamrapi.wamr import UINT32_MAX
+from wamr.wamrapi.wamr import Engine
+from wamr.wamrapi.wamr import supported_running_modes
+
+from .context import get_engine
+
+
+def validate(**kwargs):
+    config = dict(
+        allocator="pool",
+        pool_size=None,
+        allocator_funcs=None,
+        running_mode=None,
+        max_thread_num=None,
+        log_level=None,
+        ip_addr="127.0.0.1",
+        instance_port=1234,
+    )
+    config.update(kwargs)
+    return Engine._validate_config(**config)
+
+
+class EngineConfigTest(unittest.TestCase):
+    def test_config(self):
+        config = get_engine().config
+        self.assertEqual("pool", config.allocator)
+        self.assertEqual(2 * 1024 * 1024, config.pool_size)
+        self.assertIsNone(config.running_mode)
+
+    def test_validate_pos(self):
+        self.assertEqual(4096, validate(pool_size=4096).pool_size)
+        self.assertIsNone(validate(allocator="system").pool_size)
+        config = validate(allocator="allocator", allocator_funcs=(1, 2, 3))
+        self.assertEqual("allocator", config.allocator)
+        self.assertEqual(4, validate(max_thread_num=4).max_thread_num)
+        self.assertEqual("debug", validate(log_level="debug").log_level)
+        for running_mode in supported_running_modes():
+            self.assertEqual(
+                running_mode, validate(running_mode=running_mode).running_mode
+            )
+
+    def test_validate_allocator_neg(self):
+        with self.assertRaises(ValueError):
+            validate(allocator="malloc")
+        for pool_size in (0, -1, UINT32_MAX + 1):
+            with self.assertRaises(ValueError):
+                validate(pool_size=pool_size)
+        with self.assertRaises(ValueError):
+            validate(allocator="system", pool_size=4096)
+        with self.assertRaises(ValueError):
+            validate(allocator="allocator")
+        with self.assertRaises(ValueError):
+            validate(allocator="system", allocator_funcs=(1, 2, 3))
+        with self.assertRaises(ValueError):
+            validate(allocator="allocator", allocator_funcs=(1, 2))
+
+    def test_validate_running_mode_neg(self):
+        with self.assertRaises(ValueError):
+            validate(running_mode="aot")
+        for running_mode in RUNNING_MODES:
+            if running_mode not in supported_running_modes():
+                with self.assertRaises(ValueError):
+                    validate(running_mode=running_mode)
+
+    def test_validate_neg(self):
+        for max_thread_num in (0, UINT32_MAX + 1):
+            with self.assertRaises(ValueError):
+                validate(max_thread_num=max_thread_num)
+        with self.assertRaises(ValueError):
+            validate(log_level="trace")
+        with self.assertRaises(ValueError):
+            validate(ip_addr="1" * 128)
+
+    def test_init_neg(self):
+        # rejected before the runtime is initialized again
+        with self.assertRaises(ValueError):
+            Engine(allocator="system", pool_size=4096)
+        with self.assertRaises(ValueError):
+            Engine(running_mode="aot")
+
+    def test_init_args(self):
+        for running_mode in supported_running_modes():
+            config = validate(running_mode=running_mode, max_thread_num=2)
+            init_args = Engine._get_init_args(types.SimpleNamespace(), config, None)
+            self.assertEqual(RUNNING_MODES[running_mode], init_args.running_mode)
+            self.assertEqual(2, init_args.max_thread_num)
+            pool = init_args.mem_alloc_option.pool
+            self.assertEqual(config.pool_size, pool.heap_size)
+
+        config = validate()
+        init_args = Engine._get_init_args(types.SimpleNamespace(), config, None)
+        self.assertEqual(0, init_args.running_mode)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import threading
+import unittest
+from unittest import mock
+
+from wamr.wamrapi.executor import WasmThreadPoolExecutor
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+from wamr.wamrapi.wamr import TypedFunction
+
+from .context import get_engine
+from .test_pool import MODULE_BINARY
+
+
+def _context_of(context):
+    return threading.get_ident(), id(context.instance), id(context.exec_env)
+
+
+class WasmThreadPoolExecutorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def executor(self, workers=2):
+        return WasmThreadPoolExecutor(lambda: Instance(self._module), workers)
+
+    def test_thread_affinity(self):
+        with self.executor() as executor:
+            futures = [executor.submit(_context_of) for _ in range(50)]
+            contexts = set(future.result() for future in futures)
+
+        self.assertNotIn(threading.get_ident(), {ident for ident, _, _ in contexts})
+        # one instance and one ExecEnv per thread
+        for index in (1, 2):
+            by_thread = {}
+            for context in contexts:
+                by_thread.setdefault(context[0], set()).add(context[index])
+            self.assertTrue(all(len(ids) == 1 for ids in by_thread.values()))
+        self.assertEqual(len(contexts), len({context[1] for context in contexts}))
+
+    def test_call_by_name(self):
+        exec_envs = []
+        call_in = TypedFunction.call_in
+
+        def spy(function, exec_env, *args):
+            exec_envs.append(exec_env)
+            return call_in(function, exec_env, *args)
+
+        with mock.patch.object(TypedFunction, "call_in", autospec=True) as patched:
+            patched.side_effect = spy
+            with self.executor(workers=1) as executor:
+                results = [executor.submit("inc").result() for _ in range(5)]
+                worker_exec_env = executor.submit(
+                    lambda context: context.exec_env
+                ).result()
+
+        # the private instance of the worker, through its own ExecEnv
+        self.assertEqual([1, 2, 3, 4, 5], results)
+        self.assertTrue(all(exec_env is worker_exec_env for exec_env in exec_envs))
+        self.assertEqual(5, len(exec_envs))
+        del worker_exec_env, exec_envs
+
+    def test_trap(self):
+        with self.executor(workers=1) as executor:
+            with self.assertRaises(Exception):
+                executor.submit("trap").result()
+            self.assertEqual(1, executor.submit("inc").result())
+
+    def test_submit_neg(self):
+        with WasmThreadPoolExecutor(None, workers=1) as executor:
+            with self.assertRaises(ValueError):
+                executor.submit("inc")
+            with self.assertRaises(TypeError):
+                executor.submit(1)
+            with self.assertRaises(TypeError):
+                executor.submit(_context_of, key=1)
+            self.assertIsNone(executor.submit(lambda context: context).result())
+
+    def test_instance_factory_error(self):
+        def instance_factory():
+            raise RuntimeError("no instance")
+
+        with WasmThreadPoolExecutor(instance_factory, workers=1) as executor:
+            with self.assertRaises(RuntimeError):
+                executor.submit("inc").result()
+
+    def test_shutdown(self):
+        executor = self.executor()
+        future = executor.submit("inc")
+        executor.shutdown()
+        self.assertEqual(1, future.result(timeout=0))
+        self.assertFalse(any(thread.is_alive() for thread in executor._threads))
+        with self.assertRaises(RuntimeError):
+            executor.submit("inc")
+        # once only
+        executor.shutdown()
+
+    def test_shutdown_cancel_futures(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block(context):
+            started.set()
+            release.wait()
+            return context.exports.inc()
+
+        executor = self.executor(workers=1)
+        running = executor.submit(block)
+        started.wait()
+        queued = [executor.submit("inc") for _ in range(5)]
+        executor.shutdown(wait=False, cancel_futures=True)
+        release.set()
+
+        self.assertEqual(1, running.result(timeout=10))
+        self.assertTrue(all(future.cancelled() for future in queued))
+        for thread in executor._threads:
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
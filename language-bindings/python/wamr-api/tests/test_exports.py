@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import struct
+import unittest
+
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+
+# (module
+#   (memory (export "memory") 1)
+#   (func (export "sum") (param i32 i32) (result i32)
+#     (i32.add (local.get 0) (local.get 1)))
+#   (func (export "id32") (param i32) (result i32) (local.get 0))
+#   (func (export "id64") (param i64) (result i64) (local.get 0))
+#   (func (export "wide") (param i32 i32 i32) (result i64)
+#     (i64.add
+#       (i64.add (i64.extend_i32_s (local.get 0)) (i64.extend_i32_s (local.get 1)))
+#       (i64.extend_i32_s (local.get 2))))
+#   (func (export "rev") (param i32 i64 f64) (result f64 i64 i32)
+#     (local.get 2) (local.get 1) (local.get 0)))
+MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01!\x05`\x02\x7f\x7f\x01\x7f`\x01\x7f\x01\x7f`\x01~"
+    b"\x01~`\x03\x7f\x7f\x7f\x01~`\x03\x7f~|\x03|~\x7f\x03\x06\x05\x00\x01\x02\x03"
+    b"\x04\x05\x03\x01\x00\x01\x07+\x06\x06memory\x02\x00\x03sum\x00\x00\x04id32"
+    b"\x00\x01\x04id64\x00\x02\x04wide\x00\x03\x03rev\x00\x04\n*\x05\x07\x00 \x00 "
+    b"\x01j\x0b\x04\x00 \x00\x0b\x04\x00 \x00\x0b\r\x00 \x00\xac \x01\xac| \x02\xac|"
+    b"\x0b\x08\x00 \x02 \x01 \x00\x0b"
+)
+
+
+class ExportsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def setUp(self):
+        self._instance = Instance(self._module)
+
+    def tearDown(self):
+        del self._instance
+
+    def test_call(self):
+        exports = self._instance.exports
+        self.assertEqual(3, exports.sum(1, 2))
+        self.assertEqual(-1, exports.sum(2**31 - 1, -(2**31)))
+        self.assertEqual(3 * (2**31 - 1), exports.wide(2**31 - 1, 2**31 - 1, 2**31 - 1))
+        self.assertEqual((3.5, -2, 1), exports.rev(1, -2, 3.5))
+
+    def test_call_signed_range(self):
+        exports = self._instance.exports
+        self.assertEqual(-(2**31), exports.id32(-(2**31)))
+        self.assertEqual(-(2**63), exports.id64(-(2**63)))
+
+    def test_call_unsigned_range(self):
+        exports = self._instance.exports
+        self.assertEqual(-1, exports.id32(2**32 - 1))
+        self.assertEqual(-(2**31), exports.id32(2**31))
+        self.assertEqual(-1, exports.id64(2**64 - 1))
+        self.assertEqual((1.0, -1, -1), exports.rev(2**32 - 1, 2**64 - 1, 1.0))
+
+    def test_call_out_of_range(self):
+        exports = self._instance.exports
+        for value in (2**32, -(2**31) - 1):
+            with self.assertRaises(struct.error):
+                exports.id32(value)
+        for value in (2**64, -(2**63) - 1):
+            with self.assertRaises(struct.error):
+                exports.id64(value)
+
+    def test_call_neg(self):
+        exports = self._instance.exports
+        with self.assertRaises(struct.error):
+            exports.sum(1)
+        with self.assertRaises(struct.error):
+            exports.sum(1, 2, 3)
+        with self.assertRaises(struct.error):
+            exports.sum(2**32 + 1, 2, 3)
+        with self.assertRaises(struct.error):
+            exports.sum("1", 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+import tempfile
+import unittest
+
+from wamr.filestore import FileStore
+from wamr.filestore import atomic_file
+from wamr.filestore import atomic_path
+
+
+class FileStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_atomic_file(self):
+        path = os.path.join(self.directory, "entry")
+        with atomic_file(path) as f:
+            f.write(b"data")
+            self.assertFalse(os.path.exists(path))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"data")
+        self.assertEqual(os.listdir(self.directory), ["entry"])
+
+    def test_atomic_file_error(self):
+        path = os.path.join(self.directory, "entry")
+        with self.assertRaises(RuntimeError):
+            with atomic_file(path) as f:
+                f.write(b"partial")
+                raise RuntimeError
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_atomic_path_error(self):
+        path = os.path.join(self.directory, "entry")
+        with self.assertRaises(RuntimeError):
+            with atomic_path(path) as tmp_path:
+                self.assertEqual(os.path.dirname(tmp_path), self.directory)
+                raise RuntimeError
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_evict(self):
+        store = FileStore(self.directory, ".entry", max_size=8)
+        paths = [store.path(key) for key in "abc"]
+        for mtime, path in enumerate(paths):
+            with atomic_file(path) as f:
+                f.write(b"1234")
+            os.utime(path, (mtime, mtime))
+        # not an entry
+        with open(os.path.join(self.directory, "other"), "wb") as f:
+            f.write(b"12345678")
+
+        self.assertTrue(store.touch(paths[0]))
+        store.evict(keep=paths[2])
+        self.assertEqual(
+            [entry.path for entry in store.entries()], [paths[2], paths[0]]
+        )
+
+        store.clear()
+        self.assertEqual(store.entries(), [])
+        self.assertFalse(store.touch(paths[0]))
+        self.assertEqual(os.listdir(self.directory), ["other"])
+
+    def test_max_size(self):
+        with self.assertRaises(ValueError):
+            FileStore(self.directory, ".entry", max_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
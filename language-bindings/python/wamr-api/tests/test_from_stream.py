@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import hashlib
+import io
+import unittest
+
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_exports import MODULE_BINARY
+
+HEADER = MODULE_BINARY[:8]
+
+# a custom section "note" with a 3 byte payload
+CUSTOM_SECTION = b"\x00\x08\x04note\xde\xad\xbe"
+
+
+def chunks(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class _ShortReader(io.RawIOBase):
+    """
+    A file-like object whose readinto() fills at most `size` bytes per call,
+    like a socket.
+    """
+
+    def __init__(self, data, size):
+        self._stream = io.BytesIO(data)
+        self._size = size
+        self.calls = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        self.calls += 1
+        return self._stream.readinto(memoryview(b)[: self._size])
+
+
+class FromStreamTest(unittest.TestCase):
+    def assertLoaded(self, module, data=MODULE_BINARY):
+        self.assertEqual(3, Instance(module).exports.sum(1, 2))
+        self.assertEqual(hashlib.sha256(data).hexdigest(), module.digest)
+        self.assertEqual(len(data), module.file_data.size)
+
+    def assertLoadError(self, data, message):
+        for stream in (chunks(data, 1), io.BytesIO(data)):
+            with self.assertRaises(Exception) as context:
+                Module.from_stream(get_engine(), stream)
+            self.assertEqual(
+                f"Error while creating module: {message}", str(context.exception)
+            )
+
+    def test_chunks(self):
+        for size in (1, 2, 7, 64, len(MODULE_BINARY)):
+            self.assertLoaded(
+                Module.from_stream(get_engine(), chunks(MODULE_BINARY, size))
+            )
+
+    def test_mixed_chunks(self):
+        stream = iter(
+            [
+                HEADER[:3],
+                b"",
+                bytearray(HEADER[3:]),
+                memoryview(MODULE_BINARY)[8:20],
+                MODULE_BINARY[20:],
+            ]
+        )
+        self.assertLoaded(Module.from_stream(get_engine(), stream))
+
+    def test_readinto(self):
+        self.assertLoaded(Module.from_stream(get_engine(), io.BytesIO(MODULE_BINARY)))
+
+        reader = _ShortReader(MODULE_BINARY, 3)
+        self.assertLoaded(Module.from_stream(get_engine(), reader))
+        self.assertGreater(reader.calls, len(MODULE_BINARY) // 3)
+
+    def test_custom_sections(self):
+        # before, between and after the known sections
+        data = HEADER + CUSTOM_SECTION + MODULE_BINARY[8:] + CUSTOM_SECTION
+        for stream in (chunks(data, 1), io.BytesIO(data)):
+            module = Module.from_stream(get_engine(), stream)
+            self.assertLoaded(module, data)
+            section_ids = [header[0] for header, _ in module.file_data.sections]
+            self.assertEqual(0, section_ids[0])
+            self.assertEqual(0, section_ids[-1])
+            _, body = module.file_data.sections[0]
+            self.assertEqual(CUSTOM_SECTION[2:], bytes(body))
+
+    def test_bad_magic(self):
+        self.assertLoadError(
+            b"\x00wasm" + MODULE_BINARY[4:], "magic header not detected"
+        )
+        self.assertLoadError(b"", "magic header not detected")
+        self.assertLoadError(b"\x00as", "magic header not detected")
+
+    def test_bad_version(self):
+        self.assertLoadError(
+            HEADER[:4] + b"\x02\x00\x00\x00" + MODULE_BINARY[8:],
+            "unknown binary version",
+        )
+        self.assertLoadError(HEADER[:6], "unknown binary version")
+
+    def test_truncated(self):
+        # in a section body
+        self.assertLoadError(MODULE_BINARY[:-3], "unexpected end")
+        # in a section size
+        self.assertLoadError(HEADER + b"\x01", "invalid section size")
+        self.assertLoadError(HEADER + b"\x01\x80", "invalid section size")
+        # a missing section is left to the runtime
+        without_code = MODULE_BINARY[: MODULE_BINARY.index(b"\n*\x05")]
+        with self.assertRaises(Exception):
+            Module.from_stream(get_engine(), io.BytesIO(without_code))
+
+    def test_bad_sections(self):
+        self.assertLoadError(HEADER + b"\x0f\x00", "invalid section id")
+        # the type section again after the function section
+        self.assertLoadError(
+            HEADER + b"\x03\x01\x00\x01\x01\x00",
+            "unexpected content after last section",
+        )
+        self.assertLoadError(
+            HEADER + b"\x01\xff\xff\xff\xff\xff\x0f", "invalid section size"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
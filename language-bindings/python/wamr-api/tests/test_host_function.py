@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import unittest
+from ctypes import addressof
+from typing import Annotated
+
+from wamr.wamrapi.wamr import ExecEnv
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+from wamr.wamrapi.wamr import _make_host_function
+from wamr.wamrapi.wamr import f32
+from wamr.wamrapi.wamr import f64
+from wamr.wamrapi.wamr import i32
+from wamr.wamrapi.wamr import i64
+
+from .context import get_engine
+
+# (module
+#   (import "test_host" "add" (func $add (param i32 i32) (result i32)))
+#   (import "test_host" "mix" (func $mix (param i64 f32 f64) (result f64)))
+#   (import "test_host" "strlen" (func $strlen (param i32) (result i32)))
+#   (import "test_host" "env_arg" (func $env_arg (param i32) (result i32)))
+#   (import "test_host" "fail" (func $fail))
+#   (memory (export "memory") 1)
+#   (func (export "call_add") (param i32 i32) (result i32)
+#     (call $add (local.get 0) (local.get 1)))
+#   (func (export "call_mix") (param i64 f32 f64) (result f64)
+#     (call $mix (local.get 0) (local.get 1) (local.get 2)))
+#   (func (export "call_strlen") (param i32) (result i32)
+#     (call $strlen (local.get 0)))
+#   (func (export "call_env_arg") (param i32) (result i32)
+#     (call $env_arg (local.get 0)))
+#   (func (export "call_fail") (call $fail)))
+MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x16\x04`\x02\x7f\x7f\x01\x7f`\x03~}|\x01|`\x01"
+    b"\x7f\x01\x7f`\x00\x00\x02Y\x05\ttest_host\x03add\x00\x00\ttest_host\x03mix"
+    b"\x00\x01\ttest_host\x06strlen\x00\x02\ttest_host\x07env_arg\x00\x02\ttest_ho"
+    b"st\x04fail\x00\x03\x03\x06\x05\x00\x01\x02\x02\x03\x05\x03\x01\x00\x01\x07I"
+    b"\x06\x06memory\x02\x00\x08call_add\x00\x05\x08call_mix\x00\x06\x0bcall_strle"
+    b"n\x00\x07\x0ccall_env_arg\x00\x08\tcall_fail\x00\t\n(\x05\x08\x00 \x00 \x01"
+    b"\x10\x00\x0b\n\x00 \x00 \x01 \x02\x10\x01\x0b\x06\x00 \x00\x10\x02\x0b\x06"
+    b"\x00 \x00\x10\x03\x0b\x04\x00\x10\x04\x0b"
+)
+
+# what the host functions were called with
+CALLS = []
+
+
+def _register_host_functions(engine):
+    @engine.host_function("test_host")
+    def add(a: int, b: i32) -> i32:
+        return a + b
+
+    @engine.host_function("test_host")
+    def mix(a: i64, b: f32, c: float) -> f64:
+        return a + b + c
+
+    @engine.host_function("test_host", "strlen")
+    def host_strlen(s: str) -> int:
+        CALLS.append(s)
+        return len(s)
+
+    @engine.host_function("test_host")
+    def env_arg(env: ExecEnv, value: i32) -> i32:
+        CALLS.append(env)
+        return value * 2
+
+    @engine.host_function("test_host")
+    def fail() -> None:
+        raise ValueError("boom")
+
+
+class HostFunctionSignatureTest(unittest.TestCase):
+    def signature(self, func):
+        return _make_host_function(func)[0]
+
+    def test_numeric(self):
+        def func(a: int, b: i32, c: i64, d: f32, e: float, f: f64) -> i64:
+            pass
+
+        self.assertEqual("(iiIfFF)I", self.signature(func))
+
+    def test_no_result(self):
+        def func(a: i64) -> None:
+            pass
+
+        def bare(a: i64):
+            pass
+
+        self.assertEqual("(I)", self.signature(func))
+        self.assertEqual("(I)", self.signature(bare))
+        self.assertEqual("()", self.signature(lambda: None))
+
+    def test_str_and_exec_env(self):
+        def func(env: ExecEnv, s: str, n: int) -> f32:
+            pass
+
+        self.assertEqual("($i)f", self.signature(func))
+
+    def test_unsupported_hints(self):
+        def no_hint(a) -> int:
+            pass
+
+        def bool_hint(a: bool) -> int:
+            pass
+
+        def bad_annotation(a: Annotated[int, "u8"]) -> int:
+            pass
+
+        def str_result() -> str:
+            pass
+
+        def late_env(a: int, env: ExecEnv) -> int:
+            pass
+
+        for func in (no_hint, bool_hint, bad_annotation, str_result, late_env):
+            with self.assertRaises(TypeError):
+                _make_host_function(func)
+
+    def test_register_twice(self):
+        engine = get_engine()
+        engine.register_host_function("test_host_twice", "f", lambda: None)
+        with self.assertRaises(ValueError):
+            engine.register_host_function("test_host_twice", "f", lambda: None)
+
+
+class HostFunctionCallTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        _register_host_functions(get_engine())
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def setUp(self):
+        CALLS.clear()
+        self._instance = Instance(self._module)
+
+    def tearDown(self):
+        CALLS.clear()
+        del self._instance
+
+    def test_numeric(self):
+        exports = self._instance.exports
+        self.assertEqual(5, exports.call_add(2, 3))
+        self.assertEqual(-1, exports.call_add(2**31 - 1, -(2**31)))
+        self.assertEqual(2**40 + 1.5 + 0.25, exports.call_mix(2**40, 1.5, 0.25))
+
+    def test_str(self):
+        self._instance.memory.view()[16:22] = b"hello\0"
+        self.assertEqual(5, self._instance.exports.call_strlen(16))
+        self.assertEqual(["hello"], CALLS)
+
+    def test_exec_env(self):
+        self.assertEqual(42, self._instance.exports.call_env_arg(21))
+        (env,) = CALLS
+        self.assertIsInstance(env, ExecEnv)
+        self.assertEqual(
+            addressof(self._instance.module_inst.contents),
+            addressof(env.get_module_inst().module_inst.contents),
+        )
+
+    def test_exception_traps(self):
+        exports = self._instance.exports
+        with self.assertRaises(Exception) as context:
+            exports.call_fail()
+        self.assertIn("ValueError: boom", str(context.exception))
+        # the instance is still usable
+        self.assertEqual(3, exports.call_add(1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
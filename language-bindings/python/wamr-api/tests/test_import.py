@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+import subprocess
+import sys
+import unittest
+
+# imported where they are used, by the features which need them
+LAZY_MODULES = [
+    "asyncio",
+    "concurrent.futures",
+    "hashlib",
+    "json",
+    "multiprocessing",
+    "numpy",
+    "wamr.wamrapi.aot_cache",
+    "wamr.wamrapi.autotune",
+    "wamr.wamrapi.pgo",
+]
+
+# the cumulative import time of wamr.wamrapi.wamr, about 60 ms with the
+# runtime, in microseconds
+IMPORT_TIME_BUDGET = 500_000
+
+
+def import_times(module):
+    """
+    The modules imported by `module` in a fresh interpreter, with their
+    cumulative import time in microseconds.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))]
+        + [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    return cumulative
+
+
+class ImportTest(unittest.TestCase):
+    def test_package_does_not_load_runtime(self):
+        for module in ("wamr.wamrapi", "wamr.wamrapi.profiling", "wamr.filestore"):
+            imported = import_times(module)
+            self.assertIn(module, imported)
+            self.assertNotIn("wamr.wamrapi.iwasm", imported)
+            self.assertNotIn("wamr.wamrapi.wamr", imported)
+
+    def test_wamr_imports(self):
+        imported = import_times("wamr.wamrapi.wamr")
+        self.assertIn("wamr.wamrapi.iwasm", imported)
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, imported)
+        self.assertLess(imported["wamr.wamrapi.wamr"], IMPORT_TIME_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
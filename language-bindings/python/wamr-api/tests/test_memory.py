@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import unittest
+import weakref
+
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# (module
+#   (memory (export "memory") 1 4)
+#   (func (export "grow") (param i32) (result i32) (memory.grow (local.get 0)))
+#   (func (export "load8") (param i32) (result i32) (i32.load8_u (local.get 0)))
+#   (func (export "store8") (param i32 i32)
+#     (i32.store8 (local.get 0) (local.get 1))))
+MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x0b\x02`\x01\x7f\x01\x7f`\x02\x7f\x7f\x00\x03\x04"
+    b"\x03\x00\x00\x01\x05\x04\x01\x01\x01\x04\x07\"\x04\x06memory\x02\x00\x04grow"
+    b"\x00\x00\x05load8\x00\x01\x06store8\x00\x02\n\x1a\x03\x06\x00 \x00@\x00\x0b"
+    b"\x07\x00 \x00-\x00\x00\x0b\t\x00 \x00 \x01:\x00\x00\x0b"
+)
+
+
+class LinearMemoryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def test_view(self):
+        instance = Instance(self._module)
+        view = instance.memory.view()
+        view[16] = 42
+        self.assertEqual(42, instance.exports.load8(16))
+        instance.exports.store8(17, 7)
+        self.assertEqual(7, view[17])
+        self.assertIs(instance.memory, instance.memory)
+
+    def test_view_keeps_instance(self):
+        instance = Instance(self._module)
+        ref = weakref.ref(instance)
+        view = instance.memory.view()
+        del instance
+        self.assertIsNotNone(ref())
+        view[0] = 1
+        self.assertEqual(1, ref().exports.load8(0))
+        del view
+        self.assertIsNone(ref())
+
+    def test_memory_keeps_instance(self):
+        memory = Instance(self._module).memory
+        view = memory.view()
+        view[0] = 3
+        self.assertEqual(3, memory.instance.exports.load8(0))
+        ref = weakref.ref(memory.instance)
+        del memory, view
+        self.assertIsNone(ref())
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_ndarray_keeps_instance(self):
+        instance = Instance(self._module)
+        ref = weakref.ref(instance)
+        array = instance.memory.ndarray("uint8", offset=8, shape=(2, 4))
+        del instance
+        array[1, 1] = 9
+        self.assertEqual(9, ref().exports.load8(13))
+        del array
+        self.assertIsNone(ref())
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_ndarray_bounds(self):
+        memory = Instance(self._module).memory
+        size = memory.size
+        self.assertEqual(0, len(memory.ndarray("uint8", offset=size)))
+        self.assertEqual(2, len(memory.ndarray("uint32", offset=size - 8)))
+        for offset in (-1, size + 1, size + 8):
+            with self.assertRaises(IndexError):
+                memory.ndarray("uint8", offset=offset)
+        with self.assertRaises(IndexError):
+            memory.ndarray("uint8", offset=size - 4, shape=(8,))
+
+    def test_grow(self):
+        instance = Instance(self._module)
+        memory = instance.memory
+        size = memory.size
+        generation = memory.generation
+        memory.grow(1)
+        self.assertEqual(size + 65536, memory.size)
+        self.assertEqual(size + 65536, memory.view().nbytes)
+        self.assertNotEqual(generation, memory.generation)
+        with self.assertRaises(Exception):
+            memory.grow(memory.max_page_count)
+
+    def test_guest_grow(self):
+        instance = Instance(self._module)
+        memory = instance.memory
+        size = memory.view().nbytes
+        generation = memory.generation
+        self.assertEqual(memory.page_count, instance.exports.grow(1))
+        # noticed on the next access
+        view = memory.view()
+        self.assertEqual(size + 65536, view.nbytes)
+        self.assertNotEqual(generation, memory.generation)
+        view[size] = 5
+        self.assertEqual(5, instance.exports.load8(size))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import threading
+import unittest
+from ctypes import byref
+from ctypes import c_void_p
+from unittest import mock
+
+from wamr.wamrapi.iwasm import mem_alloc_info_t
+from wamr.wamrapi.iwasm import wasm_runtime_get_app_heap_alloc_info
+from wamr.wamrapi.sampler import MemorySampler
+from wamr.wamrapi.wamr import EngineMemoryInfo
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_exports import MODULE_BINARY
+
+
+class _FakeEngine:
+    """
+    An engine whose pool usage is set by the test.
+    """
+
+    def __init__(self, used_size=0):
+        self.used_size = used_size
+
+    def memory_info(self):
+        return EngineMemoryInfo(1000, 1000 - self.used_size, self.used_size)
+
+
+class MemoryInfoTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def test_engine(self):
+        info = get_engine().memory_info()
+        # the test engine uses the default pool allocator
+        self.assertIsInstance(info, EngineMemoryInfo)
+        self.assertGreater(info.total_size, info.free_size)
+        self.assertEqual(info.total_size - info.free_size, info.used_size)
+        self.assertGreaterEqual(info.highmark_size, info.used_size)
+
+    def test_app_heap_alloc_info(self):
+        instance = Instance(self._module, heap_size=16384)
+        info = mem_alloc_info_t()
+        self.assertTrue(
+            wasm_runtime_get_app_heap_alloc_info(instance.module_inst, byref(info))
+        )
+        self.assertGreater(info.total_size, 0)
+        self.assertLessEqual(info.total_size, 16384)
+        self.assertEqual(info.total_size, info.total_free_size)
+
+        # no app heap
+        instance = Instance(self._module, heap_size=0)
+        self.assertFalse(
+            wasm_runtime_get_app_heap_alloc_info(instance.module_inst, byref(info))
+        )
+        del instance
+
+    def test_instance(self):
+        instance = Instance(self._module, stack_size=32768, heap_size=16384)
+        info = instance.memory_info()
+        self.assertEqual((1, 1), (info.memory_pages, info.max_memory_pages))
+        # the app heap is appended to the linear memory
+        self.assertGreaterEqual(info.memory_size, 65536 + info.heap_size)
+        self.assertEqual(info.heap_size, info.heap_free_size)
+        self.assertEqual(0, info.heap_highmark_size)
+        self.assertEqual(32768, info.stack_size)
+
+        native_addr = c_void_p()
+        offset = instance.malloc(100, byref(native_addr))
+        self.assertTrue(offset)
+        info = instance.memory_info()
+        self.assertLessEqual(info.heap_free_size, info.heap_size - 100)
+        self.assertGreaterEqual(info.heap_highmark_size, 100)
+        instance.free(offset)
+        del instance
+
+    def test_instance_without_heap(self):
+        instance = Instance(self._module, heap_size=0)
+        info = instance.memory_info()
+        self.assertEqual(65536, info.memory_size)
+        self.assertEqual((None, None, None), info[3:6])
+        del instance
+
+
+class MemorySamplerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def test_sample(self):
+        sampler = MemorySampler(get_engine(), max_samples=2)
+        instance = Instance(self._module)
+        sampler.track(instance, "exports")
+        sample = sampler.sample()
+        self.assertEqual(
+            get_engine().memory_info().total_size, sample.engine.total_size
+        )
+        self.assertEqual(instance.memory_info(), sample.instances["exports"])
+
+        # tracked weakly
+        del instance
+        self.assertEqual({}, sampler.sample().instances)
+        sampler.sample()
+        self.assertEqual(2, len(sampler.samples))
+        self.assertEqual({}, sampler.samples[0].instances)
+
+    def test_untrack(self):
+        sampler = MemorySampler(get_engine())
+        instance = Instance(self._module)
+        sampler.track(instance)
+        self.assertEqual(1, len(sampler.sample().instances))
+        sampler.untrack(instance)
+        self.assertEqual({}, sampler.sample().instances)
+        del instance
+
+    def test_watermark(self):
+        engine = _FakeEngine()
+        sampler = MemorySampler(engine)
+        calls = []
+        sampler.add_watermark(0.5, lambda sample, fraction: calls.append(fraction))
+        sampler.add_watermark(0.9, lambda sample, fraction: 1 / 0)
+
+        for used_size in (100, 600, 700, 200, 950, 950):
+            engine.used_size = used_size
+            sampler.sample()
+        # fired when crossing 0.5, re-armed below it
+        self.assertEqual([0.5, 0.5], calls)
+        # the failing callback fired once
+        self.assertEqual(1, sampler.errors)
+
+    def test_thread(self):
+        sampled = threading.Event()
+        sampler = MemorySampler(_FakeEngine(), interval=0.01)
+        with mock.patch.object(
+            sampler, "sample", side_effect=lambda: sampled.set()
+        ) as sample:
+            with sampler:
+                # started once only
+                sampler.start()
+                self.assertTrue(sampled.wait(10))
+            self.assertGreater(sample.call_count, 0)
+        self.assertIsNone(sampler._thread)
+        self.assertIsNone(sampler.exception)
+        # stopped once only
+        sampler.stop()
+
+    def test_thread_exception(self):
+        engine = _FakeEngine()
+        error = RuntimeError("no memory info")
+        engine.memory_info = mock.Mock(side_effect=error)
+        sampler = MemorySampler(engine, interval=0.01)
+        sampler.start()
+        sampler._thread.join(10)
+        # the thread stopped on the exception
+        self.assertFalse(sampler._thread.is_alive())
+        self.assertIs(error, sampler.exception)
+        with self.assertRaises(RuntimeError):
+            sampler.stop()
+
+        # a new start clears it
+        engine.memory_info = _FakeEngine().memory_info
+        sampler.start()
+        self.assertIsNone(sampler.exception)
+        sampler.stop()
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            MemorySampler(get_engine(), interval=0)
+        sampler = MemorySampler(get_engine())
+        for fraction in (0, 1.5):
+            with self.assertRaises(ValueError):
+                sampler.add_watermark(fraction, print)
+
+
+if __name__ == "__main__":
+    unittest.main()
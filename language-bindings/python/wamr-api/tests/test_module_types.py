@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import unittest
+
+from wamr.wamrapi.iwasm import WASM_F32
+from wamr.wamrapi.iwasm import WASM_F64
+from wamr.wamrapi.iwasm import WASM_I32
+from wamr.wamrapi.iwasm import WASM_I64
+from wamr.wamrapi.wamr import Module
+from wamr.wamrapi.wamr import f32
+from wamr.wamrapi.wamr import i32
+from wamr.wamrapi.wamr import i64
+
+from .context import get_engine
+from .test_exports import MODULE_BINARY as NO_IMPORTS_MODULE_BINARY
+
+# (module
+#   (import "test_imports" "linked" (func (param i32 i64) (result f32)))
+#   (import "test_imports" "missing" (func))
+#   (import "test_imports" "table" (table 1 funcref))
+#   (import "test_imports" "memory" (memory 1))
+#   (import "test_imports" "global" (global i32))
+#   (global $counter (mut i64) (i64.const 7))
+#   (func (export "f") (param f64) (result i32) (i32.const 0))
+#   (export "table" (table 0))
+#   (export "memory" (memory 0))
+#   (export "counter" (global $counter)))
+MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x0f\x03`\x02\x7f~\x01}`\x00\x00`\x01|\x01\x7f"
+    b"\x02s\x05\x0ctest_imports\x06linked\x00\x00\x0ctest_imports\x07missing\x00"
+    b"\x01\x0ctest_imports\x05table\x01p\x00\x01\x0ctest_imports\x06memory\x02\x00"
+    b"\x01\x0ctest_imports\x06global\x03\x7f\x00\x03\x02\x01\x02\x06\x06\x01~\x01B"
+    b"\x07\x0b\x07 \x04\x01f\x00\x02\x05table\x01\x00\x06memory\x02\x00\x07counte"
+    b"r\x03\x01\n\x06\x01\x04\x00A\x00\x0b"
+)
+
+
+def linked(a: i32, b: i64) -> f32:
+    return 0.0
+
+
+def missing() -> None:
+    pass
+
+
+class ModuleTypesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        get_engine().register_host_function("test_imports", "linked", linked)
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def test_imports(self):
+        imports = self._module.imports
+        self.assertEqual(
+            [
+                ("test_imports", "linked"),
+                ("test_imports", "missing"),
+                ("test_imports", "table"),
+                ("test_imports", "memory"),
+                ("test_imports", "global"),
+            ],
+            list(imports),
+        )
+        self.assertEqual(
+            ["func", "func", "table", "memory", "global"],
+            [record.kind for record in imports.values()],
+        )
+
+        record = imports[("test_imports", "linked")]
+        self.assertEqual(("test_imports", "linked"), (record.module_name, record.name))
+        self.assertTrue(record.linked)
+        self.assertEqual((WASM_I32, WASM_I64), record.params)
+        self.assertEqual((WASM_F32,), record.results)
+
+        record = imports[("test_imports", "missing")]
+        self.assertFalse(record.linked)
+        self.assertEqual(((), ()), (record.params, record.results))
+
+        record = imports[("test_imports", "memory")]
+        self.assertEqual((None, None), (record.params, record.results))
+        self.assertIn("memory test_imports.memory", repr(record))
+
+    def test_exports(self):
+        exports = self._module.exports
+        self.assertEqual(["f", "table", "memory", "counter"], list(exports))
+        self.assertEqual(
+            ["func", "table", "memory", "global"],
+            [record.kind for record in exports.values()],
+        )
+        self.assertEqual((WASM_F64,), exports["f"].params)
+        self.assertEqual((WASM_I32,), exports["f"].results)
+        self.assertIsNone(exports["counter"].params)
+        self.assertIn("func f", repr(exports["f"]))
+
+    def test_no_imports(self):
+        module = Module.from_bytes(get_engine(), NO_IMPORTS_MODULE_BINARY)
+        self.assertEqual({}, module.imports)
+        self.assertIn("sum", module.exports)
+        module.check_imports()
+        del module
+
+    def test_check_imports(self):
+        with self.assertRaises(Exception) as context:
+            self._module.check_imports()
+        self.assertIn("test_imports.missing", str(context.exception))
+        self.assertNotIn("test_imports.linked", str(context.exception))
+
+    def test_check_imports_late_registration(self):
+        get_engine().register_host_function("test_imports", "missing", missing)
+        # imports are resolved when a module is loaded
+        with self.assertRaises(Exception):
+            self._module.check_imports()
+        module = Module.from_bytes(get_engine(), MODULE_BINARY)
+        self.assertTrue(module.imports[("test_imports", "missing")].linked)
+        module.check_imports()
+        del module
+
+
+if __name__ == "__main__":
+    unittest.main()
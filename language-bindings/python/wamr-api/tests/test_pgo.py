@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+from wamr.wamrapi import aot_cache
+from wamr.wamrapi import pgo
+from wamr.wamrapi.pgo import PgoPipeline
+
+from .context import get_engine
+from .test_aot_cache import AOT_HEADER
+from .test_exports import MODULE_BINARY
+
+
+class PgoPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.wasm_path = os.path.join(self._directory.name, "app.wasm")
+        self.write_module(MODULE_BINARY)
+        self.pgo_directory = os.path.join(self._directory.name, "pgo")
+        self.wamrc_version = "wamrc 2.0.0"
+        self.commands = []
+
+        for patcher in (
+            mock.patch.object(aot_cache, "find_wamrc", return_value="wamrc"),
+            mock.patch.object(pgo.shutil, "which", return_value="llvm-profdata"),
+            mock.patch.object(subprocess, "run", side_effect=self.fake_run),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write_module(self, data):
+        with open(self.wasm_path, "wb") as f:
+            f.write(data)
+
+    def fake_run(self, args, **kwargs):
+        if args[1:] == ["--version"]:
+            return subprocess.CompletedProcess(args, 0, self.wamrc_version, "")
+        self.commands.append(args)
+        if args[0] == "llvm-profdata":
+            output = args[2][len("-output=") :]
+        else:
+            output = args[args.index("-o") + 1]
+        with open(output, "wb") as f:
+            f.write(AOT_HEADER + " ".join(args).encode())
+        return subprocess.CompletedProcess(args, 0, "", "")
+
+    def compiles(self):
+        return [args for args in self.commands if args[0] == "wamrc"]
+
+    def pipeline(self, **kwargs):
+        return PgoPipeline(self.wasm_path, self.pgo_directory, **kwargs)
+
+    def add_raw_profile(self, pipeline, name):
+        path = os.path.join(pipeline.profiles_directory, name + pgo.RAW_PROFILE_SUFFIX)
+        with open(path, "wb") as f:
+            f.write(b"profile")
+        return path
+
+    def test_reuse(self):
+        pipeline = self.pipeline(wamrc_args=["--opt-level=3"])
+        instrumented_path = pipeline.instrument()
+        baseline_path = pipeline.baseline()
+        self.assertEqual(
+            os.path.join(self.pgo_directory, pipeline.key()),
+            os.path.dirname(instrumented_path),
+        )
+        self.assertEqual(
+            os.path.dirname(instrumented_path), os.path.dirname(baseline_path)
+        )
+        compiles = self.compiles()
+        self.assertEqual(2, len(compiles))
+        self.assertEqual(
+            ["wamrc", "--enable-llvm-pgo", "--opt-level=3"], compiles[0][:3]
+        )
+        self.assertEqual(["wamrc", "--opt-level=3", "-o"], compiles[1][:3])
+
+        # a new pipeline on the same module reuses the files
+        pipeline = self.pipeline(wamrc_args=["--opt-level=3"])
+        self.assertEqual(instrumented_path, pipeline.instrument())
+        self.assertEqual(baseline_path, pipeline.baseline())
+        self.assertEqual(2, len(self.compiles()))
+
+    def test_module_changed(self):
+        pipeline = self.pipeline()
+        instrumented_path = pipeline.instrument()
+        baseline_path = pipeline.baseline()
+        old_profile = self.add_raw_profile(pipeline, "old")
+
+        # a rebuilt module is compiled again, its profiles start empty
+        self.write_module(MODULE_BINARY + b"\0\x01\x00")
+        self.assertNotEqual(instrumented_path, pipeline.instrument())
+        self.assertNotEqual(baseline_path, pipeline.baseline())
+        self.assertEqual(4, len(self.compiles()))
+        self.assertEqual([], pipeline.raw_profiles())
+
+        # and back to the old one
+        self.write_module(MODULE_BINARY)
+        self.assertEqual(instrumented_path, pipeline.instrument())
+        self.assertEqual([old_profile], pipeline.raw_profiles())
+        self.assertEqual(4, len(self.compiles()))
+
+    def test_toolchain_changed(self):
+        key = self.pipeline().key()
+        self.assertNotEqual(key, self.pipeline(wamrc_args=["--opt-level=1"]).key())
+        self.wamrc_version = "wamrc 2.1.0"
+        self.assertNotEqual(key, self.pipeline().key())
+        with mock.patch.object(pgo, "runtime_version", return_value="0.0.0"):
+            self.assertNotEqual(key, self.pipeline().key())
+
+    def test_merge_and_optimize(self):
+        pipeline = self.pipeline(wamrc_args=["--opt-level=3"])
+        with self.assertRaises(Exception):
+            pipeline.merge()
+        with self.assertRaises(Exception):
+            pipeline.optimize()
+
+        profiles = [self.add_raw_profile(pipeline, name) for name in ("b", "a")]
+        profile_path = pipeline.merge()
+        merge = self.commands[-1]
+        self.assertEqual(["llvm-profdata", "merge"], merge[:2])
+        self.assertEqual(sorted(profiles), merge[3:])
+        self.assertTrue(os.path.exists(profile_path))
+
+        optimized_path = pipeline.optimize()
+        self.assertEqual(pipeline.optimized_path, optimized_path)
+        self.assertEqual(
+            [f"--use-prof-file={profile_path}", "--opt-level=3"],
+            self.compiles()[-1][1:3],
+        )
+        self.assertTrue(os.path.exists(optimized_path))
+
+    def test_merge_error(self):
+        pipeline = self.pipeline()
+        self.add_raw_profile(pipeline, "a")
+        with mock.patch.object(
+            subprocess,
+            "run",
+            return_value=subprocess.CompletedProcess([], 1, "", "bad profile"),
+        ):
+            with self.assertRaises(Exception) as context:
+                pipeline.merge()
+        self.assertIn("bad profile", str(context.exception))
+        self.assertFalse(os.path.exists(pipeline.profile_path))
+
+    def test_compare_not_optimized(self):
+        with self.assertRaises(Exception):
+            self.pipeline().compare(get_engine(), lambda instance: None)
+        with self.assertRaises(ValueError):
+            self.pipeline().compare(get_engine(), lambda instance: None, repeat=0)
+
+    def test_collect_unsupported(self):
+        if pgo.wasm_runtime_get_pgo_prof_data_size is not None:
+            self.skipTest("the runtime is built with WAMR_BUILD_STATIC_PGO")
+        with self.assertRaises(NotImplementedError):
+            self.pipeline().collect(get_engine(), lambda instance: None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import unittest
+
+from wamr.wamrapi.pool import InstancePool
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+
+# (module
+#   (memory (export "memory") 1)
+#   (func (export "inc") (result i32)
+#     (i32.store (i32.const 0) (i32.add (i32.load (i32.const 0)) (i32.const 1)))
+#     (i32.load (i32.const 0)))
+#   (func (export "trap") unreachable))
+MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x08\x02`\x00\x01\x7f`\x00\x00\x03\x03\x02\x00\x01"
+    b"\x05\x03\x01\x00\x01\x07\x17\x03\x06memory\x02\x00\x03inc\x00\x00\x04trap"
+    b"\x00\x01\n\x1a\x02\x14\x00A\x00A\x00(\x02\x00A\x01j6\x02\x00A\x00(\x02\x00"
+    b"\x0b\x03\x00\x00\x0b"
+)
+
+
+class InstancePoolTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def test_acquire_warm(self):
+        with InstancePool(self._module, size=1) as pool:
+            for _ in range(20):
+                with pool.acquire() as pooled:
+                    self.assertEqual(1, pooled.exports.inc())
+            stats = pool.stats
+            self.assertEqual(20, stats.hits)
+            self.assertEqual(0, stats.misses)
+            self.assertEqual(0, stats.discards)
+            self.assertEqual(0, stats.errors)
+
+    def test_acquire_reset(self):
+        with InstancePool(self._module, size=2) as pool:
+            for _ in range(10):
+                with pool.acquire() as pooled:
+                    self.assertEqual(1, pooled.exports.inc())
+                    self.assertEqual(2, pooled.exports.inc())
+            self.assertEqual(10, pool.stats.hits)
+            self.assertEqual(0, pool.stats.misses)
+
+    def test_acquire_nested(self):
+        with InstancePool(self._module, size=1) as pool:
+            with pool.acquire() as first:
+                with pool.acquire() as second:
+                    self.assertIsNot(first, second)
+            self.assertEqual(2, pool.stats.hits + pool.stats.misses)
+
+    def test_acquire_discard(self):
+        with InstancePool(self._module, size=1) as pool:
+            with self.assertRaises(Exception):
+                with pool.acquire() as pooled:
+                    pooled.exports.trap()
+            self.assertEqual(1, pool.stats.discards)
+            with pool.acquire() as pooled:
+                self.assertEqual(1, pooled.exports.inc())
+            self.assertEqual(2, pool.stats.hits)
+            self.assertEqual(0, pool.stats.misses)
+
+    def test_size_neg(self):
+        for size in (0, -1):
+            with self.assertRaises(ValueError):
+                InstancePool(self._module, size=size)
+        with self.assertRaises(ValueError):
+            InstancePool(self._module, size=2, high_water=1)
+
+    def test_closed(self):
+        pool = InstancePool(self._module, size=1)
+        pool.close()
+        with self.assertRaises(RuntimeError):
+            pool.get()
+        self.assertEqual(0, len(pool))
+
+
+if __name__ == "__main__":
+    unittest.main()
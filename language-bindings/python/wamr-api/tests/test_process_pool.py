@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+import struct
+import tempfile
+import time
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+from wamr.wamrapi.process_pool import WasmProcessPool
+
+from .test_exports import MODULE_BINARY
+from .test_pool import MODULE_BINARY as TRAP_MODULE_BINARY
+
+# (module
+#   (func (export "spin") (param i32) (result i32)
+#     (loop
+#       (br_if 0 (local.tee 0 (i32.sub (local.get 0) (i32.const 1)))))
+#     (local.get 0)))
+SPIN_MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x06\x01`\x01\x7f\x01\x7f\x03\x02\x01\x00\x07\x08"
+    b"\x01\x04spin\x00\x00\n\x12\x01\x10\x00\x03@ \x00A\x01k\"\x00\r\x00\x0b \x00\x0b"
+)
+
+
+class WasmProcessPoolTest(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._module_path = os.path.join(self._directory.name, "sum.wasm")
+        with open(self._module_path, "wb") as f:
+            f.write(MODULE_BINARY)
+        self._trap_module_path = os.path.join(self._directory.name, "trap.wasm")
+        with open(self._trap_module_path, "wb") as f:
+            f.write(TRAP_MODULE_BINARY)
+        self._spin_module_path = os.path.join(self._directory.name, "spin.wasm")
+        with open(self._spin_module_path, "wb") as f:
+            f.write(SPIN_MODULE_BINARY)
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_call(self):
+        with WasmProcessPool(self._module_path, workers=2) as pool:
+            self.assertEqual(3, pool.call("sum", 1, 2))
+            self.assertEqual((3.5, -2, 1), pool.call("rev", 1, -2, 3.5))
+            self.assertEqual([0, 2, 4], list(pool.map("sum", range(3), range(3))))
+            with self.assertRaises(Exception):
+                pool.call("missing")
+            self.assertEqual(7, pool.call("sum", 3, 4))
+
+    def test_call_unsigned(self):
+        with WasmProcessPool(self._module_path, workers=1) as pool:
+            self.assertEqual(-1, pool.call("id32", 2**32 - 1))
+            self.assertEqual(-1, pool.call("id64", 2**64 - 1))
+            self.assertEqual(-(2**63), pool.call("id64", 2**63))
+            with self.assertRaises(struct.error):
+                pool.submit("id64", 2**64)
+
+    def test_cancel(self):
+        with WasmProcessPool(self._spin_module_path, workers=1) as pool:
+            running = pool.submit("spin", 10**7)
+            queued = pool.submit("spin", 1)
+            self.assertTrue(queued.cancel())
+            self.assertEqual(0, running.result(timeout=60))
+            self.assertEqual(0, pool.call("spin", 1))
+            self.assertTrue(queued.cancelled())
+
+    def test_shutdown_cancel_futures(self):
+        pool = WasmProcessPool(self._spin_module_path, workers=1)
+        running = pool.submit("spin", 2 * 10**7)
+        queued = [pool.submit("spin", 1) for _ in range(5)]
+        pool.shutdown(cancel_futures=True)
+        self.assertEqual(0, running.result(timeout=60))
+        self.assertTrue(all(future.cancelled() for future in queued))
+        with self.assertRaises(RuntimeError):
+            pool.submit("spin", 1)
+
+    def test_bad_module_path(self):
+        start = time.monotonic()
+        with self.assertRaises(Exception) as context:
+            WasmProcessPool(os.path.join(self._directory.name, "missing.wasm"), 2)
+        self.assertIn("Error while starting worker", str(context.exception))
+        self.assertLess(time.monotonic() - start, 30)
+
+    def test_bad_engine_options(self):
+        with self.assertRaises(Exception):
+            WasmProcessPool(
+                self._module_path, 1, engine_options={"allocator": "malloc"}
+            )
+
+    def test_restart(self):
+        with WasmProcessPool(self._trap_module_path, workers=1) as pool:
+            self.assertEqual(1, pool.call("inc"))
+            self.assertEqual(2, pool.call("inc"))
+            with self.assertRaises(Exception):
+                pool.call("trap")
+            # a fresh instance
+            self.assertEqual(1, pool.call("inc"))
+            self.assertEqual(1, pool.stats()[0]["restarts"])
+
+    def test_broken(self):
+        pool = WasmProcessPool(self._trap_module_path, workers=1, max_restarts=1)
+        os.unlink(self._trap_module_path)
+        trapping = pool.submit("trap")
+        queued = pool.submit("inc")
+        with self.assertRaises(Exception):
+            trapping.result(timeout=60)
+        with self.assertRaises(BrokenProcessPool):
+            queued.result(timeout=60)
+        with self.assertRaises(BrokenProcessPool):
+            pool.submit("inc")
+        self.assertEqual(2, pool.stats()[0]["restarts"])
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
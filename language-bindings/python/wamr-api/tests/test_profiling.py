@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import json
+import unittest
+
+from wamr.wamrapi.profiling import LatencyHistogram
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+
+from .context import get_engine
+from .test_pool import MODULE_BINARY
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_exact_values(self):
+        histogram = LatencyHistogram(significant_bits=7)
+        for value in range(1, 101):
+            histogram.record(value)
+        self.assertEqual(
+            (100, 5050, 1, 100),
+            (histogram.count, histogram.total, histogram.min, histogram.max),
+        )
+        self.assertEqual(50, histogram.value_at_quantile(0.5))
+        self.assertEqual(99, histogram.value_at_quantile(0.99))
+        self.assertEqual(100, histogram.value_at_quantile(1.0))
+
+    def test_precision(self):
+        histogram = LatencyHistogram(significant_bits=7)
+        for value in (10**3, 10**6, 10**9):
+            histogram.record(value)
+        # within 1/64 of the value
+        for quantile, value in ((0.1, 10**3), (0.5, 10**6)):
+            result = histogram.value_at_quantile(quantile)
+            self.assertGreaterEqual(result, value)
+            self.assertLessEqual(result, value * (1 + 1 / 64))
+        # capped by the largest value
+        self.assertEqual(10**9, histogram.value_at_quantile(1.0))
+        self.assertLess(len(histogram.counts), 4)
+
+    def test_copy(self):
+        histogram = LatencyHistogram()
+        histogram.record(5)
+        copy = histogram.copy()
+        histogram.record(7)
+        self.assertEqual((1, 5, 5), (copy.count, copy.total, copy.max))
+
+    def test_empty(self):
+        self.assertEqual(0, LatencyHistogram().value_at_quantile(0.5))
+
+    def test_significant_bits(self):
+        for bits in (1, 16):
+            with self.assertRaises(ValueError):
+                LatencyHistogram(bits)
+
+
+class InstanceProfileTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def setUp(self):
+        self._instance = Instance(self._module)
+
+    def tearDown(self):
+        del self._instance
+
+    def run_calls(self):
+        exports = self._instance.exports
+        for _ in range(3):
+            exports.inc()
+        with self.assertRaises(Exception):
+            exports.trap()
+
+    def test_profile(self):
+        self._instance.enable_profiling()
+        self.run_calls()
+        profile = self._instance.profile()
+
+        self.assertEqual({"inc", "trap"}, set(profile.functions))
+        inc = profile["inc"]
+        self.assertEqual((3, 0), (inc.calls, inc.errors))
+        self.assertEqual(3, inc.latency.count)
+        self.assertGreater(inc.total_time, 0)
+        self.assertAlmostEqual(inc.latency.total / 1e9, inc.total_time)
+        self.assertEqual((1, 1), (profile["trap"].calls, profile["trap"].errors))
+        quantiles = inc.quantiles()
+        self.assertEqual([0.5, 0.9, 0.99, 0.999], list(quantiles))
+        self.assertLessEqual(quantiles[0.5], quantiles[0.999])
+        if profile.exec_time is not None:
+            self.assertIsNotNone(inc.self_time)
+
+    def test_disabled(self):
+        exports = self._instance.exports
+        inc = exports.inc
+        self._instance.enable_profiling()
+        # fetched before profiling was enabled
+        inc()
+        self.assertEqual(0, self._instance.profile()["inc"].calls)
+        exports.inc()
+        self.assertEqual(1, self._instance.profile()["inc"].calls)
+
+        self._instance.disable_profiling()
+        exports.inc()
+        self.assertEqual(0, self._instance.profile()["inc"].calls)
+
+    def test_reset(self):
+        self._instance.enable_profiling()
+        self.run_calls()
+        self.assertEqual(3, self._instance.profile(reset=True)["inc"].calls)
+        self.assertEqual(0, self._instance.profile()["inc"].calls)
+        self._instance.exports.inc()
+        self.assertEqual(1, self._instance.profile()["inc"].calls)
+
+    def test_to_json(self):
+        self._instance.enable_profiling()
+        self.run_calls()
+        data = json.loads(self._instance.profile().to_json())
+
+        self.assertEqual({"exec_time", "functions"}, set(data))
+        inc = data["functions"]["inc"]
+        self.assertEqual((3, 0), (inc["calls"], inc["errors"]))
+        self.assertEqual(
+            {"min", "max", "mean", "p50", "p90", "p99", "p99.9"}, set(inc["latency"])
+        )
+        self.assertLessEqual(inc["latency"]["min"], inc["latency"]["max"])
+        self.assertEqual(1, data["functions"]["trap"]["errors"])
+
+    def test_to_prometheus(self):
+        self._instance.enable_profiling()
+        self.run_calls()
+        text = self._instance.profile().to_prometheus(
+            prefix="app", labels={"service": 'a"b'}
+        )
+        lines = text.splitlines()
+        self.assertTrue(text.endswith("\n"))
+        self.assertIn("# TYPE app_export_calls_total counter", lines)
+        self.assertIn("# TYPE app_export_latency_seconds summary", lines)
+        label = 'service="a\\"b",export="inc"'
+        self.assertIn(f"app_export_calls_total{{{label}}} 3", lines)
+        self.assertIn(f"app_export_errors_total{{{label}}} 0", lines)
+        self.assertIn(f"app_export_latency_seconds_count{{{label}}} 3", lines)
+        self.assertIn(
+            'app_export_errors_total{service="a\\"b",export="trap"} 1', lines
+        )
+        self.assertEqual(
+            4,
+            sum(
+                line.startswith(f'app_export_latency_seconds{{{label},quantile="')
+                for line in lines
+            ),
+        )
+        # every sample is a name, labels and a number
+        for line in lines:
+            if not line.startswith("#"):
+                float(line.rsplit(" ", 1)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
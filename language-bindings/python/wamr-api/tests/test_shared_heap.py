@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import unittest
+
+from wamr.wamrapi.wamr import Instance
+from wamr.wamrapi.wamr import Module
+from wamr.wamrapi.wamr import SharedHeap
+
+from .context import get_engine
+
+# (module
+#   (memory (export "memory") 1)
+#   (func (export "load8") (param i32) (result i32)
+#     (i32.load8_u (local.get 0)))
+#   (func (export "store8") (param i32 i32)
+#     (i32.store8 (local.get 0) (local.get 1))))
+MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x0b\x02`\x01\x7f\x01\x7f`\x02\x7f\x7f\x00\x03"
+    b"\x03\x02\x00\x01\x05\x03\x01\x00\x01\x07\x1b\x03\x06memory\x02\x00\x05load8"
+    b"\x00\x00\x06store8\x00\x01\n\x13\x02\x07\x00 \x00-\x00\x00\x0b\t\x00 \x00 "
+    b"\x01:\x00\x00\x0b"
+)
+
+HEAP_SIZE = 64 * 1024
+
+
+def _shared_heap(**kwargs):
+    try:
+        return SharedHeap(get_engine(), **kwargs)
+    except NotImplementedError as e:
+        raise unittest.SkipTest(str(e))
+
+
+class SharedHeapTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._module = Module.from_bytes(get_engine(), MODULE_BINARY)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls._module
+
+    def setUp(self):
+        self._instances = [Instance(self._module) for _ in range(2)]
+
+    def tearDown(self):
+        del self._instances
+
+    def test_shared_buffer(self):
+        heap = _shared_heap(size=HEAP_SIZE)
+        for instance in self._instances:
+            heap.attach(instance)
+
+        buffer = heap.malloc(16)
+        self.assertEqual(16, len(buffer.view))
+        # beyond the linear memory, at the same offset in both instances
+        self.assertGreaterEqual(buffer.offset, 65536)
+        buffer.view[:4] = b"\x01\x02\x03\x04"
+        for instance in self._instances:
+            self.assertEqual(3, instance.exports.load8(buffer.offset + 2))
+        # written by one, read by the other and from Python
+        self._instances[0].exports.store8(buffer.offset, 42)
+        self.assertEqual(42, self._instances[1].exports.load8(buffer.offset))
+        self.assertEqual(42, buffer.view[0])
+        heap.free(buffer)
+
+    def test_attach_twice(self):
+        heap = _shared_heap(size=HEAP_SIZE)
+        other = _shared_heap(size=HEAP_SIZE)
+        heap.attach(self._instances[0])
+        with self.assertRaises(Exception):
+            heap.attach(self._instances[0])
+        with self.assertRaises(Exception):
+            other.attach(self._instances[0])
+        with self.assertRaises(Exception):
+            other.detach(self._instances[0])
+
+    def test_detach(self):
+        heap = _shared_heap(size=HEAP_SIZE)
+        instance = self._instances[0]
+        heap.attach(instance)
+        heap.malloc(16)
+        heap.detach(instance)
+        self.assertIsNone(instance.shared_heap)
+        # no instance to allocate through
+        with self.assertRaises(Exception):
+            heap.malloc(16)
+        # attaching another heap is possible again
+        other = _shared_heap(size=HEAP_SIZE)
+        other.attach(instance)
+        self.assertIs(other, instance.shared_heap)
+
+    def test_malloc_exhausted(self):
+        heap = _shared_heap(size=HEAP_SIZE)
+        heap.attach(self._instances[0])
+        with self.assertRaises(MemoryError):
+            heap.malloc(2 * HEAP_SIZE)
+        buffer = heap.malloc(16)
+        heap.free(buffer)
+        # the view is released with the buffer
+        with self.assertRaises(ValueError):
+            buffer.view[0]
+
+    def test_preallocated_chain(self):
+        buffer = bytearray(HEAP_SIZE)
+        body = _shared_heap(buffer=buffer)
+        self.assertTrue(body.preallocated)
+        head = _shared_heap(size=HEAP_SIZE)
+        self.assertIs(head, head.chain(body))
+
+        instance = self._instances[0]
+        head.attach(instance)
+        # the body is mapped at the top of the address space, the head below
+        body_offset = 2**32 - HEAP_SIZE
+        buffer[:2] = b"\x07\x08"
+        self.assertEqual(8, instance.exports.load8(body_offset + 1))
+        instance.exports.store8(body_offset + HEAP_SIZE - 1, 9)
+        self.assertEqual(9, buffer[-1])
+        allocated = head.malloc(16)
+        self.assertGreaterEqual(allocated.offset, body_offset - HEAP_SIZE)
+        self.assertLess(allocated.offset, body_offset)
+        head.free(allocated)
+
+    def test_invalid_args(self):
+        _shared_heap(size=HEAP_SIZE)
+        with self.assertRaises(ValueError):
+            SharedHeap(get_engine())
+        with self.assertRaises(ValueError):
+            SharedHeap(get_engine(), size=HEAP_SIZE, buffer=bytearray(HEAP_SIZE))
+        with self.assertRaises(ValueError):
+            SharedHeap(get_engine(), size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
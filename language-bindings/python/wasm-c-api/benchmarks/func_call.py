@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-function-docstring
+
+"""
+Compare the overhead of `wasm_func_call` on a no-op export between the
+wrappers the binding used to generate, which look the function up and set
+its prototype on every call, and the prototypes bound once at import. The
+best of several rounds is reported.
+"""
+
+import ctypes as c
+import time
+
+import wamr.wasmcapi.ffi as ffi
+
+CALLS = 200_000
+ROUNDS = 5
+
+# (module (func (export "nop")))
+NOP_MODULE = (
+    b"\x00asm\x01\x00\x00\x00\x01\x04\x01\x60\x00\x00\x03\x02\x01\x00"
+    b"\x07\x07\x01\x03nop\x00\x00\x0a\x04\x01\x02\x00\x0b"
+)
+
+
+def legacy_wasm_func_call(arg0, arg1, arg2):
+    # what bindgen.py generated for every function before
+    _wasm_func_call = ffi.libiwasm.wasm_func_call
+    _wasm_func_call.restype = c.POINTER(ffi.wasm_trap_t)
+    _wasm_func_call.argtypes = [
+        c.POINTER(ffi.wasm_func_t),
+        c.POINTER(ffi.wasm_val_vec_t),
+        c.POINTER(ffi.wasm_val_vec_t),
+    ]
+    return _wasm_func_call(arg0, arg1, arg2)
+
+
+def main():
+    engine = ffi.wasm_engine_new()
+    store = ffi.wasm_store_new(engine)
+
+    binary = ffi.wasm_byte_vec_t()
+    ffi.wasm_byte_vec_new_uninitialized(binary, len(NOP_MODULE))
+    binary.data = (c.c_ubyte * len(NOP_MODULE)).from_buffer_copy(NOP_MODULE)
+    module = ffi.wasm_module_new(store, binary)
+    binary.data = None
+    ffi.wasm_byte_vec_delete(binary)
+
+    imports = ffi.wasm_extern_vec_t()
+    ffi.wasm_extern_vec_new_empty(imports)
+    instance = ffi.wasm_instance_new(store, module, imports, None)
+    exports = ffi.wasm_extern_vec_t()
+    ffi.wasm_instance_exports(instance, exports)
+    func = ffi.wasm_extern_as_func(exports.data[0])
+
+    args = ffi.wasm_val_vec_t()
+    results = ffi.wasm_val_vec_t()
+    ffi.wasm_val_vec_new_empty(args)
+    ffi.wasm_val_vec_new_empty(results)
+
+    runs = {"per call": legacy_wasm_func_call, "bound once": ffi.wasm_func_call}
+    best = dict.fromkeys(runs, float("inf"))
+    for _ in range(ROUNDS):
+        for name, call in runs.items():
+            start = time.perf_counter()
+            for _ in range(CALLS):
+                call(func, args, results)
+            best[name] = min(best[name], time.perf_counter() - start)
+
+    for name, elapsed in best.items():
+        print(f"{name:12} {elapsed:7.3f} s  {elapsed / CALLS * 1e9:8.1f} ns/call")
+
+    ffi.wasm_extern_vec_delete(exports)
+    ffi.wasm_instance_delete(instance)
+    ffi.wasm_module_delete(module)
+    ffi.wasm_store_delete(store)
+    ffi.wasm_engine_delete(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-function-docstring
+
+"""
+Compare the host calls of a wasm loop calling an imported `i32 -> i32`
+function, implemented with a callback declared by `ffi.wasm_func_cb_decl`,
+which reads and writes the wasm_val_t structures field by field, and with
+`wamr.wasmcapi.make_callback`, which decodes them with one struct call. The
+best of several rounds is reported.
+"""
+
+import time
+
+import wamr.wasmcapi.ffi as ffi
+from wamr.wasmcapi import Func
+from wamr.wasmcapi import Instance
+from wamr.wasmcapi import Module
+from wamr.wasmcapi import Store
+
+CALLS = 200_000
+ROUNDS = 3
+
+# (module
+#   (import "env" "f" (func $f (param i32) (result i32)))
+#   (func (export "run") (param $n i32) (result i32) (local $acc i32)
+#     (block (loop
+#       (br_if 1 (i32.eqz (local.get $n)))
+#       (local.set $acc (call $f (local.get $acc)))
+#       (local.set $n (i32.sub (local.get $n) (i32.const 1)))
+#       (br 0)))
+#     (local.get $acc)))
+LOOP_MODULE = (
+    b"\x00asm\x01\x00\x00\x00\x01\x06\x01\x60\x01\x7f\x01\x7f"
+    b"\x02\x09\x01\x03env\x01f\x00\x00\x03\x02\x01\x00\x07\x07\x01\x03run\x00\x01"
+    b"\x0a\x22\x01\x20\x01\x01\x7f\x02\x40\x03\x40\x20\x00\x45\x0d\x01\x20\x01"
+    b"\x10\x00\x21\x01\x20\x00\x41\x01\x6b\x21\x00\x0c\x00\x0b\x0b\x20\x01\x0b"
+)
+
+
+@ffi.wasm_func_cb_decl
+def declared(args, results):
+    args = ffi.dereference(args)
+    results = ffi.dereference(results)
+    result_v = ffi.wasm_i32_val(args.data[0].of.i32 + 1)
+    ffi.wasm_val_copy(results.data[0], result_v)
+    results.num_elems = 1
+
+
+def increment(x):
+    return x + 1
+
+
+def main():
+    store = Store()
+    module = Module(store, LOOP_MODULE)
+
+    functype = ffi.wasm_functype_new_1_1(
+        ffi.wasm_valtype_new(ffi.WASM_I32), ffi.wasm_valtype_new(ffi.WASM_I32)
+    )
+    declared_func = ffi.wasm_func_new(store.store, functype, declared)
+    ffi.wasm_functype_delete(functype)
+    trampoline_func = Func.from_callable(
+        store, [ffi.WASM_I32], [ffi.WASM_I32], increment
+    )
+
+    runs = {
+        "declared": Instance(store, module, [declared_func]).exports["run"],
+        "make_callback": Instance(store, module, [trampoline_func]).exports["run"],
+    }
+    best = dict.fromkeys(runs, float("inf"))
+    for _ in range(ROUNDS):
+        for name, run in runs.items():
+            start = time.perf_counter()
+            assert run(CALLS) == CALLS
+            best[name] = min(best[name], time.perf_counter() - start)
+
+    for name, elapsed in best.items():
+        print(f"{name:14} {elapsed:7.3f} s  {elapsed / CALLS * 1e9:8.1f} ns/call")
+
+    runs.clear()
+    ffi.wasm_func_delete(declared_func)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-function-docstring
+
+"""
+Measure the time to import `wamr.wasmcapi.ffi`, which defers loading the
+library and the generated binding, against importing the binding itself,
+in fresh interpreters with `-X importtime`. The best of several rounds is
+reported.
+"""
+
+import subprocess
+import sys
+
+ROUNDS = 5
+
+
+def import_time(module: str) -> int:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        if name.strip() == module:
+            return int(total)
+    raise RuntimeError(f"{module} not found in the import times")
+
+
+def main():
+    for module in ("wamr.wasmcapi.ffi", "wamr.wasmcapi.binding"):
+        best = min(import_time(module) for _ in range(ROUNDS))
+        print(f"import {module:24} {best / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
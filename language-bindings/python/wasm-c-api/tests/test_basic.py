@@ -244,6 +244,53 @@ class BasicTestSuite(unittest.TestCase):
     def test_wasm_valtype_vec_delete_neg(self):
         wasm_valtype_vec_delete(create_null_pointer(wasm_valtype_vec_t))
 
+    def test_vec_view_pos(self):
+        ft = wasm_functype_new_3_1(
+            wasm_valtype_new(WASM_I32),
+            wasm_valtype_new(WASM_F64),
+            wasm_valtype_new(WASM_I64),
+            wasm_valtype_new(WASM_F32),
+        )
+        params = VecView(wasm_functype_params(ft))
+
+        self.assertEqual(len(params), 3)
+        self.assertEqual(
+            [wasm_valtype_kind(vt) for vt in params], [WASM_I32, WASM_F64, WASM_I64]
+        )
+        self.assertEqual(wasm_valtype_kind(params[-1]), WASM_I64)
+        self.assertEqual(
+            [wasm_valtype_kind(vt) for vt in params[1:]], [WASM_F64, WASM_I64]
+        )
+        self.assertEqual(len(params[::2][1:]), 1)
+        self.assertEqual(len(params[3:]), 0)
+        self.assertEqual(
+            [dereference(vt) for vt in params],
+            [dereference(vt) for vt in wasm_vec_to_list(wasm_functype_params(ft))],
+        )
+        with self.assertRaises(IndexError):
+            params[3]
+        with self.assertRaises(TypeError):
+            bytes(params)
+
+        wasm_functype_delete(ft)
+
+    def test_vec_view_bytes(self):
+        name = wasm_name_new_from_string("vector view")
+        view = VecView(name)
+
+        self.assertEqual(bytes(view), b"vector view")
+        self.assertEqual(bytes(view[7:]), b"view")
+        self.assertEqual(bytes(view[::2]), b"vco iw")
+        self.assertEqual(bytes(view[20:]), b"")
+        self.assertEqual(view[0], ord("v"))
+
+        wasm_byte_vec_delete(name)
+
+    def test_vec_view_neg(self):
+        with self.assertRaises(RuntimeError):
+            VecView(wasm_limits_t())
+        self.assertEqual(len(VecView(wasm_valtype_vec_t())), 0)
+
     def test_wasm_functype_new_0_0(self):
         ft = wasm_functype_new_0_0()
 
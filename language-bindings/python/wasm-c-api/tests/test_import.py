@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+import subprocess
+import sys
+import unittest
+
+
+def run_python(code, *options):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src"))]
+        + [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    )
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+class ImportTestSuite(unittest.TestCase):
+    def test_import_is_silent_and_lazy(self):
+        result = run_python(
+            "import sys\n"
+            "import wamr.wasmcapi.ffi as ffi\n"
+            "print(isinstance(ffi.libiwasm, ffi._LazyLibrary))\n"
+            "print('wamr.wasmcapi.binding' in sys.modules)\n"
+        )
+        self.assertEqual(result.stdout.split(), ["True", "False"])
+
+    def test_binding_loaded_on_first_use(self):
+        result = run_python(
+            "import sys\n"
+            "import wamr.wasmcapi.ffi as ffi\n"
+            "engine = ffi.wasm_engine_new()\n"
+            "print(isinstance(ffi.libiwasm, ffi._LazyLibrary))\n"
+            "print('wamr.wasmcapi.binding' in sys.modules)\n"
+            "ffi.wasm_engine_delete(engine)\n"
+        )
+        self.assertEqual(result.stdout.split()[-2:], ["False", "True"])
+
+    def test_import_time(self):
+        result = run_python("import wamr.wasmcapi.ffi", "-X", "importtime")
+        cumulative = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+        self.assertIn("wamr.wasmcapi.ffi", cumulative)
+        self.assertNotIn("wamr.wasmcapi.binding", cumulative)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from wamr.wasmcapi import Instance
+from wamr.wasmcapi import Module
+from wamr.wasmcapi import ModuleCache
+from wamr.wasmcapi import Store
+
+# (module (func (export "sum") (param i32 i32) (result i32)
+#   (i32.add (local.get 0) (local.get 1))))
+SUM_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x07\x01\x60\x02\x7f\x7f\x01\x7f\x03\x02\x01\x00"
+    b"\x07\x07\x01\x03sum\x00\x00\x0a\x09\x01\x07\x00\x20\x00\x20\x01\x6a\x0b"
+)
+
+# (module (func (export "nop")))
+NOP_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x04\x01\x60\x00\x00\x03\x02\x01\x00"
+    b"\x07\x07\x01\x03nop\x00\x00\x0a\x04\x01\x02\x00\x0b"
+)
+
+
+def serialize(module):
+    # the runtime of the tests has no JIT, the wasm bytes stand for the
+    # serialized module
+    return module.binary
+
+
+def deserialize(store, data):
+    return Module(store, bytes(data))
+
+
+class ModuleCacheTestSuite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._store = Store()
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+        self._cache = ModuleCache(self._directory.name)
+
+    def serializing(self):
+        original_init = Module.__init__
+
+        def init(module, store, binary):
+            original_init(module, store, binary)
+            module.binary = bytes(binary)
+
+        patches = [
+            mock.patch.object(Module, "__init__", init),
+            mock.patch.object(Module, "serialize", serialize),
+            mock.patch.object(Module, "deserialize", deserialize),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def call_sum(self, module):
+        return Instance(self._store, module).exports["sum"](20, 22)
+
+    def test_not_serializable(self):
+        module = self._cache.get(self._store, SUM_BINARY)
+        self.assertEqual(self.call_sum(module), 42)
+        self.assertIs(self._cache.serializable, False)
+        self.assertEqual(self._cache.entries(), [])
+
+        module = self._cache.get(self._store, SUM_BINARY)
+        self.assertEqual(self.call_sum(module), 42)
+
+    def test_hit(self):
+        self.serializing()
+        module = self._cache.get(self._store, SUM_BINARY)
+        self.assertEqual(self.call_sum(module), 42)
+        self.assertIs(self._cache.serializable, True)
+        [entry] = self._cache.entries()
+        self.assertEqual(entry.path, self._cache.path(self._cache.key(SUM_BINARY)))
+
+        with mock.patch.object(Module, "deserialize", wraps=deserialize) as loaded:
+            module = ModuleCache(self._directory.name).get(self._store, SUM_BINARY)
+        loaded.assert_called_once()
+        self.assertEqual(self.call_sum(module), 42)
+
+    def test_get_file(self):
+        self.serializing()
+        wasm_path = os.path.join(self._directory.name, "sum.wasm")
+        with open(wasm_path, "wb") as f:
+            f.write(SUM_BINARY)
+        module = self._cache.get_file(self._store, wasm_path)
+        self.assertEqual(self.call_sum(module), 42)
+        self.assertEqual(len(self._cache.entries()), 1)
+
+    def test_corrupted(self):
+        self.serializing()
+        self._cache.get(self._store, SUM_BINARY)
+        path = self._cache.path(self._cache.key(SUM_BINARY))
+        with open(path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\xff")
+        mtime = os.stat(path).st_mtime_ns
+
+        with mock.patch.object(Module, "deserialize", wraps=deserialize) as loaded:
+            module = self._cache.get(self._store, SUM_BINARY)
+        loaded.assert_not_called()
+        self.assertEqual(self.call_sum(module), 42)
+        # compiled and written again
+        with open(path, "rb") as f:
+            self.assertTrue(f.read().endswith(SUM_BINARY))
+
+        with open(path, "r+b") as f:
+            f.truncate(10)
+        self.assertEqual(self.call_sum(self._cache.get(self._store, SUM_BINARY)), 42)
+        self.assertNotEqual(os.stat(path).st_mtime_ns, mtime)
+
+    def test_evict(self):
+        self.serializing()
+        self._cache.get(self._store, SUM_BINARY)
+        sum_path = self._cache.path(self._cache.key(SUM_BINARY))
+        self._cache.max_size = os.stat(sum_path).st_size
+        os.utime(sum_path, (0, 0))
+
+        self._cache.get(self._store, NOP_BINARY)
+        self.assertEqual(
+            [entry.path for entry in self._cache.entries()],
+            [self._cache.path(self._cache.key(NOP_BINARY))],
+        )
+
+        self._cache.clear()
+        self.assertEqual(self._cache.entries(), [])
+
+    def test_max_size_neg(self):
+        with self.assertRaises(ValueError):
+            ModuleCache(self._directory.name, max_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python3
+#
+# Copyright (C) 2019 Intel Corporation.  All rights reserved.
+# SPDX-License-Identifier: Apache-2.0 WITH LLVM-exception
+#
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+# pylint: disable=missing-module-docstring
+
+import gc
+import unittest
+
+import wamr.wasmcapi.ffi as ffi
+from wamr.wasmcapi import Func
+from wamr.wasmcapi import Instance
+from wamr.wasmcapi import Module
+from wamr.wasmcapi import Store
+from wamr.wasmcapi import make_callback
+
+# (module
+#   (memory (export "memory") 1)
+#   (func (export "sum") (param i32 i32) (result i32)
+#     (i32.add (local.get 0) (local.get 1)))
+#   (func (export "mix") (param i64 f32 f64) (result f64 i64)
+#     (f64.add (local.get 2) (f64.promote_f32 (local.get 1)))
+#     (i64.add (local.get 0) (i64.const 1)))
+#   (func (export "nop"))
+#   (func (export "trap") unreachable))
+MODULE_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x12\x03`\x02\x7f\x7f\x01\x7f`\x03~}|\x02|~`"
+    b"\x00\x00\x03\x05\x04\x00\x01\x02\x02\x05\x03\x01\x00\x01\x07#\x05\x06memory"
+    b"\x02\x00\x03sum\x00\x00\x03mix\x00\x01\x03nop\x00\x02\x04trap\x00\x03\n\x1e"
+    b"\x04\x07\x00 \x00 \x01j\x0b\r\x00 \x02 \x01\xbb\xa0 \x00B\x01|\x0b\x02\x00"
+    b"\x0b\x03\x00\x00\x0b"
+)
+
+# (module
+#   (import "env" "sum" (func $sum (param i32 i32) (result i32)))
+#   (func (export "add") (param i32 i32) (result i32)
+#     (call $sum (local.get 0) (local.get 1))))
+IMPORT_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x07\x01\x60\x02\x7f\x7f\x01\x7f"
+    b"\x02\x0b\x01\x03env\x03sum\x00\x00\x03\x02\x01\x00\x07\x07\x01\x03add\x00"
+    b"\x01\x0a\x0a\x01\x08\x00\x20\x00\x20\x01\x10\x00\x0b"
+)
+
+# (module
+#   (import "env" "f" (func $f (param i32) (result i32)))
+#   (func (export "run") (param $n i32) (result i32) (local $acc i32)
+#     (block (loop
+#       (br_if 1 (i32.eqz (local.get $n)))
+#       (local.set $acc (call $f (local.get $acc)))
+#       (local.set $n (i32.sub (local.get $n) (i32.const 1)))
+#       (br 0)))
+#     (local.get $acc)))
+LOOP_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x06\x01\x60\x01\x7f\x01\x7f"
+    b"\x02\x09\x01\x03env\x01f\x00\x00\x03\x02\x01\x00\x07\x07\x01\x03run\x00\x01"
+    b"\x0a\x22\x01\x20\x01\x01\x7f\x02\x40\x03\x40\x20\x00\x45\x0d\x01\x20\x01"
+    b"\x10\x00\x21\x01\x20\x00\x41\x01\x6b\x21\x00\x0c\x00\x0b\x0b\x20\x01\x0b"
+)
+
+# (module
+#   (import "env" "add" (func $add (param i64 f64) (result f64)))
+#   (func (export "run") (param i64 f64) (result f64)
+#     (call $add (local.get 0) (local.get 1))))
+ADD_BINARY = (
+    b"\x00asm\x01\x00\x00\x00\x01\x07\x01\x60\x02\x7e\x7c\x01\x7c"
+    b"\x02\x0b\x01\x03env\x03add\x00\x00\x03\x02\x01\x00\x07\x07\x01\x03run"
+    b"\x00\x01\x0a\x0a\x01\x08\x00\x20\x00\x20\x01\x10\x00\x0b"
+)
+
+
+@ffi.wasm_func_cb_decl
+def host_sum(args, results):
+    args = ffi.dereference(args)
+    results = ffi.dereference(results)
+    result_v = ffi.wasm_i32_val(args.data[0].of.i32 + args.data[1].of.i32)
+    ffi.wasm_val_copy(results.data[0], result_v)
+    results.num_elems = 1
+
+
+class ObjectsTestSuite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._store = Store()
+        cls._module = Module(cls._store, MODULE_BINARY)
+        cls._instance = Instance(cls._store, cls._module)
+
+    def test_exports(self):
+        exports = self._instance.exports
+        self.assertEqual(list(exports), ["memory", "sum", "mix", "nop", "trap"])
+        self.assertIsInstance(exports["sum"], Func)
+        self.assertNotIsInstance(exports["memory"], Func)
+        self.assertEqual(self._module.export_names(), list(exports))
+
+    def test_call(self):
+        exports = self._instance.exports
+        self.assertEqual(exports["sum"](1, 2), 3)
+        self.assertEqual(exports["sum"](2**31 - 1, 1), -(2**31))
+        self.assertEqual(exports["mix"](41, 0.5, 1.25), (1.75, 42))
+        self.assertIsNone(exports["nop"]())
+        # the buffers are reused between calls
+        self.assertEqual(exports["sum"](-5, 2), -3)
+
+    def test_call_neg(self):
+        with self.assertRaises(TypeError):
+            self._instance.exports["sum"](1)
+        with self.assertRaises(RuntimeError) as context:
+            self._instance.exports["trap"]()
+        self.assertIn("unreachable", str(context.exception))
+        self.assertEqual(self._instance.exports["sum"](1, 1), 2)
+
+    def test_compile_neg(self):
+        with self.assertRaises(RuntimeError):
+            Module(self._store, b"\x00asm\x01\x00\x00\x00\xff")
+
+    def test_imports(self):
+        functype = ffi.wasm_functype_new_2_1(
+            ffi.wasm_valtype_new(ffi.WASM_I32),
+            ffi.wasm_valtype_new(ffi.WASM_I32),
+            ffi.wasm_valtype_new(ffi.WASM_I32),
+        )
+        func = ffi.wasm_func_new(self._store.store, functype, host_sum)
+        ffi.wasm_functype_delete(functype)
+
+        module = Module(self._store, IMPORT_BINARY)
+        instance = Instance(self._store, module, [func])
+        self.assertEqual(instance.exports["add"](20, 22), 42)
+        self.assertEqual(instance.exports["add"](-1, 1), 0)
+
+        del instance
+        ffi.wasm_func_delete(func)
+
+    def test_from_callable(self):
+        calls = []
+
+        def f(x):
+            calls.append(x)
+            return x + 2
+
+        host = Func.from_callable(self._store, [ffi.WASM_I32], [ffi.WASM_I32], f)
+        instance = Instance(self._store, Module(self._store, LOOP_BINARY), [host])
+        self.assertEqual(instance.exports["run"](3), 6)
+        self.assertEqual(calls, [0, 2, 4])
+        self.assertEqual(instance.exports["run"](0), 0)
+
+    def test_from_callable_results(self):
+        host = Func.from_callable(
+            self._store,
+            [ffi.WASM_I64, ffi.WASM_F64],
+            [ffi.WASM_F64],
+            lambda a, b: a + b,
+        )
+        instance = Instance(self._store, Module(self._store, ADD_BINARY), [host])
+        self.assertEqual(instance.exports["run"](2**40, 0.5), 2**40 + 0.5)
+        self.assertEqual(instance.exports["run"](-1, -2.25), -3.25)
+
+    def test_from_callable_neg(self):
+        def f(x):
+            raise ValueError(f"bad {x}")
+
+        host = Func.from_callable(self._store, [ffi.WASM_I32], [ffi.WASM_I32], f)
+        instance = Instance(self._store, Module(self._store, LOOP_BINARY), [host])
+        with self.assertRaises(RuntimeError) as context:
+            instance.exports["run"](1)
+        self.assertIn("ValueError: bad 0", str(context.exception))
+
+    def test_make_callback(self):
+        functype = ffi.wasm_functype_new_2_1(
+            ffi.wasm_valtype_new(ffi.WASM_I32),
+            ffi.wasm_valtype_new(ffi.WASM_I32),
+            ffi.wasm_valtype_new(ffi.WASM_I32),
+        )
+        callback = make_callback(functype, lambda a, b: a * b)
+        func = ffi.wasm_func_new(self._store.store, functype, callback)
+        ffi.wasm_functype_delete(functype)
+
+        instance = Instance(self._store, Module(self._store, IMPORT_BINARY), [func])
+        self.assertEqual(instance.exports["add"](6, 7), 42)
+
+        del instance
+        ffi.wasm_func_delete(func)
+
+    def test_finalize(self):
+        # no reference cycle, released without a garbage collection
+        gc.disable()
+        self.addCleanup(gc.enable)
+        instance = Instance(self._store, self._module)
+        finalizer = instance._finalizer
+        func = instance.exports["sum"]
+        del instance
+        # the func keeps its instance alive
+        self.assertTrue(finalizer.alive)
+        self.assertEqual(func(1, 2), 3)
+        del func
+        self.assertFalse(finalizer.alive)
+
+    def test_finalize_unused(self):
+        gc.disable()
+        self.addCleanup(gc.enable)
+        instance = Instance(self._store, self._module)
+        finalizer = instance._finalizer
+        self.assertEqual(instance.exports["sum"](1, 2), 3)
+        del instance
+        self.assertFalse(finalizer.alive)
+
+    def test_exports_shared(self):
+        instance = Instance(self._store, self._module)
+        func = instance.exports["sum"]
+        self.assertIs(func, instance.exports["sum"])
+
+
+if __name__ == "__main__":
+    unittest.main()
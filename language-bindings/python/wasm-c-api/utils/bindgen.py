@@ -12,7 +12,9 @@
 - Need to run *download_wamr.py* firstly.
 - Parse *./wasm-micro-runtime/core/iwasm/include/wasm_c_api.h* and generate
   *wamr/binding.py*
+- `--slots` adds `__slots__` to the generated structures
 """
+import argparse
 import os
 import pathlib
 import shutil
@@ -21,7 +23,7 @@ import sys
 from pycparser import c_ast, parse_file
 
 WASM_C_API_HEADER = "core/iwasm/include/wasm_c_api.h"
-BINDING_PATH = "language-bindings/python/wamr/wasmcapi/binding.py"
+BINDING_PATH = "language-bindings/python/src/wamr/wasmcapi/binding.py"
 # 4 spaces as default indent
 INDENT = "    "
 
@@ -60,7 +62,10 @@ IGNORE_SYMOLS = (
 
 
 class Visitor(c_ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, slots=False):
+        self.slots = slots
+        # functions come last, their prototypes may refer to any type
+        self.functions = ""
         self.type_map = {
             "_Bool": "c_bool",
             "byte_t": "c_ubyte",
@@ -87,6 +92,23 @@ class Visitor(c_ast.NodeVisitor):
             "from .ffi import dereference, libiwasm, wasm_ref_t, wasm_val_t\n"
             "\n"
             "\n"
+            "def _bind(name, restype, argtypes):\n"
+            f"{INDENT}# the prototype is set once, a wrapper is a plain alias of it.\n"
+            f"{INDENT}# a symbol missing from libiwasm only fails when it is called\n"
+            f"{INDENT}try:\n"
+            f"{INDENT*2}func = getattr(libiwasm, name)\n"
+            f"{INDENT}except AttributeError:\n"
+            "\n"
+            f"{INDENT*2}def func(*args):\n"
+            f'{INDENT*3}raise AttributeError(f"{{name}} is not exported by libiwasm")\n'
+            "\n"
+            f"{INDENT*2}return func\n"
+            "\n"
+            f"{INDENT}func.restype = restype\n"
+            f"{INDENT}func.argtypes = argtypes\n"
+            f"{INDENT}return func\n"
+            "\n"
+            "\n"
         )
 
     def get_type_name(self, c_type):
@@ -203,8 +225,11 @@ class Visitor(c_ast.NodeVisitor):
                 info[decl.name] = self.get_type_name(decl.type)
 
         if info:
+            self.ret += f"class {name}(Structure):\n"
+            if self.slots:
+                slots = ", ".join(f'"{k}"' for k in info)
+                self.ret += f"{INDENT}__slots__ = [{slots}]\n"
             self.ret += (
-                f"class {name}(Structure):\n"
                 f"{INDENT}_fields_ = [\n"
                 f"{gen_fields(info, INDENT*2)}\n"
                 f"{INDENT}]\n"
@@ -279,19 +304,10 @@ class Visitor(c_ast.NodeVisitor):
 
             params_len += 1
 
-        args = (
-            "" if not params_len else ",".join([f"arg{i}" for i in range(params_len)])
-        )
         argtypes = f"[{self.get_type_name(node.args)}]" if params_len else "None"
 
-        self.ret += (
-            f"def {func_name}({args}):\n"
-            f"{INDENT}_{func_name} = libiwasm.{func_name}\n"
-            f"{INDENT}_{func_name}.restype = {restype}\n"
-            f"{INDENT}_{func_name}.argtypes = {argtypes}\n"
-            f"{INDENT}return _{func_name}({args})\n"
-        )
-        self.ret += "\n"
+        self.functions += f'{func_name} = _bind("{func_name}", {restype}, {argtypes})\n'
+        self.functions += "\n"
 
     def visit_Enum(self, node):
         # pylint: disable=invalid-name
@@ -333,7 +349,7 @@ def preflight_check(workspace):
     return True
 
 
-def do_parse(workspace):
+def do_parse(workspace, slots=False):
     filename = workspace.joinpath(WASM_C_API_HEADER)
     filename = str(filename)
 
@@ -358,12 +374,20 @@ def do_parse(workspace):
         ],
     )
 
-    ast_visitor = Visitor()
+    ast_visitor = Visitor(slots)
     ast_visitor.visit(ast)
-    return ast_visitor.ret
+    return ast_visitor.ret + ast_visitor.functions
 
 
 def main():
+    parser = argparse.ArgumentParser(description="generate the wasm-c-api binding")
+    parser.add_argument(
+        "--slots",
+        action="store_true",
+        help="add __slots__ to the generated structures",
+    )
+    options = parser.parse_args()
+
     current_file = pathlib.Path(__file__)
     if current_file.is_symlink():
         current_file = pathlib.Path(os.readlink(current_file))
@@ -377,7 +401,7 @@ def main():
     wamr_repo = root_dir
     binding_file_path = root_dir.joinpath(BINDING_PATH)
     with open(binding_file_path, "wt", encoding="utf-8") as binding_file:
-        binding_file.write(do_parse(wamr_repo))
+        binding_file.write(do_parse(wamr_repo, options.slots))
 
     return True
 